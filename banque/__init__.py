@@ -0,0 +1,40 @@
+"""Système bancaire : clients, comptes, entreprises et employés.
+
+Seul le modèle du domaine est chargé à l'import ; les sous-systèmes (import en masse, journal d'écriture,
+détection de fraude, prêts, moteur réparti, service réseau) sont importés au premier accès pour que le
+démarrage reste instantané.
+"""
+import importlib
+
+from .modele import Client, CompteBancaire, EmployeBancaire, Entreprise, ResultatPaiementLot
+from .registre_comptes import RegistreComptes
+
+# Nom exporté -> module qui le définit, chargé à la demande
+_IMPORTS_DIFFERES = {
+    "ArreteJournalier": ".arrete_journalier",
+    "Authentification": ".authentification",
+    "DetecteurFraude": ".detection_fraude",
+    "GuichetPrets": ".prets",
+    "demarrer_detection": ".detection_fraude",
+    "importer_clients": ".importation_clients",
+    "Instrumentation": ".instrumentation",
+    "JournalEcriture": ".journal_ecriture",
+    "demarrer_persistance": ".journal_ecriture",
+    "MoteurReparti": ".moteur_reparti",
+    "prendre_instantane": ".journal_ecriture",
+    "restaurer": ".journal_ecriture",
+    "ServiceBanque": ".service_banque",
+    "TableComptes": ".table_comptes",
+}
+
+__all__ = ["Client", "CompteBancaire", "EmployeBancaire", "Entreprise", "RegistreComptes", "ResultatPaiementLot",
+           *_IMPORTS_DIFFERES]
+
+
+def __getattr__(nom):
+    module = _IMPORTS_DIFFERES.get(nom)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {nom!r}")
+    valeur = getattr(importlib.import_module(module, __name__), nom)
+    globals()[nom] = valeur  # Les accès suivants ne repassent plus par ici
+    return valeur
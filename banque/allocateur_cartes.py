@@ -0,0 +1,195 @@
+import bisect
+import threading
+from array import array
+
+LONGUEUR_CARTE = 16
+LONGUEUR_PREFIXE = 6  # Identifiant de la banque (BIN)
+LONGUEUR_CORPS = LONGUEUR_CARTE - LONGUEUR_PREFIXE - 1  # Le dernier chiffre est la clé de Luhn
+CAPACITE = 10 ** LONGUEUR_CORPS
+
+# Multiplicateur premier avec 10 : k -> (MULTIPLICATEUR * k + decalage) % CAPACITE est une permutation,
+# les numéros paraissent aléatoires mais deux compteurs différents ne donnent jamais le même numéro
+MULTIPLICATEUR = 387420489
+INVERSE = pow(MULTIPLICATEUR, -1, CAPACITE)  # Retrouve la position d'un numéro dans la permutation
+
+
+def chiffre_luhn(charge):
+    """Calcule la clé de Luhn à ajouter à la fin d'une suite de chiffres."""
+    total = 0
+    for position, chiffre in enumerate(reversed(charge)):
+        valeur = int(chiffre)
+        if position % 2 == 0:  # En partant de la droite, un chiffre sur deux est doublé
+            valeur *= 2
+            if valeur > 9:
+                valeur -= 9
+        total += valeur
+    return str((10 - total % 10) % 10)
+
+
+def luhn_valide(numero):
+    """Vérifie que le numéro de carte respecte la clé de Luhn."""
+    return numero.isdigit() and chiffre_luhn(numero[:-1]) == numero[-1]
+
+
+_DOUBLE = (0, 2, 4, 6, 8, 1, 3, 5, 7, 9)  # Chiffre doublé, ramené à un chiffre comme le veut Luhn
+
+
+def _table_luhn(positions_doublees):
+    """Précalcule la somme de Luhn de chaque bloc de 3 chiffres."""
+    poids = [_DOUBLE if position in positions_doublees else range(10) for position in range(3)]
+    return [centaine + dizaine + unite for centaine in poids[0] for dizaine in poids[1] for unite in poids[2]]
+
+
+# Le corps fait 9 chiffres : le bloc de droite et celui de gauche ont leurs 1er et 3e chiffres doublés,
+# le bloc du milieu seulement son 2e chiffre
+_TABLE_EXTREMITES = _table_luhn((0, 2))
+_TABLE_MILIEU = _table_luhn((1,))
+_CLES = [str((10 - total % 10) % 10) for total in range(200)]
+
+
+def _somme_prefixe(prefixe):
+    """Calcule la contribution du préfixe à la somme de Luhn (le corps le suit)."""
+    total = 0
+    for position, chiffre in enumerate(reversed(prefixe), start=LONGUEUR_CORPS):
+        valeur = int(chiffre)
+        if position % 2 == 0:
+            valeur *= 2
+            if valeur > 9:
+                valeur -= 9
+        total += valeur
+    return total
+
+
+def _generer(prefixe, somme_prefixe, decalage, debut, fin, exclus):
+    """Génère les numéros de carte des positions debut à fin (exclue), sauf celles de exclus."""
+    extremites = _TABLE_EXTREMITES
+    milieu = _TABLE_MILIEU
+    cles = _CLES
+    exclus = set(exclus) if exclus else None
+    numeros = []
+    ajouter = numeros.append
+    for compteur in range(debut, fin):
+        if exclus and compteur in exclus:
+            continue
+        corps = (MULTIPLICATEUR * compteur + decalage) % CAPACITE
+        total = (somme_prefixe + extremites[corps // 1000000]
+                 + milieu[corps // 1000 % 1000] + extremites[corps % 1000])
+        ajouter(f"{prefixe}{corps:09d}{cles[total]}")
+    return numeros
+
+
+# Classe BlocCartes pour qu'un processus de travail émette ses numéros sans synchronisation
+class BlocCartes:
+    def __init__(self, prefixe, decalage, debut, fin, exclus):
+        self.prefixe = prefixe
+        self.decalage = decalage
+        self.debut = debut
+        self.fin = fin
+        self.exclus = exclus  # Positions du bloc déjà utilisées ailleurs (copie propre au bloc)
+
+    def __len__(self):
+        return self.fin - self.debut - len(self.exclus)
+
+    def numeros(self):
+        """Renvoie tous les numéros du bloc réservé."""
+        return _generer(self.prefixe, _somme_prefixe(self.prefixe), self.decalage,
+                        self.debut, self.fin, self.exclus)
+
+
+# Classe AllocateurCartes pour attribuer des numéros de carte uniques et valides
+#
+# L'allocateur parcourt la permutation dans l'ordre : seule sa position (compteur) change, sous un verrou.
+# Un numéro attribué ailleurs (compte restauré, import précédent) est repéré par sa position dans la
+# permutation : si elle est déjà dépassée, il n'y a rien à faire ; sinon elle est exclue jusqu'à ce que le
+# compteur la dépasse. Au redémarrage, marquer_utilises avec les cartes existantes remet donc le compteur
+# après toutes celles que cet allocateur avait émises d'affilée.
+class AllocateurCartes:
+    def __init__(self, prefixe="497010", decalage=0):
+        if len(prefixe) != LONGUEUR_PREFIXE or not prefixe.isdigit():
+            raise ValueError(f"Le préfixe doit être composé de {LONGUEUR_PREFIXE} chiffres.")
+        self.prefixe = prefixe
+        self.decalage = decalage % CAPACITE
+        self.compteur = 0  # Nombre de positions de la permutation déjà consommées
+        self._somme_prefixe = _somme_prefixe(prefixe)
+        # Positions pas encore atteintes de numéros déjà utilisés hors allocateur, triées, sur 8 octets chacune
+        self.exclus = array("q")
+        self._verrou = threading.Lock()
+
+    def nombre_disponible(self):
+        """Renvoie le nombre de numéros encore libres pour ce préfixe."""
+        return CAPACITE - self.compteur - len(self.exclus)
+
+    def position(self, numero):
+        """Renvoie la position d'un numéro de carte dans la permutation, ou None s'il n'est pas de ce préfixe."""
+        if len(numero) != LONGUEUR_CARTE or not numero.isdigit() or not numero.startswith(self.prefixe):
+            return None
+        return (int(numero[LONGUEUR_PREFIXE:-1]) - self.decalage) * INVERSE % CAPACITE
+
+    def _sauter_exclus(self):
+        """Avance le compteur sur les positions exclues qui le suivent immédiatement (verrou tenu)."""
+        exclus = self.exclus
+        suivantes = 0
+        while suivantes < len(exclus) and exclus[suivantes] == self.compteur + suivantes:
+            suivantes += 1
+        if suivantes:
+            del exclus[:suivantes]
+            self.compteur += suivantes
+
+    def _avancer(self, nombre):
+        """Réserve les positions de nombre numéros libres ; renvoie (debut, fin, positions exclues du bloc).
+
+        Le bloc est allongé d'autant de positions qu'il contient d'exclusions : il donne toujours nombre numéros.
+        """
+        with self._verrou:
+            debut = self.compteur
+            fin = debut + nombre
+            if not self.exclus:
+                if fin > CAPACITE:
+                    raise RuntimeError("Plus aucun numéro de carte disponible pour ce préfixe.")
+                self.compteur = fin
+                return debut, fin, ()
+            # Chaque allongement peut couvrir de nouvelles exclusions : on recompte jusqu'à ce que fin ne bouge plus
+            coupure = bisect.bisect_left(self.exclus, fin)
+            while debut + nombre + coupure != fin:
+                fin = debut + nombre + coupure
+                coupure = bisect.bisect_left(self.exclus, fin)
+            if fin > CAPACITE:
+                raise RuntimeError("Plus aucun numéro de carte disponible pour ce préfixe.")
+            # Les exclusions du bloc passent au bloc : le compteur les dépasse, l'allocateur n'en a plus besoin
+            exclus = self.exclus[:coupure]
+            del self.exclus[:coupure]
+            self.compteur = fin
+            self._sauter_exclus()
+        return debut, fin, exclus
+
+    def allouer(self):
+        """Attribue un nouveau numéro de carte unique."""
+        return self.allouer_lot(1)[0]
+
+    def allouer_lot(self, nombre):
+        """Attribue exactement nombre numéros de carte uniques (les numéros déjà utilisés sont sautés)."""
+        return _generer(self.prefixe, self._somme_prefixe, self.decalage, *self._avancer(nombre))
+
+    def reserver_bloc(self, taille):
+        """Réserve un bloc de taille numéros qu'un processus de travail pourra émettre seul."""
+        return BlocCartes(self.prefixe, self.decalage, *self._avancer(taille))
+
+    def marquer_utilise(self, numero):
+        """Signale un numéro déjà attribué ailleurs pour qu'il ne soit jamais réémis."""
+        self.marquer_utilises((numero,))
+
+    def marquer_utilises(self, numeros):
+        """Signale d'un coup des numéros déjà attribués (cartes restaurées ou importées) : aucun ne sera réémis.
+
+        Les numéros d'un autre préfixe, ou qui ne sont pas des numéros de carte (clés d'entreprise), sont ignorés.
+        """
+        positions = array("q", sorted({position for position in map(self.position, numeros) if position is not None}))
+        with self._verrou:
+            nouvelles = positions[bisect.bisect_left(positions, self.compteur):]
+            if nouvelles:
+                self.exclus = array("q", sorted(set(self.exclus).union(nouvelles)))
+                self._sauter_exclus()
+
+
+# Allocateur partagé utilisé par CompteBancaire.generer_numero_carte
+allocateur_par_defaut = AllocateurCartes()
@@ -0,0 +1,210 @@
+import json
+import os
+import time
+from array import array
+
+from .journal_transactions import FRAIS, INTERETS, en_centimes, en_euros, journal_par_defaut
+from .table_comptes import TYPES_COMPTE
+from .verrous_comptes import verrous_par_defaut
+
+try:
+    import numpy
+except ImportError:  # Calcul en pur Python, identique au centime près mais bien plus lent
+    numpy = None
+
+# Barème par type de compte, dans l'ordre de TYPES_COMPTE
+# Épargne 3 %, courant 0,10 %, premium 1,5 % : points de base (1/100 de %) par an, sur le solde de fin de journée
+TAUX_ANNUELS = (300, 10, 150)
+FRAIS_JOURNALIERS = (0, 5, 30)  # Centimes de frais de tenue de compte par jour
+DIVISEUR = 10000 * 365  # Points de base -> fraction, taux annuel -> taux journalier
+TAILLE_TRANCHE = 1000000  # Comptes traités (et verrouillés) d'un coup
+SECONDES_PAR_JOUR = 86400
+
+
+def calculer(soldes, types):
+    """Calcule intérêts et frais du jour (centimes) pour des colonnes de soldes (centimes) et de types.
+
+    Les intérêts sont arrondis au centime le plus proche, à égalité vers le centime pair (arrondi bancaire),
+    en arithmétique entière ; les frais ne font jamais passer un compte à découvert.
+    Avec numpy, soldes et types sont des tableaux numpy et le calcul se fait en une passe vectorisée.
+    """
+    if numpy is not None:
+        soldes = numpy.asarray(soldes, dtype=numpy.int64)
+        types = numpy.asarray(types, dtype=numpy.intp)
+        positifs = numpy.maximum(soldes, 0)
+        quotients, restes = numpy.divmod(positifs * numpy.array(TAUX_ANNUELS, dtype=numpy.int64)[types], DIVISEUR)
+        doubles = 2 * restes
+        interets = quotients + ((doubles > DIVISEUR) | ((doubles == DIVISEUR) & (quotients % 2 == 1)))
+        frais = numpy.minimum(numpy.array(FRAIS_JOURNALIERS, dtype=numpy.int64)[types], positifs + interets)
+        return interets, frais
+    interets = array("q")
+    frais = array("q")
+    for solde, type_compte in zip(soldes, types):
+        positif = max(solde, 0)
+        quotient, reste = divmod(positif * TAUX_ANNUELS[type_compte], DIVISEUR)
+        if 2 * reste > DIVISEUR or (2 * reste == DIVISEUR and quotient % 2):
+            quotient += 1
+        interets.append(quotient)
+        frais.append(min(FRAIS_JOURNALIERS[type_compte], positif + quotient))
+    return interets, frais
+
+
+# Classe ResultatArrete : bilan d'un arrêté de fin de journée
+class ResultatArrete:
+    def __init__(self, nombre_comptes, total_interets, total_frais, message):
+        self.nombre_comptes = nombre_comptes
+        self.total_interets = total_interets  # Centimes
+        self.total_frais = total_frais
+        self.message = message
+
+    def __str__(self):
+        return self.message
+
+
+# Classe ArreteJournalier : intérêts et frais du jour sur tous les comptes d'une TableComptes
+#
+# Les comptes sont traités par tranches de TAILLE_TRANCHE lignes, chacune sous tous les verrous de comptes :
+# calcul vectorisé sur la colonne des soldes, mise à jour des soldes, puis une écriture INTERETS et une
+# écriture FRAIS par compte concerné dans le journal. Avec un fichier de reprise, la ligne atteinte est
+# enregistrée après chaque tranche ; un arrêté interrompu reprend là où il s'était arrêté.
+class ArreteJournalier:
+    def __init__(self, table, journal=None, verrous=None, fichier_reprise=None, taille_tranche=TAILLE_TRANCHE):
+        self.table = table
+        self.journal = journal if journal is not None else table.journal
+        self.verrous = verrous if verrous is not None else table.verrous
+        self.fichier_reprise = fichier_reprise
+        self.taille_tranche = taille_tranche
+
+    def _lire_reprise(self):
+        if self.fichier_reprise is None or not os.path.exists(self.fichier_reprise):
+            return None
+        with open(self.fichier_reprise, encoding="utf-8") as fichier:
+            return json.load(fichier)
+
+    def _ecrire_reprise(self, etat):
+        """Remplace le fichier de reprise d'un seul coup : il n'est jamais lu à moitié écrit."""
+        if self.fichier_reprise is None:
+            return
+        temporaire = self.fichier_reprise + ".tmp"
+        with open(temporaire, "w", encoding="utf-8") as fichier:
+            json.dump(etat, fichier)
+            fichier.flush()
+            os.fsync(fichier.fileno())
+        os.replace(temporaire, self.fichier_reprise)
+
+    def executer(self, horodatage=None):
+        """Passe l'arrêté du jour de horodatage (maintenant par défaut) ; renvoie un ResultatArrete."""
+        horodatage = int(time.time()) if horodatage is None else horodatage
+        jour = horodatage // SECONDES_PAR_JOUR
+        etat = self._lire_reprise()
+        reprise = etat is not None and etat["jour"] == jour
+        if not reprise:
+            if horodatage < self.journal.dernier_horodatage:
+                return ResultatArrete(0, 0, 0,
+                                      "L'arrêté ne peut pas être daté avant la dernière écriture du journal.")
+            etat = {"jour": jour, "horodatage": horodatage, "ligne": 0, "interets": 0, "frais": 0}
+            # Écrit avant la première tranche : même interrompu tout de suite, l'arrêté reprend avec cet horodatage
+            self._ecrire_reprise(etat)
+        elif etat["ligne"] >= len(self.table):
+            return ResultatArrete(0, etat["interets"], etat["frais"], "L'arrêté du jour a déjà été passé.")
+        else:
+            # Écritures déjà passées datées au plus tôt de la première exécution : elle sert à les reconnaître
+            horodatage = etat.get("horodatage", horodatage)
+        nombre_comptes = len(self.table)
+        debut_arrete = etat["ligne"]
+        for debut in range(debut_arrete, nombre_comptes, self.taille_tranche):
+            fin = min(debut + self.taille_tranche, nombre_comptes)
+            interets, frais = self._traiter_tranche(debut, fin, horodatage, reprise and debut == debut_arrete)
+            etat["ligne"] = fin
+            etat["interets"] += interets
+            etat["frais"] += frais
+            self._ecrire_reprise(etat)
+        traites = nombre_comptes - debut_arrete
+        return ResultatArrete(traites, etat["interets"], etat["frais"],
+                              f"Arrêté passé sur {traites} comptes : {en_euros(etat['interets'])}€ d'intérêts, "
+                              f"{en_euros(etat['frais'])}€ de frais.")
+
+    def _traiter_tranche(self, debut, fin, horodatage, reprise):
+        """Passe une tranche ; renvoie les totaux d'intérêts et de frais qu'elle a au journal (reprise comprise)."""
+        table = self.table
+        journal = self.journal
+        with self.verrous.tous():
+            # Jamais avant la dernière écriture : l'historique de chaque compte reste dans l'ordre chronologique
+            horodatage_ecritures = max(horodatage, journal.dernier_horodatage)
+            if numpy is not None:
+                # Copies de la tranche : une vue sur les tableaux de la table empêcherait de leur ajouter des comptes
+                soldes = numpy.frombuffer(table.soldes, dtype=numpy.int64, count=fin - debut, offset=8 * debut).copy()
+                types = numpy.frombuffer(table.types, dtype=numpy.uint8, count=fin - debut, offset=debut).copy()
+            else:
+                soldes, types = table.soldes[debut:fin], table.types[debut:fin]
+            interets, frais = calculer(soldes, types)
+            deja_interets = deja_frais = 0
+            if reprise:
+                deja_interets, deja_frais = self._ignorer_deja_postes(debut, interets, frais, horodatage)
+            if numpy is not None:
+                table.soldes[debut:fin] = array("q", (soldes + interets - frais).tobytes())
+                lignes_interets = numpy.flatnonzero(interets)
+                lignes_frais = numpy.flatnonzero(frais)
+                montants_interets = array("q", interets[lignes_interets].tobytes())
+                montants_frais = array("q", frais[lignes_frais].tobytes())
+                lignes_interets = (lignes_interets + debut).tolist()
+                lignes_frais = (lignes_frais + debut).tolist()
+            else:
+                table.soldes[debut:fin] = array("q", (solde + interets_compte - frais_compte
+                                                      for solde, interets_compte, frais_compte in zip(soldes, interets, frais)))
+                lignes_interets = [debut + ligne for ligne, montant in enumerate(interets) if montant]
+                lignes_frais = [debut + ligne for ligne, montant in enumerate(frais) if montant]
+                montants_interets = array("q", [montant for montant in interets if montant])
+                montants_frais = array("q", [montant for montant in frais if montant])
+            journal.enregistrer_indices(INTERETS, table.indices_journal(lignes_interets), montants_interets,
+                                        horodatage_ecritures)
+            journal.enregistrer_indices(FRAIS, table.indices_journal(lignes_frais), montants_frais,
+                                        horodatage_ecritures)
+        return sum(montants_interets) + deja_interets, sum(montants_frais) + deja_frais
+
+    def _ignorer_deja_postes(self, debut, interets, frais, horodatage):
+        """Après une interruption, annule les écritures de la tranche déjà passées au journal (et restaurées).
+
+        Elles sont reconnues à leur type, parmi les transactions du compte datées au plus tôt de horodatage
+        (l'horodatage de la première exécution) ; renvoie les totaux d'intérêts et de frais qu'elles représentent.
+        """
+        journal = self.journal
+        horodatages, types, montants = journal.horodatages, journal.types, journal.montants
+        deja_interets = deja_frais = 0
+        for ligne in range(len(interets)):
+            positions = journal.positions(f"{self.table.cartes[debut + ligne]:016d}")
+            for indice in range(len(positions) - 1, -1, -1):
+                position = positions[indice]
+                if horodatages[position] < horodatage:
+                    break  # Les horodatages d'un compte suivent l'ordre d'arrivée : rien de plus ancien ne compte
+                if types[position] == INTERETS:
+                    interets[ligne] = 0
+                    deja_interets += montants[position]
+                elif types[position] == FRAIS:
+                    frais[ligne] = 0
+                    deja_frais += montants[position]
+        return deja_interets, deja_frais
+
+
+def arreter_comptes(comptes, horodatage=None, journal=None, verrous=None):
+    """Passe l'arrêté sur des objets CompteBancaire (registre en mémoire) : mêmes règles, sans reprise."""
+    horodatage = int(time.time()) if horodatage is None else horodatage
+    journal = journal if journal is not None else journal_par_defaut
+    comptes = [compte for compte in comptes if getattr(compte, "type_compte", None) in TYPES_COMPTE]
+    with (verrous if verrous is not None else verrous_par_defaut).tous():
+        horodatage = max(horodatage, journal.dernier_horodatage)  # Historique de chaque compte dans l'ordre
+        soldes = array("q", (en_centimes(compte.solde) for compte in comptes))
+        types = array("B", (TYPES_COMPTE.index(compte.type_compte) for compte in comptes))
+        interets, frais = calculer(soldes, types)
+        if numpy is not None:
+            interets, frais = interets.tolist(), frais.tolist()
+        for compte, solde, interets_compte, frais_compte in zip(comptes, soldes, interets, frais):
+            if interets_compte or frais_compte:
+                compte.solde = en_euros(solde + interets_compte - frais_compte)
+        journal.enregistrer_colonnes(INTERETS, [compte.numero_carte for compte, montant in zip(comptes, interets)
+                                                if montant], [montant for montant in interets if montant], horodatage)
+        journal.enregistrer_colonnes(FRAIS, [compte.numero_carte for compte, montant in zip(comptes, frais) if montant],
+                                     [montant for montant in frais if montant], horodatage)
+    return ResultatArrete(len(comptes), sum(interets), sum(frais),
+                          f"Arrêté passé sur {len(comptes)} comptes : {en_euros(sum(interets))}€ d'intérêts, "
+                          f"{en_euros(sum(frais))}€ de frais.")
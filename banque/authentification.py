@@ -0,0 +1,232 @@
+import functools
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+# Paramètres de dérivation : volontairement lents (~50 à 100 ms par essai) pour freiner les attaques hors ligne
+SCRYPT_N = 2 ** 14
+SCRYPT_R = 8
+SCRYPT_P = 1
+ITERATIONS_PBKDF2 = 600000  # Si l'OpenSSL utilisé n'offre pas scrypt
+LONGUEUR_SEL = 16
+LONGUEUR_CLE = 32
+# hashlib, hmac et secrets sont importés au premier usage : ils pèsent sur le temps d'import du paquet
+
+DUREE_SESSION = 15 * 60  # Secondes
+CAPACITE_SESSIONS = 100000
+ESSAIS_PIN = 3
+BLOCAGE_PIN = 5 * 60  # Secondes, doublées à chaque nouveau blocage
+ESSAIS_MOT_DE_PASSE = 5
+BLOCAGE_MOT_DE_PASSE = 60
+
+
+def _deriver(secret, algorithme, parametres, sel):
+    import hashlib
+
+    if algorithme == "scrypt":
+        n, r, p = parametres
+        return hashlib.scrypt(secret.encode(), salt=sel, n=n, r=r, p=p, maxmem=256 * n * r, dklen=LONGUEUR_CLE)
+    (iterations,) = parametres
+    return hashlib.pbkdf2_hmac("sha256", secret.encode(), sel, iterations, LONGUEUR_CLE)
+
+
+def hacher_secret(secret):
+    """Renvoie l'empreinte salée d'un mot de passe ou d'un PIN : « algorithme$paramètres$sel$clé »."""
+    import hashlib
+
+    sel = os.urandom(LONGUEUR_SEL)
+    if hasattr(hashlib, "scrypt"):
+        algorithme, parametres = "scrypt", (SCRYPT_N, SCRYPT_R, SCRYPT_P)
+    else:
+        algorithme, parametres = "pbkdf2", (ITERATIONS_PBKDF2,)
+    cle = _deriver(secret, algorithme, parametres, sel)
+    return "$".join((algorithme, *map(str, parametres), sel.hex(), cle.hex()))
+
+
+# Paramètres acceptés dans une empreinte stockée ou importée : une empreinte ne peut pas imposer un calcul plus
+# coûteux (ou invalide) que ceux produits par hacher_secret
+PARAMETRES_ACCEPTES = {"scrypt": {(SCRYPT_N, SCRYPT_R, SCRYPT_P)}, "pbkdf2": {(ITERATIONS_PBKDF2,)}}
+_HEXADECIMAL = re.compile(r"[0-9a-f]+")
+
+
+def _decomposer(empreinte):
+    """Renvoie (algorithme, paramètres, sel, clé) d'une empreinte bien formée, ou None."""
+    morceaux = empreinte.split("$") if isinstance(empreinte, str) else ()
+    if len(morceaux) < 4:
+        return None
+    algorithme, *parametres, sel, cle = morceaux
+    if not all(morceau.isascii() and morceau.isdigit() for morceau in parametres):
+        return None
+    parametres = tuple(map(int, parametres))
+    if parametres not in PARAMETRES_ACCEPTES.get(algorithme, ()):
+        return None
+    if len(sel) != 2 * LONGUEUR_SEL or len(cle) != 2 * LONGUEUR_CLE or not _HEXADECIMAL.fullmatch(sel + cle):
+        return None
+    return algorithme, parametres, bytes.fromhex(sel), bytes.fromhex(cle)
+
+
+def est_empreinte(valeur):
+    """Indique si une valeur est une empreinte au format de hacher_secret, avec des paramètres acceptés."""
+    return _decomposer(valeur) is not None
+
+
+def proteger(secret):
+    """Renvoie l'empreinte d'un secret saisi, toujours recalculée même s'il ressemble à une empreinte.
+
+    Un secret vide reste vide : aucun mot de passe ne permet alors de se connecter.
+    """
+    if not secret:
+        return ""
+    return hacher_secret(secret)
+
+
+def empreinte_acceptee(empreinte):
+    """Renvoie une empreinte déjà calculée (import, stockage) après vérification de son format et de ses paramètres.
+
+    Seul chemin par lequel une empreinte entre telle quelle : ValueError si elle n'est pas acceptée.
+    """
+    if not est_empreinte(empreinte):
+        raise ValueError("Empreinte de mot de passe invalide.")
+    return empreinte
+
+
+def verifier_secret(secret, empreinte):
+    """Compare un secret saisi à son empreinte, en temps constant ; False si l'empreinte est invalide."""
+    import hashlib
+    import hmac
+
+    morceaux = _decomposer(empreinte)
+    if morceaux is None or not isinstance(secret, str):
+        return False
+    algorithme, parametres, sel, cle = morceaux
+    if algorithme == "scrypt" and not hasattr(hashlib, "scrypt"):
+        return False
+    return hmac.compare_digest(_deriver(secret, algorithme, parametres, sel), cle)
+
+
+# Classe CacheSessions : jetons de session en mémoire, les plus anciens sont évincés au-delà de la capacité
+class CacheSessions:
+    def __init__(self, capacite=CAPACITE_SESSIONS, duree=DUREE_SESSION):
+        self.capacite = capacite
+        self.duree = duree
+        self._sessions = OrderedDict()  # Jeton -> (identité, expiration), du moins au plus récemment utilisé
+        self._verrou = threading.Lock()
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def ouvrir(self, identite):
+        """Crée une session et renvoie son jeton."""
+        import secrets
+
+        jeton = secrets.token_urlsafe(32)
+        with self._verrou:
+            self._sessions[jeton] = (identite, time.monotonic() + self.duree)
+            if len(self._sessions) > self.capacite:
+                self._sessions.popitem(last=False)
+        return jeton
+
+    def verifier(self, jeton):
+        """Renvoie l'identité associée à un jeton valide, ou None."""
+        with self._verrou:
+            session = self._sessions.get(jeton)
+            if session is None:
+                return None
+            if session[1] < time.monotonic():
+                del self._sessions[jeton]
+                return None
+            self._sessions.move_to_end(jeton)
+            return session[0]
+
+    def fermer(self, jeton):
+        """Supprime une session ; renvoie False si elle n'existait pas."""
+        with self._verrou:
+            return self._sessions.pop(jeton, None) is not None
+
+
+# Classe LimiteurTentatives : bloque un compte après trop d'échecs, de plus en plus longtemps
+#
+# Une tentative est comptée avant la vérification : des essais lancés en parallèle ne peuvent pas
+# dépasser la limite en attendant tous la fin du calcul de l'empreinte.
+class LimiteurTentatives:
+    def __init__(self, essais=ESSAIS_PIN, blocage=BLOCAGE_PIN):
+        self.essais = essais
+        self.blocage = blocage
+        self._etats = {}  # Clé -> [échecs + tentatives en cours, fin du blocage, nombre de blocages]
+        self._verrou = threading.Lock()
+
+    def autoriser(self, cle):
+        """Réserve une tentative ; renvoie False si le compte est bloqué."""
+        with self._verrou:
+            etat = self._etats.setdefault(cle, [0, 0.0, 0])
+            if etat[1] > time.monotonic() or etat[0] >= self.essais:
+                return False
+            etat[0] += 1
+            return True
+
+    def echec(self, cle):
+        """Enregistre l'échec de la tentative réservée ; la dernière autorisée déclenche un blocage."""
+        with self._verrou:
+            etat = self._etats.get(cle)
+            if etat is not None and etat[0] >= self.essais:
+                etat[2] += 1
+                etat[1] = time.monotonic() + self.blocage * 2 ** (etat[2] - 1)
+                etat[0] = 0
+
+    def reussite(self, cle):
+        """Oublie les échecs d'un compte après une tentative réussie."""
+        with self._verrou:
+            self._etats.pop(cle, None)
+
+
+# Classe Authentification : connexion par mot de passe (lente, une fois) puis par jeton de session (immédiate)
+class Authentification:
+    def __init__(self, registre, sessions=None, limiteur=None):
+        self.registre = registre
+        self.sessions = sessions if sessions is not None else CacheSessions()
+        if limiteur is None:
+            limiteur = LimiteurTentatives(ESSAIS_MOT_DE_PASSE, BLOCAGE_MOT_DE_PASSE)
+        self.limiteur = limiteur
+
+    def connecter(self, login, mot_de_passe):
+        """Vérifie le mot de passe d'un client et renvoie un jeton de session, ou None."""
+        client = self.registre.trouver_par_login(login)
+        return self._connecter(login, mot_de_passe, client and client.mot_de_passe, client and client.compte)
+
+    def connecter_entreprise(self, compte_id, mot_de_passe):
+        """Vérifie le mot de passe d'une entreprise et renvoie un jeton de session, ou None."""
+        entreprise = self.registre.trouver_par_compte_id(compte_id)
+        return self._connecter(f"entreprise:{compte_id}", mot_de_passe, entreprise and entreprise.mot_de_passe,
+                               entreprise)
+
+    def _connecter(self, cle, mot_de_passe, empreinte, compte):
+        if not self.limiteur.autoriser(cle):
+            return None
+        # Un identifiant inconnu coûte le même calcul : la durée de réponse ne révèle pas les comptes existants
+        if not verifier_secret(mot_de_passe, empreinte or _empreinte_leurre()) or compte is None:
+            self.limiteur.echec(cle)
+            return None
+        self.limiteur.reussite(cle)
+        return self.sessions.ouvrir(compte)
+
+    def verifier_jeton(self, jeton):
+        """Renvoie le compte (CompteBancaire ou Entreprise) d'une session valide, ou None."""
+        return self.sessions.verifier(jeton)
+
+    def deconnecter(self, jeton):
+        """Ferme une session ; renvoie False si le jeton était inconnu ou expiré."""
+        return self.sessions.fermer(jeton)
+
+
+@functools.lru_cache(maxsize=None)
+def _empreinte_leurre():
+    """Empreinte d'un secret aléatoire, calculée au premier besoin."""
+    import secrets
+
+    return hacher_secret(secrets.token_hex(16))
+
+
+# Limiteur partagé des essais de PIN
+limiteur_pin = LimiteurTentatives()
@@ -0,0 +1,64 @@
+import sys
+
+from .modele import Client
+
+
+# Fonction d'inscription utilisateur
+def inscription_utilisateur(registre=None):
+    """Permet à l'utilisateur de s'inscrire en fournissant ses informations."""
+    print("Bienvenue dans le système d'inscription bancaire!")
+    
+    # Demande des informations à l'utilisateur
+    nom = input("Entrez votre nom complet: ")
+    adresse = input("Entrez votre adresse: ")
+    telephone = input("Entrez votre numéro de téléphone: ")
+    cnic = input("Entrez votre CNIC (13 chiffres): ")
+    login = input("Entrez votre login: ")
+    mot_de_passe = input("Entrez votre mot de passe: ")
+    limite_retrait = float(input("Entrez votre limite quotidienne estimée de retrait: "))
+    
+    # Création de l'objet Client
+    client = Client(nom, adresse, telephone, cnic, login, mot_de_passe, limite_retrait)
+    
+    # Vérification des informations et création du compte
+    message = client.creer_compte(registre)
+    print(message)
+    
+    if client.compte:
+        # Si le compte est créé, on demande à l'utilisateur d'entrer un PIN
+        pin = input("Entrez un numéro PIN à 4 chiffres: ")
+        pin_message = client.compte.entrer_pin(pin)
+        print(pin_message)
+        
+        # Affichage des informations du compte
+        print(f"Numéro de carte : {client.compte.numero_carte}")
+        print(f"Type de compte : {client.compte.type_compte}")
+    return client
+
+
+def main(arguments=None):
+    """Point d'entrée en ligne de commande : inscription (par défaut), import en masse ou service."""
+    arguments = sys.argv[1:] if arguments is None else arguments
+    commande = arguments[0] if arguments else "inscription"
+    options = [argument for argument in arguments[1:] if argument.startswith("--")]
+    positionnels = [argument for argument in arguments[1:] if not argument.startswith("--")]
+    if commande == "inscription":
+        inscription_utilisateur()
+    elif commande == "importer" and len(positionnels) >= 2:
+        from .importation_clients import importer_clients, lire_cartes
+        processus = int(positionnels[2]) if len(positionnels) > 2 else None
+        # --exclure=resultats.csv : cartes déjà attribuées par un import précédent, à ne pas réémettre
+        precedents = [option[len("--exclure="):] for option in options if option.startswith("--exclure=")]
+        acceptes, rejetes = importer_clients(positionnels[0], positionnels[1], processus,
+                                             cartes_existantes=(carte for chemin in precedents
+                                                                for carte in lire_cartes(chemin)))
+        print(f"{acceptes} comptes créés, {rejetes} demandes rejetées.")
+    elif commande == "service":
+        import asyncio
+        from .service_banque import servir
+        asyncio.run(servir(int(positionnels[0]) if positionnels else 8765, "--metriques" in options))
+    else:
+        print("Usage : banque [inscription | importer demandes.csv resultats.csv [processus] "
+              "[--exclure=resultats_precedents.csv ...] | service [port] [--metriques]]")
+        return 1
+    return 0
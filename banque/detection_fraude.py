@@ -0,0 +1,246 @@
+import queue
+import threading
+from array import array
+from collections import deque
+
+from .journal_transactions import (DEBLOCAGE, GEL, PREFIXE_ENTREPRISE, TRANSFERT, TRANSFERT_ENTREPRISE, formater_montant,
+                                   journal_par_defaut)
+
+# Motifs d'alerte
+VITESSE = "vitesse"
+MONTANT_INHABITUEL = "montant inhabituel"
+NOUVELLES_CONTREPARTIES = "nouvelles contreparties"
+TRANSFERT_CIRCULAIRE = "transfert circulaire"
+
+DUREE_VITESSE = 60  # Secondes de la fenêtre de comptage des opérations
+SEUIL_VITESSE = 20  # Opérations tolérées par compte et par fenêtre
+LISSAGE = 0.05  # Poids d'une nouvelle observation dans les moyennes mobiles exponentielles
+ECART_MAXIMAL = 4.0  # Écarts-types au-delà desquels un montant est inhabituel
+OBSERVATIONS_MINIMALES = 10  # Historique requis avant de juger un montant ou un taux
+SEUIL_NOUVELLES_CONTREPARTIES = 0.8  # Part (lissée) des transferts vers des inconnus
+NOMBRE_ORIGINES = 4  # Longueur du chemin de l'argent retenu par compte, pour repérer les circuits
+DUREE_CIRCUIT = 3600  # Un circuit n'est signalé que si l'argent revient en moins d'une heure
+MOTIFS_GEL = (VITESSE, TRANSFERT_CIRCULAIRE)
+_ECART_CARRE = ECART_MAXIMAL ** 2
+_CHEMIN_VIDE = array("q", bytes(8 * (NOMBRE_ORIGINES - 1)))
+
+
+# Classe Alerte : anomalie repérée sur un compte
+class Alerte:
+    __slots__ = ("cle", "motif", "valeur", "horodatage")
+
+    def __init__(self, cle, motif, valeur, horodatage):
+        self.cle = cle
+        self.motif = motif
+        self.valeur = valeur
+        self.horodatage = horodatage
+
+    def __str__(self):
+        return f"Alerte {self.motif} sur le compte {self.cle} : {self.valeur}"
+
+
+def _empreinte(cle):
+    """Empreinte non nulle d'une clé de compte (0 marque une case vide)."""
+    return hash(cle) | 1
+
+
+# Classe DetecteurFraude : statistiques incrémentales par compte, mises à jour à chaque événement du journal
+#
+# Chaque compte observé occupe une ligne de tableaux (une centaine d'octets quel que soit son historique) :
+# - vitesse : nombre d'opérations dans la fenêtre de DUREE_VITESSE secondes en cours ;
+# - montants : moyenne et variance mobiles exponentielles, un montant à plus de ECART_MAXIMAL écarts-types
+#   au-dessus de la moyenne est signalé ;
+# - contreparties : masque de 64 bits des contreparties déjà vues (approché : deux clés peuvent partager un bit)
+#   et part lissée des transferts vers une contrepartie nouvelle ;
+# - circuits : le chemin suivi par le dernier transfert reçu (ses NOMBRE_ORIGINES derniers émetteurs,
+#   de proche en proche) ; un transfert vers l'un d'eux referme un circuit A -> B -> ... -> A.
+class DetecteurFraude:
+    def __init__(self, registre=None, gel_automatique=False, motifs_gel=MOTIFS_GEL, nombre_alertes=10000):
+        self.registre = registre
+        self.gel_automatique = gel_automatique and registre is not None
+        self.motifs_gel = frozenset(motifs_gel)
+        self.alertes = deque(maxlen=nombre_alertes)  # Les plus anciennes sont oubliées
+        self.nombre_alertes = 0
+        self.nombre_evenements = 0
+        self.geles = set()  # Comptes gelés (par le détecteur ou à la main), pour ne pas les geler deux fois
+        self._lignes = {}
+        self.fenetres = array("I")  # Début de la fenêtre de vitesse en cours
+        self.operations = array("I")  # Opérations dans cette fenêtre
+        self.observations = array("I")  # Montants pris en compte dans la moyenne
+        self.moyennes = array("d")
+        self.variances = array("d")
+        self.transferts = array("I")
+        self.contreparties_vues = array("Q")
+        self.taux_nouvelles = array("d")
+        self.origines = array("q")  # NOMBRE_ORIGINES empreintes par ligne, de l'émetteur le plus proche au plus loin
+        self.dates_origines = array("I")  # Date d'arrivée du dernier transfert reçu
+        self._colonnes = (self.fenetres, self.operations, self.observations, self.transferts, self.moyennes,
+                          self.variances, self.contreparties_vues, self.taux_nouvelles, self.dates_origines)
+        self._origines_vides = array("q", bytes(8 * NOMBRE_ORIGINES))
+        self._verrou = threading.Lock()  # Ajout des lignes seulement, comme pour PlafondsRetrait
+        self._rejeu = False
+        # Le gel se fait dans un thread à part : l'événement arrive alors que le verrou du compte est pris
+        self._a_geler = queue.Queue()
+        if self.gel_automatique:
+            threading.Thread(target=self._boucle_gel, daemon=True).start()
+
+    def __len__(self):
+        return len(self._lignes)
+
+    def _ligne(self, cle):
+        ligne = self._lignes.get(cle)
+        if ligne is None:
+            with self._verrou:
+                ligne = self._lignes.get(cle)
+                if ligne is None:
+                    ligne = len(self.operations)
+                    for colonne in self._colonnes:
+                        colonne.append(0)
+                    self.origines.extend(self._origines_vides)
+                    self._lignes[cle] = ligne
+        return ligne
+
+    def abonner(self, journal=None):
+        """Branche le détecteur sur un journal pour suivre ses événements au fil de l'eau."""
+        (journal if journal is not None else journal_par_defaut).abonner(self.observer, self.observer_lot)
+
+    def observer(self, type_evenement, centimes, cle, cle_contrepartie, horodatage, compter=True):
+        """Met à jour les statistiques du compte à l'origine d'un événement (abonné du journal)."""
+        if type_evenement >= GEL:  # Gels, écritures de la banque (arrêté, prêts) : hors comportement
+            if type_evenement == DEBLOCAGE:
+                self.geles.discard(cle)
+            elif type_evenement == GEL:
+                self.geles.add(cle)
+            return
+        self.nombre_evenements += 1
+        ligne = self._lignes.get(cle)
+        if ligne is None:
+            ligne = self._ligne(cle)
+
+        if compter:
+            fenetre = horodatage - horodatage % DUREE_VITESSE
+            fenetres = self.fenetres
+            if fenetres[ligne] != fenetre:
+                fenetres[ligne] = fenetre
+                self.operations[ligne] = 1
+            else:
+                operations = self.operations[ligne] + 1
+                self.operations[ligne] = operations
+                if operations == SEUIL_VITESSE + 1:  # Une seule alerte par fenêtre
+                    self._alerter(cle, VITESSE, f"plus de {SEUIL_VITESSE} opérations en {DUREE_VITESSE} s",
+                                  horodatage)
+
+        moyennes = self.moyennes
+        variances = self.variances
+        moyenne = moyennes[ligne]
+        variance = variances[ligne]
+        ecart = centimes - moyenne
+        observations = self.observations[ligne]
+        if observations >= OBSERVATIONS_MINIMALES and ecart > 0 and ecart * ecart > _ECART_CARRE * variance:
+            self._alerter(cle, MONTANT_INHABITUEL,
+                          f"{formater_montant(centimes)} pour une moyenne de {formater_montant(round(moyenne))}",
+                          horodatage)
+        increment = LISSAGE * ecart
+        moyennes[ligne] = moyenne + increment
+        variances[ligne] = (1 - LISSAGE) * (variance + ecart * increment)
+        self.observations[ligne] = observations + 1
+
+        if type_evenement == TRANSFERT or type_evenement == TRANSFERT_ENTREPRISE:
+            self._transfert(ligne, cle, cle_contrepartie, horodatage)
+
+    def observer_lot(self, evenements):
+        """Variante groupée : un lot compte pour une seule opération dans la vitesse du compte émetteur."""
+        compter = True
+        for evenement in evenements:
+            self.observer(*evenement, compter)
+            compter = False
+
+    def _transfert(self, ligne, cle, cle_contrepartie, horodatage):
+        empreinte = _empreinte(cle_contrepartie)
+
+        # Part des transferts vers des contreparties jamais vues
+        bit = 1 << (empreinte & 63)
+        vues = self.contreparties_vues[ligne]
+        precedent = self.taux_nouvelles[ligne]
+        taux = precedent + LISSAGE * ((not vues & bit) - precedent)
+        self.contreparties_vues[ligne] = vues | bit
+        self.taux_nouvelles[ligne] = taux
+        transferts = self.transferts[ligne] + 1
+        self.transferts[ligne] = transferts
+        if transferts >= OBSERVATIONS_MINIMALES and taux > SEUIL_NOUVELLES_CONTREPARTIES >= precedent:
+            # Signalé au franchissement du seuil seulement
+            self._alerter(cle, NOUVELLES_CONTREPARTIES, f"{taux:.0%} de contreparties nouvelles", horodatage)
+
+        # Circuits : la contrepartie est-elle sur le chemin récent de l'argent arrivé sur ce compte ?
+        # Le premier maillon est exclu : un simple aller-retour (remboursement) n'est pas un circuit
+        origines = self.origines
+        dates = self.dates_origines
+        debut = ligne * NOMBRE_ORIGINES
+        destination = self._lignes.get(cle_contrepartie)
+        if destination is None:
+            destination = self._ligne(cle_contrepartie)
+        arrivee = destination * NOMBRE_ORIGINES
+        if dates[ligne] >= horodatage - DUREE_CIRCUIT:
+            if empreinte in origines[debut + 1:debut + NOMBRE_ORIGINES]:
+                self._alerter(cle, TRANSFERT_CIRCULAIRE, f"les fonds reviennent à {cle_contrepartie}", horodatage)
+            # Le destinataire reprend le chemin de l'émetteur, prolongé par l'émetteur lui-même
+            origines[arrivee + 1:arrivee + NOMBRE_ORIGINES] = origines[debut:debut + NOMBRE_ORIGINES - 1]
+        else:
+            origines[arrivee + 1:arrivee + NOMBRE_ORIGINES] = _CHEMIN_VIDE
+        origines[arrivee] = _empreinte(cle)
+        dates[destination] = horodatage
+
+    def _alerter(self, cle, motif, valeur, horodatage):
+        alerte = Alerte(cle, motif, valeur, horodatage)
+        self.alertes.append(alerte)
+        self.nombre_alertes += 1
+        if self.gel_automatique and not self._rejeu and motif in self.motifs_gel and cle not in self.geles:
+            self.geles.add(cle)
+            self._a_geler.put(cle)
+        return alerte
+
+    def _boucle_gel(self):
+        while True:
+            cle = self._a_geler.get()
+            try:
+                if cle.startswith(PREFIXE_ENTREPRISE):
+                    continue  # Les comptes entreprise n'ont pas de gel
+                compte = self.registre.trouver_par_carte(cle)
+                if compte is not None:
+                    compte.geler_compte()
+            except Exception:
+                pass  # Un gel impossible ne doit pas arrêter le seul thread qui applique les suivants
+            finally:
+                self._a_geler.task_done()
+
+    def attendre_gels(self):
+        """Attend que les gels automatiques déjà décidés soient appliqués."""
+        self._a_geler.join()
+
+    def rejouer(self, journal, debut=0):
+        """Passe un journal existant (historique, ou relu par restaurer) dans le détecteur, sans geler de compte.
+
+        Renvoie les alertes produites par le rejeu.
+        """
+        deja_produites = self.nombre_alertes
+        self._rejeu = True
+        try:
+            cles = journal.cles
+            observer = self.observer
+            for type_evenement, centimes, compte, contrepartie, horodatage in zip(
+                    journal.types[debut:], journal.montants[debut:], journal.comptes[debut:],
+                    journal.contreparties[debut:], journal.horodatages[debut:]):
+                observer(type_evenement, centimes, cles[compte],
+                         cles[contrepartie] if type_evenement == TRANSFERT or type_evenement == TRANSFERT_ENTREPRISE
+                         else None, horodatage)
+        finally:
+            self._rejeu = False
+        produites = min(self.nombre_alertes - deja_produites, len(self.alertes))
+        return list(self.alertes)[len(self.alertes) - produites:]
+
+
+def demarrer_detection(journal=None, registre=None, gel_automatique=True):
+    """Crée un détecteur branché sur le journal ; avec un registre, il gèle les comptes suspects."""
+    detecteur = DetecteurFraude(registre, gel_automatique)
+    detecteur.abonner(journal)
+    return detecteur
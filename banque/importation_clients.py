@@ -0,0 +1,208 @@
+import csv
+import json
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from .allocateur_cartes import allocateur_par_defaut
+from .authentification import est_empreinte
+from .modele import MOTIF_CNIC, MOTIF_TELEPHONE, Client, CompteBancaire
+from .registre_comptes import COMPTE_ENREGISTRE
+
+CHAMPS_RESULTAT = ("ligne", "statut", "message", "numero_carte", "type_compte", "empreinte")
+CHAMPS_TEXTE = ("nom", "adresse", "telephone", "cnic", "login", "mot_de_passe", "empreinte")
+ERREUR_LECTURE = "_erreur"  # Clé d'une demande illisible : la ligne sera rejetée avec ce motif
+
+
+def lire_demandes(chemin):
+    """Lit les demandes d'un fichier CSV ou JSONL ligne par ligne, sans tout charger en mémoire.
+
+    Une ligne JSONL illisible ou qui n'est pas un objet donne une demande marquée ERREUR_LECTURE.
+    """
+    with open(chemin, encoding="utf-8", newline="") as fichier:
+        if chemin.endswith(".jsonl"):
+            for ligne in fichier:
+                if ligne.strip():
+                    try:
+                        demande = json.loads(ligne)
+                    except ValueError:
+                        demande = {ERREUR_LECTURE: "Ligne JSON illisible"}
+                    if not isinstance(demande, dict):
+                        demande = {ERREUR_LECTURE: "La ligne n'est pas un objet JSON"}
+                    yield demande
+        else:
+            yield from csv.DictReader(fichier)
+
+
+def lire_cartes(chemin):
+    """Lit les numéros de carte des lignes acceptées d'un fichier de résultats d'import."""
+    with open(chemin, encoding="utf-8", newline="") as fichier:
+        for resultat in csv.DictReader(fichier):
+            if resultat.get("statut") == "accepté" and resultat.get("numero_carte"):
+                yield resultat["numero_carte"]
+
+
+def decouper_en_lots(demandes, taille_lot):
+    """Regroupe les demandes en lots numérotés (numéro de la première ligne, demandes)."""
+    demandes = iter(demandes)
+    premiere_ligne = 1
+    while True:
+        lot = list(islice(demandes, taille_lot))
+        if not lot:
+            return
+        yield premiere_ligne, lot
+        premiere_ligne += len(lot)
+
+
+def _limite(valeur):
+    """Convertit la limite de retrait en nombre, ou None si elle est illisible."""
+    try:
+        return float(valeur)
+    except (TypeError, ValueError):
+        return None
+
+
+def _erreur_forme(demande):
+    """Motif de rejet d'une demande illisible ou dont un champ n'est pas un texte (nombre, liste...), sinon None."""
+    if ERREUR_LECTURE in demande:
+        return demande[ERREUR_LECTURE]
+    if not all(demande.get(champ) is None or isinstance(demande[champ], str) for champ in CHAMPS_TEXTE):
+        return "Champ de type invalide"
+    return None
+
+
+def valider_lot(demandes):
+    """Valide un lot colonne par colonne avec les mêmes règles que Client.verifier_information."""
+    telephone_valide = MOTIF_TELEPHONE.match
+    cnic_valide = MOTIF_CNIC.match
+    erreurs = [_erreur_forme(d) for d in demandes]
+    demandes = [d if erreur is None else {} for d, erreur in zip(demandes, erreurs)]  # Plus rien à contrôler
+    noms = [len(d.get("nom") or "") >= 3 for d in demandes]
+    telephones = [bool(telephone_valide(d.get("telephone") or "")) for d in demandes]
+    cnics = [bool(cnic_valide(d.get("cnic") or "")) for d in demandes]
+    limites = [_limite(d.get("limite_retrait")) for d in demandes]
+    empreintes = [not d.get("empreinte") or est_empreinte(d["empreinte"]) for d in demandes]
+    messages = []
+    for erreur, nom, telephone, cnic, limite, empreinte in zip(erreurs, noms, telephones, cnics, limites, empreintes):
+        if erreur is not None:
+            messages.append(erreur)
+        elif not nom:
+            messages.append("Nom invalide")
+        elif not telephone:
+            messages.append("Numéro de téléphone invalide")
+        elif not cnic:
+            messages.append("CNIC invalide")
+        elif limite is None or not 0 < limite <= 100000:
+            messages.append("Limite de retrait invalide")
+        elif not empreinte:
+            messages.append("Empreinte de mot de passe invalide")
+        else:
+            messages.append(None)
+    return messages, limites
+
+
+def reserver_numeros(allocateur, nombre):
+    """Réserve un numéro libre par demande du lot (le bloc s'allonge d'autant qu'il contient de cartes existantes).
+
+    RuntimeError si l'allocateur n'a plus assez de numéros.
+    """
+    return allocateur.reserver_bloc(nombre)
+
+
+def traiter_lot(premiere_ligne, demandes, bloc):
+    """Valide un lot et crée les comptes acceptés avec les numéros du bloc réservé."""
+    messages, limites = valider_lot(demandes)
+    numeros = bloc.numeros()
+    if len(numeros) < messages.count(None):
+        raise ValueError(f"Bloc de {len(numeros)} numéros de carte pour {messages.count(None)} comptes à créer.")
+    numeros = iter(numeros)
+    resultats = []
+    clients = []
+    for decalage, (demande, message, limite) in enumerate(zip(demandes, messages, limites)):
+        ligne = premiere_ligne + decalage
+        if message is not None:
+            resultats.append((ligne, "rejeté", message, "", "", ""))
+            continue
+        client = Client(demande["nom"], demande.get("adresse") or "", demande["telephone"],
+                        demande["cnic"], demande.get("login") or "", demande.get("mot_de_passe") or "", limite,
+                        demande.get("empreinte") or None)
+        client.compte = CompteBancaire(client, next(numeros))
+        clients.append(client)
+        resultats.append((ligne, "accepté", "Compte créé avec succès.",
+                          client.compte.numero_carte, client.compte.type_compte, client.mot_de_passe))
+    return resultats, clients
+
+
+def enregistrer_lot(registre, resultats, clients):
+    """Indexe les comptes acceptés d'un lot ; une ligne que le registre refuse (CNIC ou login déjà pris) est rejetée."""
+    clients = iter(clients)
+    for indice, resultat in enumerate(resultats):
+        if resultat[1] == "accepté":
+            message = registre.enregistrer_client(next(clients))
+            if message != COMPTE_ENREGISTRE:
+                resultats[indice] = (resultat[0], "rejeté", message, "", "", "")
+
+
+def _traiter_lot_distant(premiere_ligne, demandes, bloc):
+    """Version pour le pool de processus : seuls les résultats reviennent au processus principal.
+
+    Ils portent l'empreinte calculée ici : avec la ligne d'entrée, c'est tout ce qu'il faut pour recréer le compte.
+    """
+    return traiter_lot(premiere_ligne, demandes, bloc)[0]
+
+
+def importer_clients(chemin_entree, chemin_sortie, processus=None, taille_lot=10000,
+                     registre=None, allocateur=None, cartes_existantes=None):
+    """Importe un fichier de demandes et écrit le résultat (accepté/rejeté) de chaque ligne.
+
+    Le mot de passe d'une demande est donné soit en clair (colonne mot_de_passe), soit par son empreinte déjà
+    calculée (colonne empreinte, au format de hacher_secret et avec ses paramètres). Un mot de passe en clair coûte
+    une dérivation de clé (~65 ms de calcul) : une migration de plusieurs millions de comptes doit fournir les
+    empreintes (5 millions de mots de passe en clair représentent environ 90 heures de calcul).
+    Une empreinte invalide fait rejeter la ligne.
+
+    Avec un registre, les comptes sont créés dans ce processus pour y être indexés ;
+    sinon les lots sont répartis sur un pool de processus et les comptes n'existent que dans le fichier de
+    résultats : numéro de carte, type de compte et empreinte du mot de passe de chaque ligne acceptée, à joindre
+    à la demande par le numéro de ligne. Ce fichier contient donc des empreintes et se protège comme tel.
+
+    cartes_existantes donne les numéros déjà attribués (par exemple lire_cartes sur les résultats des imports
+    précédents) : l'allocateur ne les réémet pas, même dans un nouveau processus.
+    """
+    allocateur = allocateur or allocateur_par_defaut
+    if cartes_existantes is not None:
+        allocateur.marquer_utilises(cartes_existantes)
+    lots = decouper_en_lots(lire_demandes(chemin_entree), taille_lot)
+    acceptes = rejetes = 0
+    with open(chemin_sortie, "w", encoding="utf-8", newline="") as sortie:
+        ecrivain = csv.writer(sortie)
+        ecrivain.writerow(CHAMPS_RESULTAT)
+
+        def ecrire(resultats):
+            nonlocal acceptes, rejetes
+            ecrivain.writerows(resultats)
+            nombre_acceptes = sum(1 for resultat in resultats if resultat[1] == "accepté")
+            acceptes += nombre_acceptes
+            rejetes += len(resultats) - nombre_acceptes
+
+        if registre is not None or processus == 1:
+            for premiere_ligne, demandes in lots:
+                resultats, clients = traiter_lot(premiere_ligne, demandes, reserver_numeros(allocateur, len(demandes)))
+                if registre is not None:
+                    enregistrer_lot(registre, resultats, clients)
+                ecrire(resultats)
+        else:
+            processus = processus or os.cpu_count() or 1
+            with ProcessPoolExecutor(processus) as pool:
+                # Nombre de lots en cours borné : la lecture du fichier suit le rythme des processus
+                en_cours = deque()
+                for premiere_ligne, demandes in lots:
+                    bloc = reserver_numeros(allocateur, len(demandes))
+                    en_cours.append(pool.submit(_traiter_lot_distant, premiere_ligne, demandes, bloc))
+                    if len(en_cours) >= 2 * processus:
+                        ecrire(en_cours.popleft().result())
+                while en_cours:
+                    ecrire(en_cours.popleft().result())
+    return acceptes, rejetes
+
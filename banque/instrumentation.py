@@ -0,0 +1,201 @@
+import functools
+import threading
+import time
+from array import array
+from bisect import bisect_left
+
+from .modele import Client, CompteBancaire, Entreprise
+
+# Bornes supérieures des seaux des histogrammes, en nanosecondes : de 1 µs à 10 s, trois seaux par décade
+BORNES = tuple(int(mantisse * 10 ** exposant) for exposant in range(3, 10) for mantisse in (1, 2.5, 5)) + (10 ** 10,)
+SOMME = len(BORNES) + 1  # Somme des durées, après les seaux (le dernier reçoit tout ce qui dépasse)
+ECHECS = SOMME + 1  # Puis le nombre d'appels terminés par une exception
+
+# Opérations instrumentées par défaut : (classe, méthode) ; CompteTable hérite de celles de CompteBancaire
+OPERATIONS = (
+    (Client, "verifier_information"),
+    (Client, "creer_compte"),
+    (CompteBancaire, "deposer_fonds"),
+    (CompteBancaire, "retirer_fonds"),
+    (CompteBancaire, "transferer_fonds"),
+    (Entreprise, "deposer_fonds"),
+    (Entreprise, "retirer_fonds"),
+    (Entreprise, "transferer_fonds"),
+    (Entreprise, "payer_lot"),
+)
+
+
+# Classe Histogramme : durées d'une opération, comptées par seau de BORNES
+#
+# « seaux[i] += 1 » n'est pas atomique, même avec le GIL : lecture, addition puis écriture, et l'interpréteur
+# peut passer à un autre thread entre les deux. Plutôt qu'un verrou (qui coûterait plus que la mesure elle-même),
+# chaque thread incrémente son propre tableau de compteurs, où personne d'autre n'écrit ; les lectures
+# additionnent les tableaux de tous les threads.
+class Histogramme:
+    __slots__ = ("_locaux", "_compteurs", "_verrou")
+
+    def __init__(self):
+        self._locaux = threading.local()  # compteurs : le tableau du thread courant
+        self._compteurs = []  # Tableaux de tous les threads qui ont mesuré quelque chose
+        self._verrou = threading.Lock()
+
+    def compteurs(self):
+        """Renvoie le tableau de compteurs du thread courant : seaux, puis somme des durées (ns) et échecs."""
+        try:
+            return self._locaux.compteurs
+        except AttributeError:
+            with self._verrou:
+                compteurs = array("Q", bytes(8 * (ECHECS + 1)))
+                self._locaux.compteurs = compteurs
+                self._compteurs.append(compteurs)
+            return compteurs
+
+    def releve(self):
+        """Additionne les compteurs de tous les threads : (seaux, somme des durées en ns, échecs)."""
+        total = array("Q", bytes(8 * (ECHECS + 1)))
+        with self._verrou:
+            tableaux = list(self._compteurs)
+        for compteurs in tableaux:
+            for indice, nombre in enumerate(compteurs):
+                total[indice] += nombre
+        return total[:SOMME], total[SOMME], total[ECHECS]
+
+    @property
+    def seaux(self):
+        return self.releve()[0]
+
+    def __len__(self):
+        return sum(self.seaux)
+
+    @property
+    def somme(self):
+        return self.releve()[1]
+
+    @property
+    def echecs(self):
+        return self.releve()[2]
+
+    def observer(self, duree, echec=False):
+        """Ajoute une durée (nanosecondes) à l'histogramme."""
+        compteurs = self.compteurs()
+        compteurs[bisect_left(BORNES, duree)] += 1
+        compteurs[SOMME] += duree
+        if echec:
+            compteurs[ECHECS] += 1
+
+    def vider(self):
+        """Remet les compteurs à zéro : chaque thread repartira d'un tableau neuf à sa prochaine mesure."""
+        with self._verrou:
+            self._locaux = threading.local()
+            self._compteurs = []
+
+    def quantile(self, q):
+        """Borne supérieure (ns) du seau qui contient le quantile q, ou None si rien n'a été mesuré."""
+        seaux = self.seaux
+        total = sum(seaux)
+        if not total:
+            return None
+        rang = q * total
+        cumul = 0
+        for seau, nombre in enumerate(seaux):
+            cumul += nombre
+            if cumul >= rang:
+                return BORNES[seau] if seau < len(BORNES) else float("inf")
+
+
+# Classe Instrumentation : compteurs et histogrammes de durée des opérations, activés à la demande
+#
+# Rien n'est mesuré tant que activer() n'a pas été appelé : les méthodes des classes du domaine sont alors
+# remplacées par des enveloppes qui chronomètrent chaque appel (quelques centaines de nanosecondes),
+# et desactiver() remet les originales. Le code des opérations lui-même ne change pas.
+class Instrumentation:
+    def __init__(self):
+        self.histogrammes = {}  # (classe, méthode) -> Histogramme
+        self._originales = {}  # (classe, méthode) -> fonction d'origine, pendant l'activation
+        self._verrou = threading.Lock()
+
+    @property
+    def active(self):
+        return bool(self._originales)
+
+    def instrumenter(self, classe, nom):
+        """Chronomètre désormais chaque appel de la méthode nom de classe."""
+        cle = (classe.__name__, nom)
+        with self._verrou:
+            if cle in self._originales:
+                return
+            histogramme = self.histogrammes.setdefault(cle, Histogramme())
+            originale = classe.__dict__[nom]
+            self._originales[cle] = (classe, originale)
+            setattr(classe, nom, _envelopper(originale, histogramme))
+
+    def activer(self, operations=OPERATIONS):
+        """Instrumente les opérations données (par défaut, toutes celles des comptes)."""
+        for classe, nom in operations:
+            self.instrumenter(classe, nom)
+
+    def desactiver(self):
+        """Remet les méthodes d'origine ; les mesures déjà faites sont gardées."""
+        with self._verrou:
+            for (_, nom), (classe, originale) in self._originales.items():
+                setattr(classe, nom, originale)
+            self._originales.clear()
+
+    def reinitialiser(self):
+        """Oublie toutes les mesures."""
+        for histogramme in self.histogrammes.values():
+            histogramme.vider()
+
+    def exporter(self):
+        """Renvoie toutes les mesures au format texte d'exposition de Prometheus."""
+        lignes = ["# HELP banque_operations_total Appels des opérations instrumentées.",
+                  "# TYPE banque_operations_total counter"]
+        # Un seul relevé par histogramme : les trois familles de mesures restent cohérentes entre elles
+        mesures = [(cle, histogramme.releve()) for cle, histogramme in sorted(self.histogrammes.items())]
+        for (classe, nom), (seaux, _, _) in mesures:
+            lignes.append(f'banque_operations_total{{classe="{classe}",operation="{nom}"}} {sum(seaux)}')
+        lignes += ["# HELP banque_operations_echecs_total Appels terminés par une exception.",
+                   "# TYPE banque_operations_echecs_total counter"]
+        for (classe, nom), (_, _, echecs) in mesures:
+            lignes.append(f'banque_operations_echecs_total{{classe="{classe}",operation="{nom}"}} {echecs}')
+        lignes += ["# HELP banque_operation_duree_secondes Durée des opérations instrumentées.",
+                   "# TYPE banque_operation_duree_secondes histogram"]
+        for (classe, nom), (seaux, somme, _) in mesures:
+            etiquettes = f'classe="{classe}",operation="{nom}"'
+            cumul = 0
+            for borne, nombre in zip(BORNES, seaux):
+                cumul += nombre
+                lignes.append(f'banque_operation_duree_secondes_bucket{{{etiquettes},le="{borne / 1e9:g}"}} {cumul}')
+            total = cumul + seaux[-1]
+            lignes.append(f'banque_operation_duree_secondes_bucket{{{etiquettes},le="+Inf"}} {total}')
+            lignes.append(f"banque_operation_duree_secondes_sum{{{etiquettes}}} {somme / 1e9:.9f}")
+            lignes.append(f"banque_operation_duree_secondes_count{{{etiquettes}}} {total}")
+        return "\n".join(lignes) + "\n"
+
+
+def _envelopper(fonction, histogramme):
+    # Variables locales : l'enveloppe ne fait qu'une recherche d'attribut (le tableau du thread) par appel
+    horloge = time.perf_counter_ns
+
+    @functools.wraps(fonction)
+    def mesuree(*args, **kwargs):
+        debut = horloge()
+        try:
+            resultat = fonction(*args, **kwargs)
+        except BaseException:
+            histogramme.observer(horloge() - debut, True)
+            raise
+        duree = horloge() - debut
+        try:
+            compteurs = histogramme._locaux.compteurs
+        except AttributeError:  # Première mesure de ce thread, ou depuis vider()
+            compteurs = histogramme.compteurs()
+        compteurs[bisect_left(BORNES, duree)] += 1
+        compteurs[SOMME] += duree
+        return resultat
+
+    return mesuree
+
+
+# Instrumentation partagée, exposée par le service réseau
+instrumentation_par_defaut = Instrumentation()
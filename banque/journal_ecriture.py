@@ -0,0 +1,413 @@
+import os
+import struct
+import threading
+import zlib
+from array import array
+from itertools import chain
+
+from .allocateur_cartes import allocateur_par_defaut
+from .journal_transactions import (AUCUN, DEBLOCAGE, DECAISSEMENT, DEPOT, FRAIS, GEL, INTERETS, REMBOURSEMENT, RETRAIT,
+                                   cle_compte, en_centimes, en_euros, journal_par_defaut)
+from .plafonds_retrait import plafonds_par_defaut
+from .verrous_comptes import verrous_par_defaut
+
+# Une trame est écrite à chaque validation groupée : entête, déclarations de clés, puis une colonne par champ
+ENTETE_TRAME = struct.Struct("<IIII")  # Taille du contenu, crc32 du contenu, nombre de clés, nombre d'enregistrements
+DECLARATION_CLE = struct.Struct("<IH")  # Identifiant de la clé dans le segment, longueur en octets
+COLONNES = ("B", "I", "q", "I", "I")  # Type, horodatage, centimes, compte, contrepartie
+MAGIE_INSTANTANE = b"BNQ1"
+
+
+def _chemin_segment(dossier, numero):
+    return os.path.join(dossier, f"journal-{numero:08d}.wal")
+
+
+def _chemin_instantane(dossier, numero):
+    return os.path.join(dossier, f"instantane-{numero:08d}.bin")
+
+
+def _numeros(dossier, prefixe, suffixe):
+    """Renvoie les numéros triés des fichiers du dossier qui suivent le modèle prefixe-NNNNNNNN.suffixe."""
+    numeros = []
+    for nom in os.listdir(dossier):
+        if nom.startswith(prefixe) and nom.endswith(suffixe):
+            numero = nom[len(prefixe):-len(suffixe)]
+            if numero.isdigit():
+                numeros.append(int(numero))
+    return sorted(numeros)
+
+
+def _synchroniser_dossier(dossier):
+    """Rend durable la création ou le renommage d'un fichier dans le dossier."""
+    if hasattr(os, "O_DIRECTORY"):
+        descripteur = os.open(dossier, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(descripteur)
+        finally:
+            os.close(descripteur)
+
+
+# Classe JournalEcriture : journal d'écriture anticipée, en ajout seul, avec validation groupée
+class JournalEcriture:
+    def __init__(self, dossier, intervalle=0.002, synchrone=True):
+        os.makedirs(dossier, exist_ok=True)
+        self.dossier = dossier
+        self.intervalle = intervalle  # Attente maximale du thread d'écriture quand rien n'arrive
+        self.synchrone = synchrone  # Si vrai, ecrire() attend que l'événement soit sur disque
+        # Un nouveau segment à chaque ouverture : un segment tronqué par un arrêt brutal n'est jamais complété
+        existants = _numeros(dossier, "journal-", ".wal") + _numeros(dossier, "instantane-", ".bin")
+        self.segment = max(existants, default=0) + 1
+        self._fichier = open(_chemin_segment(dossier, self.segment), "ab")
+        _synchroniser_dossier(dossier)
+        self._verrou = threading.Lock()
+        self._verrou_fichier = threading.Lock()  # Toujours pris avant self._verrou
+        self._condition = threading.Condition(self._verrou)
+        self._cles = {}
+        self._declarations = bytearray()
+        self._nombre_cles = 0
+        self._colonnes = tuple(array(code) for code in COLONNES)
+        self._nombre = 0
+        self._sequence = 0  # Numéro du dernier événement reçu
+        self._durable = 0  # Numéro du dernier événement écrit et synchronisé sur disque
+        self._arrete = False
+        self._thread = threading.Thread(target=self._boucle, name="journal-ecriture", daemon=True)
+        self._thread.start()
+
+    def ecrire(self, type_evenement, centimes, cle, cle_contrepartie, horodatage):
+        """Ajoute un événement au tampon ; s'abonne directement à JournalTransactions."""
+        with self._verrou:
+            compte = self._identifiant(cle)
+            contrepartie = AUCUN if cle_contrepartie is None else self._identifiant(cle_contrepartie)
+            types, horodatages, montants, comptes, contreparties = self._colonnes
+            types.append(type_evenement)
+            horodatages.append(horodatage)
+            montants.append(centimes)
+            comptes.append(compte)
+            contreparties.append(contrepartie)
+            self._nombre += 1
+            self._sequence += 1
+            sequence = self._sequence
+            if self._nombre == 1:
+                self._condition.notify_all()  # Réveille le thread d'écriture
+            if self.synchrone:
+                # Plusieurs threads attendent ici la même synchronisation disque
+                while self._durable < sequence:
+                    self._condition.wait()
+        return sequence
+
+    def ecrire_lot(self, evenements):
+        """Ajoute une liste d'événements au tampon ; en mode synchrone, n'attend qu'une seule fois."""
+        with self._verrou:
+            types, horodatages, montants, comptes, contreparties = self._colonnes
+            for type_evenement, centimes, cle, cle_contrepartie, horodatage in evenements:
+                types.append(type_evenement)
+                horodatages.append(horodatage)
+                montants.append(centimes)
+                comptes.append(self._identifiant(cle))
+                contreparties.append(AUCUN if cle_contrepartie is None else self._identifiant(cle_contrepartie))
+            premier = not self._nombre
+            self._nombre += len(evenements)
+            self._sequence += len(evenements)
+            sequence = self._sequence
+            if premier:
+                self._condition.notify_all()
+            if self.synchrone:
+                while self._durable < sequence:
+                    self._condition.wait()
+        return sequence
+
+    def _identifiant(self, cle):
+        """Renvoie l'identifiant d'une clé dans le segment courant, en la déclarant si besoin."""
+        identifiant = self._cles.get(cle)
+        if identifiant is None:
+            identifiant = len(self._cles)
+            self._cles[cle] = identifiant
+            encodee = cle.encode()
+            self._declarations += DECLARATION_CLE.pack(identifiant, len(encodee))
+            self._declarations += encodee
+            self._nombre_cles += 1
+        return identifiant
+
+    def _extraire_trame(self):
+        """Construit la trame des événements en attente et vide le tampon (self._verrou tenu)."""
+        contenu = bytes(self._declarations) + b"".join(colonne.tobytes() for colonne in self._colonnes)
+        trame = ENTETE_TRAME.pack(len(contenu), zlib.crc32(contenu), self._nombre_cles, self._nombre) + contenu
+        self._declarations = bytearray()
+        self._nombre_cles = 0
+        self._colonnes = tuple(array(code) for code in COLONNES)
+        self._nombre = 0
+        return trame, self._sequence
+
+    def _ecrire_sur_disque(self, trame):
+        self._fichier.write(trame)
+        self._fichier.flush()
+        os.fsync(self._fichier.fileno())
+
+    def _marquer_durable(self, sequence):
+        with self._condition:
+            self._durable = max(self._durable, sequence)
+            self._condition.notify_all()
+
+    def vider(self):
+        """Écrit et synchronise sur disque tous les événements en attente, en une seule trame."""
+        with self._verrou_fichier:
+            with self._verrou:
+                if not self._nombre:
+                    return
+                trame, sequence = self._extraire_trame()
+            self._ecrire_sur_disque(trame)
+        self._marquer_durable(sequence)
+
+    def _boucle(self):
+        """Thread d'écriture : tout ce qui arrive pendant une synchronisation part dans la suivante."""
+        while True:
+            with self._condition:
+                if not self._nombre and not self._arrete:
+                    self._condition.wait(self.intervalle)
+                arrete = self._arrete
+            self.vider()
+            if arrete:
+                return
+
+    def pivoter(self):
+        """Termine le segment courant et en ouvre un nouveau ; renvoie le numéro du nouveau segment."""
+        with self._verrou_fichier:
+            with self._verrou:
+                trame, sequence = self._extraire_trame()
+                if len(trame) > ENTETE_TRAME.size:
+                    self._ecrire_sur_disque(trame)
+                self._fichier.close()
+                self.segment += 1
+                self._fichier = open(_chemin_segment(self.dossier, self.segment), "ab")
+                self._cles = {}  # Chaque segment déclare ses propres clés
+            _synchroniser_dossier(self.dossier)
+        self._marquer_durable(sequence)
+        return self.segment
+
+    def fermer(self):
+        """Écrit les derniers événements et arrête le thread d'écriture."""
+        with self._condition:
+            self._arrete = True
+            self._condition.notify_all()
+        self._thread.join()
+        self._fichier.close()
+
+
+def _ecrire_cle(tampon, cle):
+    encodee = cle.encode()
+    tampon += struct.pack("<H", len(encodee))
+    tampon += encodee
+
+
+# Classe _Lecteur pour relire un fichier binaire champ par champ
+class _Lecteur:
+    def __init__(self, donnees):
+        self.donnees = donnees
+        self.position = 0
+
+    def lire(self, format_struct):
+        valeurs = struct.unpack_from(format_struct, self.donnees, self.position)
+        self.position += struct.calcsize(format_struct)
+        return valeurs
+
+    def lire_cle(self):
+        (longueur,) = self.lire("<H")
+        cle = bytes(self.donnees[self.position:self.position + longueur]).decode()
+        self.position += longueur
+        return cle
+
+    def lire_colonne(self):
+        code, taille = self.lire("<cQ")
+        colonne = array(code.decode())
+        colonne.frombytes(self.donnees[self.position:self.position + taille])
+        self.position += taille
+        return colonne
+
+
+def prendre_instantane(journal_ecriture, comptes, journal=None, verrous=None):
+    """Enregistre un instantané binaire des soldes (et du journal) puis supprime les segments couverts.
+
+    comptes doit contenir tous les comptes existants (CompteBancaire et Entreprise).
+    """
+    verrous = verrous if verrous is not None else verrous_par_defaut
+    # Tous les verrous sont pris : aucune opération n'est à moitié faite pendant la copie
+    with verrous.tous():
+        segment = journal_ecriture.pivoter()
+        etats = [(cle_compte(compte), en_centimes(compte.solde), bool(getattr(compte, "est_gelé", False)))
+                 for compte in comptes]
+        colonnes = journal.copier_colonnes() if journal is not None else None
+
+    contenu = bytearray(struct.pack("<II", segment, len(etats)))
+    for cle, centimes, gele in etats:
+        _ecrire_cle(contenu, cle)
+        contenu += struct.pack("<qB", centimes, gele)
+    contenu += struct.pack("<B", colonnes is not None)
+    if colonnes is not None:
+        cles = colonnes[0]
+        contenu += struct.pack("<I", len(cles))
+        for cle in cles:
+            _ecrire_cle(contenu, cle)
+        for colonne in colonnes[1:]:
+            contenu += struct.pack("<cQ", colonne.typecode.encode(), len(colonne) * colonne.itemsize)
+            contenu += colonne.tobytes()
+
+    dossier = journal_ecriture.dossier
+    chemin = _chemin_instantane(dossier, segment)
+    with open(chemin + ".tmp", "wb") as fichier:
+        fichier.write(MAGIE_INSTANTANE + contenu + struct.pack("<I", zlib.crc32(contenu)))
+        fichier.flush()
+        os.fsync(fichier.fileno())
+    os.replace(chemin + ".tmp", chemin)
+    _synchroniser_dossier(dossier)
+
+    # L'instantané couvre tout ce qui précède : les anciens fichiers ne servent plus
+    for numero in _numeros(dossier, "journal-", ".wal"):
+        if numero < segment:
+            os.remove(_chemin_segment(dossier, numero))
+    for numero in _numeros(dossier, "instantane-", ".bin"):
+        if numero < segment:
+            os.remove(_chemin_instantane(dossier, numero))
+    return chemin
+
+
+# Classe EtatRestaure : soldes et gels reconstruits au redémarrage
+class EtatRestaure:
+    def __init__(self):
+        self.soldes = {}  # Clé du compte -> solde en centimes
+        self.geles = set()
+        self.segment_instantane = None
+        self.nombre_rejoues = 0  # Événements relus depuis le journal d'écriture
+
+    def appliquer(self, comptes):
+        """Remet les soldes et les gels restaurés dans les objets CompteBancaire/Entreprise."""
+        for compte in comptes:
+            cle = cle_compte(compte)
+            if cle in self.soldes:
+                compte.solde = en_euros(self.soldes[cle])
+            if hasattr(compte, "est_gelé"):
+                compte.est_gelé = cle in self.geles
+
+
+def _charger_instantane(chemin, etat, journal):
+    """Charge un instantané ; renvoie False s'il est incomplet ou corrompu."""
+    with open(chemin, "rb") as fichier:
+        donnees = memoryview(fichier.read())
+    if len(donnees) < 8 or bytes(donnees[:4]) != MAGIE_INSTANTANE:
+        return False
+    contenu = donnees[4:-4]
+    if zlib.crc32(contenu) != struct.unpack("<I", donnees[-4:])[0]:
+        return False
+    lecteur = _Lecteur(contenu)
+    segment, nombre_comptes = lecteur.lire("<II")
+    for _ in range(nombre_comptes):
+        cle = lecteur.lire_cle()
+        centimes, gele = lecteur.lire("<qB")
+        etat.soldes[cle] = centimes
+        if gele:
+            etat.geles.add(cle)
+    (avec_journal,) = lecteur.lire("<B")
+    if avec_journal and journal is not None:
+        (nombre_cles,) = lecteur.lire("<I")
+        cles = [lecteur.lire_cle() for _ in range(nombre_cles)]
+        journal.charger_colonnes(cles, *[lecteur.lire_colonne() for _ in range(5)])
+    etat.segment_instantane = segment
+    return True
+
+
+def _lire_colonnes(contenu, position, nombre):
+    """Découpe les colonnes d'une trame en tableaux."""
+    colonnes = []
+    for code in COLONNES:
+        colonne = array(code)
+        taille = nombre * colonne.itemsize
+        colonne.frombytes(contenu[position:position + taille])
+        colonnes.append(colonne)
+        position += taille
+    return colonnes
+
+
+def _rejouer_segment(chemin, etat, journal):
+    """Rejoue les trames complètes d'un segment ; s'arrête à la première trame tronquée ou corrompue."""
+    with open(chemin, "rb") as fichier:
+        donnees = memoryview(fichier.read())
+    cles = []
+    correspondance = []  # Identifiant dans le segment -> indice dans le journal en mémoire
+    variations = []  # Variation de solde par identifiant de clé du segment, fusionnée à la fin
+    gels = {}  # Identifiant -> dernier état de gel connu dans le segment
+    position = 0
+    while position + ENTETE_TRAME.size <= len(donnees):
+        taille, crc, nombre_cles, nombre = ENTETE_TRAME.unpack_from(donnees, position)
+        debut = position + ENTETE_TRAME.size
+        contenu = donnees[debut:debut + taille]
+        if len(contenu) < taille or zlib.crc32(contenu) != crc:
+            break  # Fin d'écriture interrompue par l'arrêt du processus
+        lecteur = _Lecteur(contenu)
+        for _ in range(nombre_cles):
+            _, longueur = lecteur.lire("<IH")
+            cles.append(bytes(contenu[lecteur.position:lecteur.position + longueur]).decode())
+            lecteur.position += longueur
+        variations.extend([0] * nombre_cles)
+        if journal is not None and nombre_cles:
+            correspondance.extend(journal.indices(cles[-nombre_cles:]))
+        types, horodatages, montants, comptes, contreparties = _lire_colonnes(contenu, lecteur.position, nombre)
+        for type_evenement, centimes, compte, contrepartie in zip(types, montants, comptes, contreparties):
+            if type_evenement == DEPOT or type_evenement == INTERETS or type_evenement == DECAISSEMENT:
+                variations[compte] += centimes
+            elif type_evenement == RETRAIT or type_evenement == FRAIS or type_evenement == REMBOURSEMENT:
+                variations[compte] -= centimes
+            elif type_evenement == GEL or type_evenement == DEBLOCAGE:
+                gels[compte] = type_evenement == GEL
+            else:  # Transferts
+                variations[compte] -= centimes
+                variations[contrepartie] += centimes
+        if journal is not None:
+            journal.etendre(correspondance, types, horodatages, montants, comptes, contreparties)
+        etat.nombre_rejoues += nombre
+        position = debut + taille
+
+    soldes = etat.soldes
+    for cle, variation in zip(cles, variations):
+        if variation:
+            soldes[cle] = soldes.get(cle, 0) + variation
+    for identifiant, gele in gels.items():
+        if gele:
+            etat.geles.add(cles[identifiant])
+        else:
+            etat.geles.discard(cles[identifiant])
+
+
+def restaurer(dossier, journal=None):
+    """Reconstruit l'état à partir du dernier instantané valide et des segments qui le suivent."""
+    etat = EtatRestaure()
+    if not os.path.isdir(dossier):
+        return etat
+    for numero in reversed(_numeros(dossier, "instantane-", ".bin")):
+        if _charger_instantane(_chemin_instantane(dossier, numero), etat, journal):
+            break
+        etat.soldes.clear()
+        etat.geles.clear()
+    depart = etat.segment_instantane or 0
+    for numero in _numeros(dossier, "journal-", ".wal"):
+        if numero >= depart:
+            _rejouer_segment(_chemin_segment(dossier, numero), etat, journal)
+    return etat
+
+
+def demarrer_persistance(dossier, comptes, journal=None, synchrone=True, allocateur=None, plafonds=None):
+    """Restaure les comptes depuis le disque puis journalise toutes leurs opérations suivantes.
+
+    Le reste de l'état du processus est remis à jour en même temps : l'allocateur ne réémet aucune carte
+    existante (comptes fournis ou relus sur le disque) et les plafonds de retrait reprennent les retraits des
+    dernières 24 heures.
+    """
+    journal = journal if journal is not None else journal_par_defaut
+    allocateur = allocateur if allocateur is not None else allocateur_par_defaut
+    plafonds = plafonds if plafonds is not None else plafonds_par_defaut
+    comptes = list(comptes)
+    etat = restaurer(dossier, journal)
+    etat.appliquer(comptes)
+    allocateur.marquer_utilises(chain(etat.soldes, journal.cles, (cle_compte(compte) for compte in comptes)))
+    plafonds.reconstruire(journal)
+    journal_ecriture = JournalEcriture(dossier, synchrone=synchrone)
+    journal.abonner(journal_ecriture.ecrire, journal_ecriture.ecrire_lot)
+    return journal_ecriture
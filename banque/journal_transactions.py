@@ -0,0 +1,418 @@
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+
+# Types de transaction, stockés sur un octet
+DEPOT = 0
+RETRAIT = 1
+TRANSFERT = 2
+TRANSFERT_ENTREPRISE = 3  # Transfert émis par un compte entreprise
+# Changements d'état : transmis aux abonnés mais absents de l'historique
+GEL = 4
+DEBLOCAGE = 5
+# Écritures passées par la banque elle-même lors de l'arrêté de fin de journée
+INTERETS = 6
+FRAIS = 7
+# Prêts aux entreprises : versement du capital et remboursement des échéances
+DECAISSEMENT = 8
+REMBOURSEMENT = 9
+
+# Noms acceptés par les filtres de l'historique
+TYPES_PAR_NOM = {"depot": (DEPOT,), "retrait": (RETRAIT,), "transfert": (TRANSFERT, TRANSFERT_ENTREPRISE),
+                 "interets": (INTERETS,), "frais": (FRAIS,), "pret": (DECAISSEMENT, REMBOURSEMENT)}
+
+PREFIXE_ENTREPRISE = "entreprise:"
+AUCUN = 0xFFFFFFFF  # Pas de contrepartie (dépôt, retrait)
+LIMITE_MONTANT_COMPACT = 2 ** 31  # Au-delà, la colonne des montants passe sur 8 octets
+
+
+def cle_entreprise(compte_id):
+    """Renvoie la clé du journal d'un compte entreprise (distincte des numéros de carte)."""
+    return f"{PREFIXE_ENTREPRISE}{compte_id}"
+
+
+def cle_compte(compte):
+    """Renvoie la clé du journal d'un compte client ou entreprise."""
+    return getattr(compte, "cle_journal", None) or compte.numero_carte
+
+
+def en_centimes(montant):
+    """Convertit un montant en euros en nombre entier de centimes."""
+    return int(round(montant * 100))
+
+
+def en_euros(centimes):
+    """Convertit un nombre de centimes en montant en euros (entier quand c'est possible)."""
+    if centimes % 100 == 0:
+        return centimes // 100
+    return centimes / 100
+
+
+def formater_montant(centimes):
+    """Affiche un montant en centimes comme le faisait l'historique texte (100€, 12.5€)."""
+    if centimes % 100 == 0:
+        return f"{centimes // 100}€"
+    return f"{centimes / 100:.2f}".rstrip("0") + "€"
+
+# Classe JournalTransactions : journal en colonnes, une entrée coûte une vingtaine d'octets
+class JournalTransactions:
+    def __init__(self):
+        self.horodatages = array("I")  # Secondes depuis l'epoch
+        self.types = array("B")
+        self.montants = array("i")  # Centimes, élargie à 8 octets si un montant le demande
+        self.comptes = array("I")  # Indice du compte dans self.cles
+        self.contreparties = array("I")
+        # Table d'identifiants : chaque clé de compte n'est stockée qu'une fois
+        self.cles = []
+        self._indices = {}
+        # Positions des entrées de chaque compte (par indice de clé), pour ne jamais parcourir tout le journal
+        self._positions = []
+        self.dernier_horodatage = 0  # Plus grand horodatage enregistré
+        self.generation = 0  # Change quand charger_colonnes renumérote les clés
+        # Les colonnes doivent rester alignées quand plusieurs threads écrivent en même temps
+        self._verrou = threading.Lock()
+        # Fonctions appelées à chaque événement (journal d'écriture, détection de fraude...),
+        # avec pour chacune une variante optionnelle qui reçoit un lot d'événements d'un coup
+        self.abonnes = []
+
+    def __len__(self):
+        return len(self.types)
+
+    def _indice(self, cle):
+        """Renvoie l'indice d'une clé de compte, en l'ajoutant si nécessaire."""
+        indice = self._indices.get(cle)
+        if indice is None:
+            indice = len(self.cles)
+            self._indices[cle] = indice
+            self.cles.append(cle)
+            self._positions.append(array("I"))
+        return indice
+
+    def abonner(self, fonction, fonction_lot=None):
+        """Inscrit une fonction appelée avec (type, centimes, compte, contrepartie, horodatage).
+
+        fonction_lot, si elle est fournie, reçoit la liste de ces tuples lors des enregistrements groupés.
+        """
+        self.abonnes.append((fonction, fonction_lot))
+
+    def enregistrer(self, type_transaction, montant, cle_compte, cle_contrepartie=None, horodatage=None):
+        """Ajoute une transaction au journal et l'indexe pour chaque compte concerné."""
+        centimes = en_centimes(montant)
+        if horodatage is None:
+            horodatage = int(time.time())
+        position = self.ajouter(type_transaction, centimes, cle_compte, cle_contrepartie, horodatage)
+        for abonne, _ in self.abonnes:
+            abonne(type_transaction, centimes, cle_compte, cle_contrepartie, horodatage)
+        return position
+
+    def signaler(self, type_evenement, cle_compte):
+        """Transmet un changement d'état (gel, déblocage) aux abonnés sans l'ajouter à l'historique."""
+        horodatage = int(time.time())
+        for abonne, _ in self.abonnes:
+            abonne(type_evenement, 0, cle_compte, None, horodatage)
+
+    def enregistrer_lot(self, type_transaction, cle_compte, lignes, horodatage=None):
+        """Ajoute d'un seul tenant les transferts d'un compte vers plusieurs contreparties.
+
+        lignes est une liste de (clé de la contrepartie, centimes) ; les abonnés reçoivent le lot entier.
+        """
+        if horodatage is None:
+            horodatage = int(time.time())
+        with self._verrou:
+            compte = self._indice(cle_compte)
+            if self.montants.typecode == "i" and any(
+                    not -LIMITE_MONTANT_COMPACT <= centimes < LIMITE_MONTANT_COMPACT for _, centimes in lignes):
+                self.montants = array("q", self.montants)
+            position = len(self.types)
+            positions_compte = self._positions[compte]
+            positions = self._positions
+            indices = self._indices
+            for cle_contrepartie, centimes in lignes:
+                contrepartie = indices.get(cle_contrepartie)
+                if contrepartie is None:
+                    contrepartie = self._indice(cle_contrepartie)
+                self.contreparties.append(contrepartie)
+                positions_compte.append(position)
+                positions[contrepartie].append(position)
+                position += 1
+            nombre = len(lignes)
+            self.horodatages.extend([horodatage] * nombre)
+            self.types.extend([type_transaction] * nombre)
+            self.montants.extend([centimes for _, centimes in lignes])
+            self.comptes.extend([compte] * nombre)
+            if horodatage > self.dernier_horodatage:
+                self.dernier_horodatage = horodatage
+        if self.abonnes:
+            evenements = [(type_transaction, centimes, cle_compte, cle_contrepartie, horodatage)
+                          for cle_contrepartie, centimes in lignes]
+            for abonne, abonne_lot in self.abonnes:
+                if abonne_lot is not None:
+                    abonne_lot(evenements)
+                else:
+                    for evenement in evenements:
+                        abonne(*evenement)
+
+    def enregistrer_colonnes(self, type_transaction, cles, montants, horodatage):
+        """Ajoute d'un seul tenant une écriture de même type sur chacun des comptes cles (arrêté de fin de journée).
+
+        montants est une séquence de centimes alignée sur cles ; les abonnés reçoivent le lot entier.
+        """
+        if cles:
+            self.enregistrer_indices(type_transaction, array("I", self.indices(cles)), array("q", montants), horodatage)
+
+    def enregistrer_indices(self, type_transaction, comptes, montants, horodatage):
+        """Variante d'enregistrer_colonnes pour des comptes déjà traduits en indices de clé (voir indices).
+
+        comptes est un array("I") et montants un array("q") de centimes : ils sont recopiés d'un bloc dans les
+        colonnes, seule la liste des positions de chaque compte est tenue ligne par ligne.
+        """
+        nombre = len(comptes)
+        if not nombre:
+            return
+        with self._verrou:
+            if self.montants.typecode == "i" and not (
+                    -LIMITE_MONTANT_COMPACT <= min(montants) and max(montants) < LIMITE_MONTANT_COMPACT):
+                self.montants = array("q", self.montants)
+            positions = self._positions
+            for position, compte in enumerate(comptes, len(self.types)):
+                positions[compte].append(position)
+            self.horodatages.extend(array("I", (horodatage,)) * nombre)
+            self.types.extend(array("B", (type_transaction,)) * nombre)
+            self.montants.extend(montants if self.montants.typecode == "q" else array("i", montants))
+            self.comptes.extend(comptes)
+            self.contreparties.extend(array("I", (AUCUN,)) * nombre)
+            if horodatage > self.dernier_horodatage:
+                self.dernier_horodatage = horodatage
+        if self.abonnes:
+            cles = self.cles
+            evenements = [(type_transaction, centimes, cles[compte], None, horodatage)
+                          for compte, centimes in zip(comptes, montants)]
+            for abonne, abonne_lot in self.abonnes:
+                if abonne_lot is not None:
+                    abonne_lot(evenements)
+                else:
+                    for evenement in evenements:
+                        abonne(*evenement)
+
+    def ajouter(self, type_transaction, centimes, cle_compte, cle_contrepartie, horodatage):
+        """Ajoute une entrée déjà convertie en centimes, sans prévenir les abonnés (sert à la reprise)."""
+        with self._verrou:
+            position = len(self.types)
+            compte = self._indice(cle_compte)
+            if self.montants.typecode == "i" and not -LIMITE_MONTANT_COMPACT <= centimes < LIMITE_MONTANT_COMPACT:
+                self.montants = array("q", self.montants)
+            self.horodatages.append(horodatage)
+            self.types.append(type_transaction)
+            self.montants.append(centimes)
+            self.comptes.append(compte)
+            self._positions[compte].append(position)
+            if horodatage > self.dernier_horodatage:
+                self.dernier_horodatage = horodatage
+            if cle_contrepartie is None:
+                self.contreparties.append(AUCUN)
+            else:
+                contrepartie = self._indice(cle_contrepartie)
+                self.contreparties.append(contrepartie)
+                self._positions[contrepartie].append(position)
+        return position
+
+    def indices(self, cles):
+        """Renvoie l'indice de chaque clé de compte, en ajoutant celles qui manquent."""
+        with self._verrou:
+            indices = self._indices
+            nouvelles = [cle for cle in dict.fromkeys(cles) if cle not in indices]
+            if nouvelles:  # Ajoutées d'un bloc : cas de l'arrêté qui rencontre tous les comptes la première fois
+                indices.update(zip(nouvelles, range(len(self.cles), len(self.cles) + len(nouvelles))))
+                self.cles.extend(nouvelles)
+                self._positions.extend([array("I") for _ in nouvelles])
+            return [indices[cle] for cle in cles]
+
+    def etendre(self, correspondance, types, horodatages, montants, comptes, contreparties):
+        """Ajoute des colonnes d'événements relus ; correspondance traduit leurs comptes en indices (reprise).
+
+        Les changements d'état (gel, déblocage) sont ignorés : ils ne font pas partie de l'historique.
+        """
+        with self._verrou:
+            positions = self._positions
+            position = len(self.types)
+            for type_transaction, horodatage, centimes, compte, contrepartie in \
+                    zip(types, horodatages, montants, comptes, contreparties):
+                if type_transaction == GEL or type_transaction == DEBLOCAGE:
+                    continue
+                if self.montants.typecode == "i" and not -LIMITE_MONTANT_COMPACT <= centimes < LIMITE_MONTANT_COMPACT:
+                    self.montants = array("q", self.montants)
+                compte = correspondance[compte]
+                self.types.append(type_transaction)
+                self.horodatages.append(horodatage)
+                self.montants.append(centimes)
+                self.comptes.append(compte)
+                positions[compte].append(position)
+                if contrepartie == AUCUN:
+                    self.contreparties.append(AUCUN)
+                else:
+                    contrepartie = correspondance[contrepartie]
+                    self.contreparties.append(contrepartie)
+                    positions[contrepartie].append(position)
+                position += 1
+            if horodatages:
+                self.dernier_horodatage = max(self.dernier_horodatage, max(horodatages))
+
+    def copier_colonnes(self):
+        """Renvoie une copie cohérente des clés et des colonnes (pour les instantanés)."""
+        with self._verrou:
+            return (list(self.cles), self.horodatages[:], self.types[:], self.montants[:],
+                    self.comptes[:], self.contreparties[:])
+
+    def charger_colonnes(self, cles, horodatages, types, montants, comptes, contreparties):
+        """Remplace le contenu du journal par des colonnes chargées et reconstruit les index."""
+        with self._verrou:
+            self.cles = list(cles)
+            self._indices = {cle: indice for indice, cle in enumerate(self.cles)}
+            self._positions = [array("I") for _ in self.cles]
+            self.horodatages, self.types, self.montants = horodatages, types, montants
+            self.dernier_horodatage = max(horodatages, default=0)
+            self.generation += 1
+            self.comptes, self.contreparties = comptes, contreparties
+            positions = self._positions
+            for position, (compte, contrepartie) in enumerate(zip(comptes, contreparties)):
+                positions[compte].append(position)
+                if contrepartie != AUCUN:
+                    positions[contrepartie].append(position)
+
+    def positions(self, cle_compte):
+        """Renvoie les positions des transactions d'un compte (vide s'il n'en a aucune)."""
+        indice = self._indices.get(cle_compte)
+        if indice is None:
+            return array("I")
+        return self._positions[indice]
+
+    def nombre_transactions(self, cle_compte):
+        """Renvoie le nombre de transactions d'un compte."""
+        return len(self.positions(cle_compte))
+
+    def entree(self, position):
+        """Renvoie l'entrée (horodatage, type, centimes, compte, contrepartie) à une position."""
+        contrepartie = self.contreparties[position]
+        return (self.horodatages[position], self.types[position], self.montants[position],
+                self.cles[self.comptes[position]], None if contrepartie == AUCUN else self.cles[contrepartie])
+
+    def entrees(self, cle_compte):
+        """Parcourt les entrées d'un compte sans rien copier."""
+        for position in self.positions(cle_compte):
+            yield self.entree(position)
+
+    def rendre(self, cle_compte):
+        """Produit le texte de l'historique d'un compte, ligne par ligne, seulement quand on le demande."""
+        for entree in self.entrees(cle_compte):
+            yield rendre_entree(entree, cle_compte)
+
+    def _borne(self, positions, horodatage, debut, fin):
+        """Renvoie le premier indice de positions[debut:fin] daté d'au moins horodatage (dichotomie)."""
+        horodatages = self.horodatages
+        while debut < fin:
+            milieu = (debut + fin) // 2
+            if horodatages[positions[milieu]] < horodatage:
+                debut = milieu + 1
+            else:
+                fin = milieu
+        return debut
+
+    def rechercher(self, cle_compte, depuis=None, jusqu_a=None, types=None, montant_min=None, montant_max=None,
+                   curseur=None, recents_d_abord=True):
+        """Parcourt paresseusement les positions des transactions d'un compte qui passent les filtres.
+
+        Les dates (secondes, bornes incluses) et le curseur réduisent la plage par dichotomie sur les positions
+        du compte ; types et montants (centimes) sont vérifiés entrée par entrée dans cette plage.
+        curseur est une position déjà renvoyée : le parcours reprend juste après elle.
+        """
+        positions = self.positions(cle_compte)
+        debut, fin = 0, len(positions)  # Les transactions ajoutées pendant le parcours sont ignorées
+        # Les horodatages d'un compte suivent l'ordre d'arrivée de ses transactions
+        if depuis is not None:
+            debut = self._borne(positions, depuis, debut, fin)
+        if jusqu_a is not None:
+            fin = self._borne(positions, jusqu_a + 1, debut, fin)
+        if curseur is not None:
+            if recents_d_abord:
+                fin = min(fin, bisect_left(positions, curseur))
+            else:
+                debut = max(debut, bisect_right(positions, curseur))
+        types_transaction = self.types
+        montants = self.montants
+        for indice in range(fin - 1, debut - 1, -1) if recents_d_abord else range(debut, fin):
+            position = positions[indice]
+            if types is not None and types_transaction[position] not in types:
+                continue
+            if montant_min is not None and montants[position] < montant_min:
+                continue
+            if montant_max is not None and montants[position] > montant_max:
+                continue
+            yield position
+
+    def page(self, cle_compte, taille=20, curseur=None, depuis=None, jusqu_a=None, types=None, montant_min=None,
+             montant_max=None, recents_d_abord=True):
+        """Renvoie une page d'historique ; son coût dépend de la taille de la page, pas de l'ancienneté du compte.
+
+        Montants en euros, types donnés par leur code ou par leur nom (voir TYPES_PAR_NOM).
+        ValueError si la taille n'est pas un entier d'au moins 1 : la page n'aurait pas de fin.
+        """
+        if not isinstance(taille, int) or taille < 1:
+            raise ValueError("La taille d'une page doit être un entier d'au moins 1.")
+        if types is not None:
+            types = {code for nom in types for code in TYPES_PAR_NOM.get(nom, (nom,))}
+        recherche = self.rechercher(cle_compte, depuis, jusqu_a, types,
+                                    None if montant_min is None else en_centimes(montant_min),
+                                    None if montant_max is None else en_centimes(montant_max),
+                                    curseur, recents_d_abord)
+        lignes = []
+        derniere = None
+        for derniere in recherche:
+            lignes.append(rendre_entree(self.entree(derniere), cle_compte))
+            if len(lignes) == taille:
+                break
+        # Une page pleine n'est la dernière que si la recherche n'a plus rien à donner
+        suite = len(lignes) == taille and next(recherche, None) is not None
+        return PageHistorique(lignes, derniere if suite else None)
+
+
+# Classe PageHistorique : lignes d'une page et curseur de la page suivante (None à la fin)
+class PageHistorique:
+    def __init__(self, lignes, curseur):
+        self.lignes = lignes
+        self.curseur = curseur
+
+    def __iter__(self):
+        return iter(self.lignes)
+
+    def __str__(self):
+        return "\n".join(self.lignes)
+
+
+def rendre_entree(entree, cle_compte):
+    """Produit la ligne d'historique d'une entrée, vue depuis le compte donné."""
+    _, type_transaction, centimes, compte, contrepartie = entree
+    montant = formater_montant(centimes)
+    if type_transaction == DEPOT:
+        return f"Dépôt de {montant}"
+    if type_transaction == RETRAIT:
+        return f"Retrait de {montant}"
+    if type_transaction == INTERETS:
+        return f"Intérêts de {montant}"
+    if type_transaction == FRAIS:
+        return f"Frais de tenue de compte de {montant}"
+    if type_transaction == DECAISSEMENT:
+        return f"Versement du prêt de {montant}"
+    if type_transaction == REMBOURSEMENT:
+        return f"Remboursement de prêt de {montant}"
+    if compte == cle_compte:
+        if contrepartie.startswith(PREFIXE_ENTREPRISE):
+            return f"Transfert de {montant} vers le compte entreprise {contrepartie[len(PREFIXE_ENTREPRISE):]}"
+        return f"Transfert de {montant} vers le compte {contrepartie}"
+    if type_transaction == TRANSFERT_ENTREPRISE:
+        return f"Réception de {montant} du compte entreprise {compte[len(PREFIXE_ENTREPRISE):]}"
+    return f"Réception de {montant} du compte {compte}"
+
+
+# Journal partagé par tous les comptes
+journal_par_defaut = JournalTransactions()
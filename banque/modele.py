@@ -0,0 +1,406 @@
+import re
+
+from .allocateur_cartes import allocateur_par_defaut
+from .authentification import empreinte_acceptee, limiteur_pin, proteger, verifier_secret
+from .journal_transactions import (DEBLOCAGE, DEPOT, GEL, RETRAIT, TRANSFERT, TRANSFERT_ENTREPRISE, cle_compte,
+                                   cle_entreprise, en_centimes, en_euros, formater_montant, journal_par_defaut)
+from .plafonds_retrait import plafonds_par_defaut
+from .registre_comptes import COMPTE_ENREGISTRE
+from .verrous_comptes import verrous_par_defaut
+
+# Motifs compilés une seule fois au chargement du module
+MOTIF_TELEPHONE = re.compile(r"^\+?[1-9]\d{1,14}$")  # Format international
+MOTIF_CNIC = re.compile(r"^\d{13}$")
+
+# Classe Client pour les utilisateurs individuels
+class Client:
+    __slots__ = ("nom", "adresse", "telephone", "cnic", "login", "mot_de_passe", "limite_retrait", "compte")
+
+    def __init__(self, nom, adresse, telephone, cnic, login, mot_de_passe, limite_retrait, empreinte=None):
+        self.nom = nom
+        self.adresse = adresse
+        self.telephone = telephone
+        self.cnic = cnic
+        self.login = login
+        # Seule l'empreinte salée est gardée ; une empreinte déjà calculée (import, table) passe par empreinte=
+        self.mot_de_passe = proteger(mot_de_passe) if empreinte is None else empreinte_acceptee(empreinte)
+        self.limite_retrait = limite_retrait
+        self.compte = None  # Initialement, le client n'a pas de compte
+
+    def verifier_information(self):
+        """Vérifie que les informations du client sont valides."""
+        if not self.verifier_nom():
+            return False, "Nom invalide"
+        if not self.verifier_telephone():
+            return False, "Numéro de téléphone invalide"
+        if not self.verifier_cnic():
+            return False, "CNIC invalide"
+        if not self.verifier_limite_retrait():
+            return False, "Limite de retrait invalide"
+        return True, "Informations valides"
+    
+    def verifier_nom(self):
+        """Vérifie que le nom est valide (alphanumérique et d'au moins 3 caractères)."""
+        return len(self.nom) >= 3
+    
+    def verifier_telephone(self):
+        """Vérifie que le numéro de téléphone est au format valide."""
+        return bool(MOTIF_TELEPHONE.match(self.telephone))
+    
+    def verifier_cnic(self):
+        """Vérifie que le CNIC est valide (un numéro de 13 chiffres)."""
+        return bool(MOTIF_CNIC.match(self.cnic))
+    
+    def verifier_limite_retrait(self):
+        """Vérifie que la limite de retrait est valide (positive et raisonnable)."""
+        return self.limite_retrait > 0 and self.limite_retrait <= 100000  # Exemple de limite maximale
+
+    def creer_compte(self, registre=None):
+        """Crée un compte bancaire pour le client si les informations sont valides."""
+        est_valide, message = self.verifier_information()
+        if not est_valide:
+            return message
+        
+        self.compte = CompteBancaire(self)
+        if registre is not None:
+            message = registre.enregistrer_client(self)  # Mise à jour des index du registre
+            if message != COMPTE_ENREGISTRE:
+                self.compte = None  # Un compte que le registre refuse n'est pas créé
+                return message
+        return "Compte créé avec succès, numéro de carte attribué."
+
+# Classe CompteBancaire pour gérer les opérations des clients
+class CompteBancaire:
+    # Pas de __dict__ par compte : seuls ces attributs existent
+    __slots__ = ("client", "solde", "numero_carte", "pin", "type_compte", "journal", "verrous", "plafonds", "est_gelé")
+
+    def __init__(self, client, numero_carte=None):
+        self.client = client
+        self.solde = 0  # Solde initial du compte
+        # Le numéro peut être fourni d'avance (bloc réservé lors d'un import en masse)
+        self.numero_carte = numero_carte or self.generer_numero_carte()
+        self.pin = None
+        self.type_compte = self.attribuer_type_compte()
+        self.journal = journal_par_defaut  # Journal en colonnes, le texte n'est produit qu'à la consultation
+        self.verrous = verrous_par_defaut  # Verrous partagés, pour les opérations concurrentes
+        self.plafonds = plafonds_par_defaut  # Cumul des retraits sur 24 heures glissantes
+        self.est_gelé = False  # Indicateur pour savoir si le compte est gelé ou non
+    
+    def generer_numero_carte(self):
+        """Génère un numéro de carte unique à 16 chiffres avec clé de Luhn."""
+        return allocateur_par_defaut.allouer()
+    
+    def attribuer_type_compte(self):
+        """Attribue un type de compte en fonction de la limite de retrait."""
+        if self.client.limite_retrait <= 50000:
+            return "Compte épargne"
+        elif self.client.limite_retrait <= 100000:
+            return "Compte courant"
+        else:
+            return "Compte premium"
+    
+    def entrer_pin(self, pin):
+        """Permet au client d'entrer un numéro PIN pour son compte."""
+        if len(pin) == 4 and pin.isdigit():
+            self.pin = proteger(pin)
+            return "PIN enregistré avec succès."
+        else:
+            return "Le PIN doit être composé de 4 chiffres."
+
+    def verifier_pin(self, pin):
+        """Vérifie le PIN saisi ; après trois échecs, les essais sont bloqués un moment."""
+        if not limiteur_pin.autoriser(self.numero_carte):
+            return "Trop de tentatives, réessayez plus tard."
+        if not verifier_secret(pin, self.pin):
+            limiteur_pin.echec(self.numero_carte)
+            return "PIN incorrect."
+        limiteur_pin.reussite(self.numero_carte)
+        return "PIN vérifié avec succès."
+    
+    def deposer_fonds(self, montant):
+        """Permet au client de déposer des fonds dans son compte."""
+        if self.est_gelé:
+            return "Le compte est gelé, vous ne pouvez pas effectuer de dépôt."
+        if montant <= 0:
+            return "Le montant du dépôt doit être positif."
+        en_centimes(montant)  # Un montant non fini (NaN, infini) lève ici, avant toute modification du solde
+        with self.verrous.verrou(self.numero_carte):
+            self.solde += montant
+            self.journal.enregistrer(DEPOT, montant, self.numero_carte)
+        return f"{montant}€ déposés avec succès."
+
+    def retirer_fonds(self, montant):
+        """Permet au client de retirer des fonds de son compte."""
+        if self.est_gelé:
+            return "Le compte est gelé, vous ne pouvez pas effectuer de retrait."
+        if montant <= 0:
+            return "Le montant du retrait doit être positif."
+        centimes = en_centimes(montant)  # Un montant non fini (NaN, infini) lève ici, avant toute modification du solde
+        with self.verrous.verrou(self.numero_carte):
+            if montant > self.solde:
+                return "Fonds insuffisants."
+            limite = en_centimes(self.limite_retrait)
+            if not self.plafonds.consommer(self.numero_carte, centimes, limite):
+                disponible = self.plafonds.disponible(self.numero_carte, limite)
+                return f"Limite de retrait quotidienne atteinte : {formater_montant(disponible)} encore disponibles."
+            self.solde -= montant
+            self.journal.enregistrer(RETRAIT, montant, self.numero_carte)
+        return f"{montant}€ retirés avec succès."
+
+    @property
+    def limite_retrait(self):
+        """Limite de retrait sur 24 heures, fixée par le client."""
+        return self.client.limite_retrait
+
+    def consulter_solde(self):
+        """Affiche le solde actuel du compte."""
+        return f"Solde actuel : {self.solde}€"
+    
+    @property
+    def historique_transactions(self):
+        """Liste des lignes d'historique, produites à partir du journal."""
+        return list(self.journal.rendre(self.numero_carte))
+    
+    def consulter_historique(self):
+        """Affiche l'historique des transactions."""
+        if not self.journal.nombre_transactions(self.numero_carte):
+            return "Aucune transaction enregistrée."
+        return "\n".join(self.journal.rendre(self.numero_carte))
+
+    def page_historique(self, taille=20, curseur=None, depuis=None, jusqu_a=None, types=None, montant_min=None,
+                        montant_max=None):
+        """Renvoie une page de l'historique du compte, des transactions les plus récentes aux plus anciennes.
+
+        Le curseur de la page renvoyée donne la page suivante ; depuis/jusqu_a sont des horodatages en secondes.
+        """
+        return self.journal.page(self.numero_carte, taille, curseur, depuis, jusqu_a, types, montant_min, montant_max)
+    
+    def transferer_fonds(self, montant, compte_destinataire):
+        """Permet de transférer des fonds vers un autre compte (client ou entreprise)."""
+        if self.est_gelé:
+            return "Le compte est gelé, vous ne pouvez pas effectuer de transfert."
+        if montant <= 0:
+            return "Le montant du transfert doit être positif."
+        en_centimes(montant)  # Un montant non fini (NaN, infini) lève ici, avant toute modification du solde
+        destination = cle_compte(compte_destinataire)
+        with self.verrous.paire(self.numero_carte, destination):
+            if montant > self.solde:
+                return "Fonds insuffisants pour le transfert."
+            self.solde -= montant
+            compte_destinataire.solde += montant
+            self.journal.enregistrer(TRANSFERT, montant, self.numero_carte, destination)
+        return f"{montant}€ transférés avec succès vers le compte {_libelle(compte_destinataire)}."
+    
+    def geler_compte(self):
+        """Gèle le compte pour empêcher toute opération."""
+        with self.verrous.verrou(self.numero_carte):
+            self.est_gelé = True
+            self.journal.signaler(GEL, self.numero_carte)
+        return "Compte gelé avec succès."
+    
+    def debloquer_compte(self):
+        """Débloque un compte gelé."""
+        with self.verrous.verrou(self.numero_carte):
+            self.est_gelé = False
+            self.journal.signaler(DEBLOCAGE, self.numero_carte)
+        return "Compte débloqué avec succès."
+
+# Classe Entreprise pour gérer le compte de l'entreprise
+class Entreprise:
+    __slots__ = ("nom_entreprise", "adresse_entreprise", "numero_fiscal", "limite_retrait", "compte_id", "mot_de_passe",
+                 "solde", "cle_journal", "journal", "verrous", "plafonds", "prets")
+
+    def __init__(self, nom_entreprise, adresse_entreprise, numero_fiscal, limite_retrait, compte_id, mot_de_passe,
+                 empreinte=None):
+        self.nom_entreprise = nom_entreprise
+        self.adresse_entreprise = adresse_entreprise
+        self.numero_fiscal = numero_fiscal
+        self.limite_retrait = limite_retrait
+        self.compte_id = compte_id
+        self.mot_de_passe = proteger(mot_de_passe) if empreinte is None else empreinte_acceptee(empreinte)
+        self.solde = 0
+        self.cle_journal = cle_entreprise(compte_id)
+        self.journal = journal_par_defaut  # Journal en colonnes, le texte n'est produit qu'à la consultation
+        self.verrous = verrous_par_defaut  # Verrous partagés, pour les opérations concurrentes
+        self.plafonds = plafonds_par_defaut  # Cumul des retraits sur 24 heures glissantes
+        self.prets = []  # Prêts accordés par un GuichetPrets
+    
+    def deposer_fonds(self, montant):
+        """Permet à l'entreprise de déposer des fonds dans son compte."""
+        if montant <= 0:
+            return "Le montant du dépôt doit être positif."
+        en_centimes(montant)  # Un montant non fini (NaN, infini) lève ici, avant toute modification du solde
+        with self.verrous.verrou(self.cle_journal):
+            self.solde += montant
+            self.journal.enregistrer(DEPOT, montant, self.cle_journal)
+        return f"{montant}€ déposés avec succès."
+    
+    def retirer_fonds(self, montant):
+        """Permet à l'entreprise de retirer des fonds de son compte."""
+        if montant <= 0:
+            return "Le montant du retrait doit être positif."
+        centimes = en_centimes(montant)  # Un montant non fini (NaN, infini) lève ici, avant toute modification du solde
+        with self.verrous.verrou(self.cle_journal):
+            if montant > self.solde:
+                return "Fonds insuffisants."
+            limite = en_centimes(self.limite_retrait)
+            if not self.plafonds.consommer(self.cle_journal, centimes, limite):
+                disponible = self.plafonds.disponible(self.cle_journal, limite)
+                return f"Limite de retrait quotidienne atteinte : {formater_montant(disponible)} encore disponibles."
+            self.solde -= montant
+            self.journal.enregistrer(RETRAIT, montant, self.cle_journal)
+        return f"{montant}€ retirés avec succès."
+
+    def consulter_solde(self):
+        """Affiche le solde actuel du compte entreprise."""
+        return f"Solde actuel de l'entreprise : {self.solde}€"
+    
+    @property
+    def historique_transactions(self):
+        """Liste des lignes d'historique, produites à partir du journal."""
+        return list(self.journal.rendre(self.cle_journal))
+    
+    def consulter_historique(self):
+        """Affiche l'historique des transactions de l'entreprise."""
+        if not self.journal.nombre_transactions(self.cle_journal):
+            return "Aucune transaction enregistrée."
+        return "\n".join(self.journal.rendre(self.cle_journal))
+
+    def page_historique(self, taille=20, curseur=None, depuis=None, jusqu_a=None, types=None, montant_min=None,
+                        montant_max=None):
+        """Renvoie une page de l'historique de l'entreprise, des transactions les plus récentes aux plus anciennes.
+
+        Le curseur de la page renvoyée donne la page suivante ; depuis/jusqu_a sont des horodatages en secondes.
+        """
+        return self.journal.page(self.cle_journal, taille, curseur, depuis, jusqu_a, types, montant_min, montant_max)
+    
+    def transferer_fonds(self, montant, compte_destinataire):
+        """Permet à l'entreprise de transférer des fonds vers un compte utilisateur ou une autre entreprise."""
+        if montant <= 0:
+            return "Le montant du transfert doit être positif."
+        en_centimes(montant)  # Un montant non fini (NaN, infini) lève ici, avant toute modification du solde
+        destination = cle_compte(compte_destinataire)
+        with self.verrous.paire(self.cle_journal, destination):
+            if montant > self.solde:
+                return "Fonds insuffisants pour le transfert."
+            self.solde -= montant
+            compte_destinataire.solde += montant
+            self.journal.enregistrer(TRANSFERT_ENTREPRISE, montant, self.cle_journal, destination)
+        return f"{montant}€ transférés avec succès vers le compte {_libelle(compte_destinataire)}."
+    
+    def payer_lot(self, paiements, registre):
+        """Paie en une seule opération une liste de (numéro de carte, montant) : tout ou rien."""
+        lignes = []  # (numéro de carte, centimes)
+        comptes = []
+        erreurs = []
+        trouver = registre.trouver_par_carte
+        for numero_ligne, (numero_carte, montant) in enumerate(paiements, start=1):
+            compte = trouver(numero_carte)
+            if compte is None:
+                erreurs.append((numero_ligne, "Compte destinataire introuvable."))
+            elif montant <= 0:
+                erreurs.append((numero_ligne, "Le montant du transfert doit être positif."))
+            else:
+                comptes.append(compte)
+                lignes.append((numero_carte, en_centimes(montant)))
+        if erreurs:
+            return ResultatPaiementLot(False, 0, 0, f"Paiement groupé rejeté : {len(erreurs)} ligne(s) invalide(s).",
+                                       erreurs)
+        
+        total = sum(centimes for _, centimes in lignes)
+        if total > en_centimes(self.solde):
+            return ResultatPaiementLot(False, 0, total, "Fonds insuffisants pour le paiement groupé.")
+        # Un seul contrôle de solvabilité, sous les verrous de tous les comptes concernés
+        with self.verrous.plusieurs([self.cle_journal] + [numero_carte for numero_carte, _ in lignes]):
+            solde = en_centimes(self.solde)
+            if total > solde:  # Le solde a pu baisser entre-temps
+                return ResultatPaiementLot(False, 0, total, "Fonds insuffisants pour le paiement groupé.")
+            self.solde = en_euros(solde - total)
+            for compte, (_, centimes) in zip(comptes, lignes):
+                compte.solde = en_euros(en_centimes(compte.solde) + centimes)
+            self.journal.enregistrer_lot(TRANSFERT_ENTREPRISE, self.cle_journal, lignes)
+        return ResultatPaiementLot(True, len(lignes), total,
+                                   f"{len(lignes)} paiements effectués pour un total de {formater_montant(total)}.")
+
+    def demander_pret(self, guichet, montant, duree_mois, taux_annuel=None):
+        """Dépose une demande de prêt au guichet ; renvoie la DemandePret (rejetée d'office si invalide)."""
+        if taux_annuel is None:
+            return guichet.deposer_demande(self, montant, duree_mois)
+        return guichet.deposer_demande(self, montant, duree_mois, taux_annuel)
+
+    def consulter_prets(self):
+        """Affiche l'état des prêts de l'entreprise."""
+        if not self.prets:
+            return "Aucun prêt en cours."
+        return "\n".join(str(pret) for pret in self.prets)
+
+def _libelle(compte):
+    """Désigne un compte dans les messages : numéro de carte, ou « entreprise » suivi de l'identifiant du compte."""
+    compte_id = getattr(compte, "compte_id", None)
+    return compte.numero_carte if compte_id is None else f"entreprise {compte_id}"
+
+# Classe ResultatPaiementLot : résumé d'un paiement groupé, à la place d'un message par virement
+class ResultatPaiementLot:
+    def __init__(self, accepte, nombre_paiements, total_centimes, message, erreurs=()):
+        self.accepte = accepte
+        self.nombre_paiements = nombre_paiements
+        self.total_centimes = total_centimes
+        self.message = message
+        self.erreurs = list(erreurs)  # (numéro de ligne, motif) des lignes invalides
+    
+    def __str__(self):
+        return self.message
+
+# Classe EmployeBancaire pour gérer les actions des employés bancaires
+class EmployeBancaire:
+    def __init__(self, nom_utilisateur, mot_de_passe, registre=None):
+        self.nom_utilisateur = nom_utilisateur
+        self.mot_de_passe = proteger(mot_de_passe)
+        self.registre = registre  # Registre central des comptes (optionnel)
+    
+    def se_connecter(self, utilisateur, mot_de_passe):
+        """Permet à l'employé de se connecter au système."""
+        if self.nom_utilisateur == utilisateur and verifier_secret(mot_de_passe, self.mot_de_passe):
+            return True
+        return False
+    
+    def consulter_comptes_clients(self, clients=None):
+        """Affiche la liste de tous les comptes clients."""
+        if clients is None and self.registre is not None:
+            return self.registre.numeros_cartes()
+        return [client.compte.numero_carte for client in clients if client.compte]
+    
+    def rechercher_compte(self, numero_carte):
+        """Recherche un compte par numéro de carte dans le registre."""
+        if self.registre is None:
+            return None
+        return self.registre.trouver_par_carte(numero_carte)
+    
+    def consulter_alertes(self, detecteur):
+        """Liste les alertes du détecteur de fraude, de la plus récente à la plus ancienne."""
+        return [str(alerte) for alerte in reversed(detecteur.alertes)]
+    
+    def approuver_demande_compte(self, client):
+        """Approuve la demande de création de compte du client."""
+        if client.compte:
+            return "Le compte est déjà créé."
+        message = client.creer_compte(self.registre)
+        if client.compte is None:
+            return message
+        return "Demande de compte approuvée."
+    
+    def rejeter_demande_compte(self, client):
+        """Rejette la demande de création de compte du client."""
+        return "Demande de compte rejetée."
+    
+    def file_demandes_pret(self, guichet, nombre=20):
+        """Renvoie les demandes de prêt à traiter en priorité : les moins risquées, puis les plus anciennes."""
+        return guichet.file_attente(nombre)
+    
+    def approuver_demande_pret(self, demande):
+        """Approuve une demande de prêt : le capital est versé sur le compte de l'entreprise."""
+        return demande.guichet.approuver(demande, self.nom_utilisateur)
+    
+    def rejeter_demande_pret(self, demande, motif=""):
+        """Rejette une demande de prêt."""
+        return demande.guichet.rejeter(demande, motif, self.nom_utilisateur)
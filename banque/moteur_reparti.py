@@ -0,0 +1,380 @@
+import itertools
+import multiprocessing
+import os
+import threading
+import zlib
+
+from .allocateur_cartes import allocateur_par_defaut
+from .journal_transactions import (TRANSFERT, TRANSFERT_ENTREPRISE, JournalTransactions, cle_entreprise, en_centimes,
+                                   en_euros)
+from .modele import Entreprise
+from .plafonds_retrait import PlafondsRetrait
+from .table_comptes import TableComptes
+from .verrous_comptes import VerrousComptes
+
+# Opérations acceptées par une partition, en tuples : (nom, arguments...)
+# Les clés de compte sont des numéros de carte ou des clés entreprise (cle_entreprise) ; montants en euros
+OUVRIR = "ouvrir"  # (nom, adresse, téléphone, CNIC, login, mot de passe, limite, numéro de carte)
+OUVRIR_ENTREPRISE = "ouvrir_entreprise"  # (nom, adresse, numéro fiscal, limite, identifiant, mot de passe)
+DEPOT = "depot"  # (clé, montant)
+RETRAIT = "retrait"  # (clé, montant)
+TRANSFERT_LOCAL = "transfert"  # (clé source, clé destination, montant), les deux comptes dans la même partition
+SOLDE = "solde"  # (clé,)
+TOTAL = "total"  # () : somme des soldes de la partition en centimes, demandée à toutes par MoteurReparti.total
+# Transferts entre partitions, en deux phases
+RESERVER = "reserver"  # (transaction, clé source, montant) : débite la source et garde le montant de côté
+PREPARER = "preparer"  # (transaction, clé destination) : vérifie que la destination peut recevoir
+CREDITER = "crediter"  # (transaction, clé source, clé destination, montant) : crédite la destination
+VALIDER = "valider"  # (transaction, clé destination) : une fois le crédit fait, le débit réservé devient définitif
+ANNULER = "annuler"  # (transaction,) : rend le montant réservé à la source
+
+PRETE = "prête"  # Réponse d'une phase de préparation réussie
+CREDITE = "crédité"  # Réponse d'un crédit appliqué
+COMPTE_INTROUVABLE = "Compte introuvable."
+OPERATION_INVALIDE = "Opération invalide"  # Suivi du motif ; l'opération n'a rien modifié
+PARTITION_INDISPONIBLE = "Partition indisponible."  # Son processus s'est arrêté : ses comptes sont perdus
+
+
+def partition_de(cle, nombre_partitions):
+    """Renvoie la partition d'un compte (stable d'un processus et d'une exécution à l'autre)."""
+    return zlib.crc32(cle.encode()) % nombre_partitions
+
+
+# Classe Partition : les comptes d'une partition et leurs opérations, dans le processus qui la possède
+#
+# Les comptes clients sont rangés dans une TableComptes, les entreprises dans un dictionnaire ; chaque
+# partition a son propre journal, ses verrous et ses plafonds. Les opérations passent par les méthodes du
+# domaine (deposer_fonds, retirer_fonds...) et renvoient les mêmes messages qu'en un seul processus.
+class Partition:
+    def __init__(self):
+        self.journal = JournalTransactions()
+        self.verrous = VerrousComptes()
+        self.plafonds = PlafondsRetrait()
+        self.table = TableComptes(self.journal, self.verrous, self.plafonds)
+        self.entreprises = {}  # Clé entreprise -> Entreprise
+        self.reservations = {}  # Transaction -> (clé source, montant) débité en attente de la seconde phase
+        self.operations = {
+            OUVRIR: self.ouvrir,
+            OUVRIR_ENTREPRISE: self.ouvrir_entreprise,
+            DEPOT: self.deposer,
+            RETRAIT: self.retirer,
+            TRANSFERT_LOCAL: self.transferer,
+            SOLDE: self.solde,
+            TOTAL: self.total,
+            RESERVER: self.reserver,
+            PREPARER: self.preparer,
+            VALIDER: self.valider,
+            ANNULER: self.annuler,
+            CREDITER: self.crediter,
+        }
+
+    def executer(self, lot):
+        """Exécute une liste d'opérations dans l'ordre et renvoie la liste de leurs résultats.
+
+        Une opération qui lève une exception a pour résultat OPERATION_INVALIDE et son motif : le processus de la
+        partition, seul à garder ses comptes, ne doit pas s'arrêter pour une requête mal formée.
+        """
+        operations = self.operations
+        resultats = []
+        for operation in lot:
+            try:
+                resultats.append(operations[operation[0]](*operation[1:]))
+            except Exception as erreur:
+                resultats.append(f"{OPERATION_INVALIDE} : {erreur!r}")
+        return resultats
+
+    def trouver(self, cle):
+        if cle.isdigit():
+            return self.table.trouver_par_carte(cle)
+        return self.entreprises.get(cle)
+
+    def ouvrir(self, nom, adresse, telephone, cnic, login, mot_de_passe, limite_retrait, numero_carte):
+        """Ouvre un compte client ; renvoie son numéro de carte ou le message d'erreur."""
+        compte = self.table.ouvrir_compte(nom, adresse, telephone, cnic, login, mot_de_passe, limite_retrait,
+                                          numero_carte)
+        return compte if isinstance(compte, str) else compte.numero_carte
+
+    def ouvrir_entreprise(self, nom_entreprise, adresse_entreprise, numero_fiscal, limite_retrait, compte_id,
+                          mot_de_passe):
+        entreprise = Entreprise(nom_entreprise, adresse_entreprise, numero_fiscal, limite_retrait, compte_id,
+                                mot_de_passe)
+        entreprise.journal, entreprise.verrous, entreprise.plafonds = self.journal, self.verrous, self.plafonds
+        self.entreprises[entreprise.cle_journal] = entreprise
+        return entreprise.cle_journal
+
+    def deposer(self, cle, montant):
+        compte = self.trouver(cle)
+        return COMPTE_INTROUVABLE if compte is None else compte.deposer_fonds(montant)
+
+    def retirer(self, cle, montant):
+        compte = self.trouver(cle)
+        return COMPTE_INTROUVABLE if compte is None else compte.retirer_fonds(montant)
+
+    def transferer(self, cle, cle_destination, montant):
+        compte = self.trouver(cle)
+        destination = self.trouver(cle_destination)
+        if compte is None or destination is None or not cle_destination.isdigit():
+            return COMPTE_INTROUVABLE
+        return compte.transferer_fonds(montant, destination)
+
+    def solde(self, cle):
+        compte = self.trouver(cle)
+        return None if compte is None else compte.solde
+
+    def total(self):
+        return sum(self.table.soldes) + sum(en_centimes(entreprise.solde) for entreprise in self.entreprises.values())
+
+    def reserver(self, transaction, cle, montant):
+        """Première phase côté source : mêmes contrôles que transferer_fonds, puis débit mis de côté."""
+        compte = self.trouver(cle)
+        if compte is None:
+            return COMPTE_INTROUVABLE
+        if getattr(compte, "est_gelé", False):
+            return "Le compte est gelé, vous ne pouvez pas effectuer de transfert."
+        if montant <= 0:
+            return "Le montant du transfert doit être positif."
+        centimes = en_centimes(montant)  # Un montant non fini lève ici : rien n'est réservé
+        with self.verrous.verrou(cle):
+            solde = en_centimes(compte.solde)
+            if centimes > solde:
+                return "Fonds insuffisants pour le transfert."
+            compte.solde = en_euros(solde - centimes)  # Le montant réservé n'est plus disponible
+            self.reservations[transaction] = (cle, montant)
+        return PRETE
+
+    def preparer(self, transaction, cle_destination):
+        """Première phase côté destination : le compte doit exister et pouvoir recevoir un transfert."""
+        return PRETE if cle_destination.isdigit() and self.trouver(cle_destination) is not None \
+            else COMPTE_INTROUVABLE
+
+    def valider(self, transaction, cle_destination):
+        """Dernière phase côté source, après le crédit : le débit devient définitif et entre au journal."""
+        cle, montant = self.reservations[transaction]
+        type_transaction = TRANSFERT if cle.isdigit() else TRANSFERT_ENTREPRISE
+        self.journal.enregistrer(type_transaction, montant, cle, cle_destination)
+        del self.reservations[transaction]
+        return f"{montant}€ transférés avec succès vers le compte {cle_destination}."
+
+    def annuler(self, transaction):
+        """Dernière phase côté source quand la destination a refusé ou n'a pas été créditée : le montant est rendu."""
+        reservation = self.reservations.pop(transaction, None)
+        if reservation is not None:
+            cle, montant = reservation
+            compte = self.trouver(cle)
+            with self.verrous.verrou(cle):
+                compte.solde = en_euros(en_centimes(compte.solde) + en_centimes(montant))
+        return None
+
+    def crediter(self, transaction, cle_source, cle_destination, montant):
+        """Seconde phase côté destination : le crédit préparé entre au journal puis est appliqué.
+
+        Tout ce qui peut échouer passe avant la mise à jour du solde : en cas d'erreur, rien n'est crédité et
+        la source est annulée.
+        """
+        compte = self.trouver(cle_destination)
+        centimes = en_centimes(montant)
+        type_transaction = TRANSFERT if cle_source.isdigit() else TRANSFERT_ENTREPRISE
+        with self.verrous.verrou(cle_destination):
+            solde = en_centimes(compte.solde) + centimes
+            self.journal.enregistrer(type_transaction, montant, cle_source, cle_destination)
+            compte.solde = en_euros(solde)
+        return CREDITE
+
+
+def _servir_partition(connexion):
+    """Boucle d'un processus de partition : reçoit des lots d'opérations et renvoie leurs résultats."""
+    partition = Partition()
+    while True:
+        try:
+            lot = connexion.recv()
+        except EOFError:  # Le routeur a disparu
+            break
+        if lot is None:
+            break
+        connexion.send(partition.executer(lot))
+    connexion.close()
+
+
+# Classe MoteurReparti : routeur vers des processus qui possèdent chacun une partition des comptes
+#
+# Les opérations sont envoyées par lots : le routeur découpe un lot par partition, l'envoie à toutes les
+# partitions à la fois (elles travaillent en parallèle, chacune sur son cœur) puis rassemble les résultats
+# dans l'ordre d'origine. Un transfert entre deux partitions suit un protocole en deux phases : réservation
+# du montant à la source et vérification de la destination dans un premier aller-retour, crédit de la
+# destination dans un second, puis validation à la source si le crédit a été fait, annulation sinon ;
+# l'argent n'est jamais disponible des deux côtés à la fois, ni perdu si le crédit échoue.
+# Dans un même lot, chaque opération est atomique, mais les crédits entre partitions arrivent après les
+# autres opérations du lot. Une partition dont le processus s'est arrêté répond PARTITION_INDISPONIBLE.
+class MoteurReparti:
+    def __init__(self, nombre_partitions=None):
+        self.nombre_partitions = nombre_partitions or os.cpu_count() or 1
+        contexte = multiprocessing.get_context("spawn")  # Processus neufs : ni verrous ni threads hérités
+        self._connexions = []
+        self._processus = []
+        for _ in range(self.nombre_partitions):
+            connexion, connexion_partition = contexte.Pipe()
+            processus = contexte.Process(target=_servir_partition, args=(connexion_partition,), daemon=True)
+            processus.start()
+            connexion_partition.close()
+            self._connexions.append(connexion)
+            self._processus.append(processus)
+        self._transactions = itertools.count()
+        self._verrou = threading.Lock()  # Un seul lot à la fois sur les tubes
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exception):
+        self.fermer()
+        return False
+
+    def fermer(self):
+        """Arrête les processus des partitions, y compris quand certains se sont déjà arrêtés."""
+        for connexion, processus in zip(self._connexions, self._processus):
+            try:
+                connexion.send(None)
+            except OSError:  # Tube rompu : le processus n'est plus là
+                pass
+            processus.join(5)
+            if processus.is_alive():
+                processus.terminate()
+                processus.join()
+            connexion.close()
+
+    def partition(self, cle):
+        return partition_de(cle, self.nombre_partitions)
+
+    def _aller_retour(self, lots):
+        """Envoie à chaque partition son lot (liste d'opérations) puis attend toutes les réponses.
+
+        Une partition arrêtée répond PARTITION_INDISPONIBLE à chacune de ses opérations.
+        """
+        actives = []
+        for numero, lot in enumerate(lots):
+            if lot:
+                try:
+                    self._connexions[numero].send(lot)
+                    actives.append(numero)
+                except OSError:
+                    pass
+        resultats = [[PARTITION_INDISPONIBLE] * len(lot) for lot in lots]
+        for numero in actives:
+            try:
+                resultats[numero] = self._connexions[numero].recv()
+            except (EOFError, OSError):
+                pass
+        return resultats
+
+    def executer(self, operations):
+        """Exécute un lot d'opérations (voir les constantes du module) ; renvoie leurs résultats dans l'ordre.
+
+        Un transfert est donné sous la forme (TRANSFERT_LOCAL, source, destination, montant) : le routeur
+        choisit lui-même entre l'exécution locale et le protocole en deux phases.
+        """
+        with self._verrou:
+            nombre = self.nombre_partitions
+            lots = [[] for _ in range(nombre)]
+            places = [[] for _ in range(nombre)]  # Position de chaque opération dans le résultat
+            distants = []  # (position, source, destination, montant, partition source, partition destination)
+            resultats = [None] * len(operations)
+            for position, operation in enumerate(operations):
+                try:
+                    nom = operation[0]
+                    if nom == OUVRIR_ENTREPRISE:
+                        partition = partition_de(cle_entreprise(operation[5]), nombre)
+                    elif nom == OUVRIR:
+                        partition = partition_de(operation[8], nombre)
+                    else:
+                        partition = partition_de(operation[1], nombre)
+                    arrivee = partition_de(operation[2], nombre) if nom == TRANSFERT_LOCAL else partition
+                    if arrivee != partition:
+                        montant = operation[3]
+                except (IndexError, TypeError, AttributeError) as erreur:  # Opération mal formée : pas de partition
+                    resultats[position] = f"{OPERATION_INVALIDE} : {erreur!r}"
+                    continue
+                if nom == TRANSFERT_LOCAL:
+                    if arrivee != partition:
+                        transaction = next(self._transactions)
+                        distants.append((position, transaction, operation[1], operation[2], montant, partition,
+                                         arrivee))
+                        lots[partition].append((RESERVER, transaction, operation[1], operation[3]))
+                        places[partition].append(None)
+                        lots[arrivee].append((PREPARER, transaction, operation[2]))
+                        places[arrivee].append(None)
+                        continue
+                lots[partition].append(operation)
+                places[partition].append(position)
+
+            reponses = self._aller_retour(lots)
+            preparations = {}  # Transaction -> réponses de la première phase (source, destination)
+            for numero in range(nombre):
+                for operation, place, reponse in zip(lots[numero], places[numero], reponses[numero]):
+                    if place is not None:
+                        resultats[place] = reponse
+                    else:
+                        preparations.setdefault(operation[1], []).append((operation[0], reponse))
+
+            if distants:
+                # Seconde phase : crédit des destinations ; les sources dont la transaction a échoué sont annulées
+                lots = [[] for _ in range(nombre)]
+                credits = []  # (position, transaction, destination, partitions source et destination, indice)
+                for position, transaction, source, destination, montant, depart, arrivee in distants:
+                    phase = dict(preparations[transaction])
+                    if phase[RESERVER] == PRETE and phase[PREPARER] == PRETE:
+                        lots[arrivee].append((CREDITER, transaction, source, destination, montant))
+                        credits.append((position, transaction, destination, depart, arrivee, len(lots[arrivee]) - 1))
+                    else:
+                        if phase[RESERVER] == PRETE:
+                            lots[depart].append((ANNULER, transaction))
+                        resultats[position] = phase[RESERVER] if phase[RESERVER] != PRETE else phase[PREPARER]
+                reponses = self._aller_retour(lots)
+
+                # Dernière phase : le débit réservé devient définitif si le crédit est fait, il est rendu sinon
+                lots = [[] for _ in range(nombre)]
+                validations = []
+                for position, transaction, destination, depart, arrivee, indice in credits:
+                    credit = reponses[arrivee][indice]
+                    if credit == CREDITE:
+                        lots[depart].append((VALIDER, transaction, destination))
+                        validations.append((position, depart, len(lots[depart]) - 1))
+                    else:
+                        lots[depart].append((ANNULER, transaction))
+                        resultats[position] = credit
+                reponses = self._aller_retour(lots)
+                for position, depart, indice in validations:
+                    resultats[position] = reponses[depart][indice]
+            return resultats
+
+    def ouvrir_compte(self, nom, adresse, telephone, cnic, login, mot_de_passe, limite_retrait, numero_carte=None):
+        """Ouvre un compte client dans sa partition ; renvoie son numéro de carte ou le message d'erreur."""
+        numero_carte = numero_carte or allocateur_par_defaut.allouer()
+        return self.executer([(OUVRIR, nom, adresse, telephone, cnic, login, mot_de_passe, limite_retrait,
+                               numero_carte)])[0]
+
+    def ouvrir_entreprise(self, nom_entreprise, adresse_entreprise, numero_fiscal, limite_retrait, compte_id,
+                          mot_de_passe):
+        """Ouvre un compte entreprise dans sa partition ; renvoie sa clé de compte."""
+        return self.executer([(OUVRIR_ENTREPRISE, nom_entreprise, adresse_entreprise, numero_fiscal, limite_retrait,
+                               compte_id, mot_de_passe)])[0]
+
+    def deposer(self, cle, montant):
+        return self.executer([(DEPOT, cle, montant)])[0]
+
+    def retirer(self, cle, montant):
+        return self.executer([(RETRAIT, cle, montant)])[0]
+
+    def transferer(self, cle_source, cle_destination, montant):
+        return self.executer([(TRANSFERT_LOCAL, cle_source, cle_destination, montant)])[0]
+
+    def solde(self, cle):
+        """Renvoie le solde d'un compte, ou None s'il n'existe pas."""
+        return self.executer([(SOLDE, cle)])[0]
+
+    def total(self):
+        """Renvoie la somme des soldes de toutes les partitions, en centimes (contrôle de conservation).
+
+        None si une partition est indisponible : la somme des autres ne dirait rien de la conservation.
+        """
+        with self._verrou:
+            totaux = [reponse[0] for reponse in self._aller_retour([[(TOTAL,)]] * self.nombre_partitions)]
+        return None if PARTITION_INDISPONIBLE in totaux else sum(totaux)
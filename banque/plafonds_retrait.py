@@ -0,0 +1,103 @@
+import threading
+import time
+from array import array
+from bisect import bisect_left
+
+from .journal_transactions import RETRAIT
+
+DUREE_TRANCHE = 3600  # Secondes couvertes par une tranche de la fenêtre
+NOMBRE_TRANCHES = 24  # Fenêtre glissante de 24 heures
+_TRANCHES_VIDES = array("q", bytes(8 * NOMBRE_TRANCHES))
+
+
+# Classe PlafondsRetrait : cumul des retraits de chaque compte sur les dernières 24 heures
+#
+# Chaque compte qui a déjà retiré possède une ligne de NOMBRE_TRANCHES compteurs horaires, le total de
+# ces compteurs et l'heure de la dernière mise à jour. Une vérification n'efface que les tranches sorties
+# de la fenêtre depuis la mise à jour précédente : coût constant amorti, sans relire l'historique.
+# La fenêtre retenue va du début de l'heure d'il y a 23 heures jusqu'à maintenant.
+class PlafondsRetrait:
+    def __init__(self):
+        self._lignes = {}  # Clé du compte -> ligne
+        self.tranches = array("q")  # Centimes, NOMBRE_TRANCHES cases par ligne
+        self.totaux = array("q")  # Somme des tranches de chaque ligne
+        self.heures = array("q")  # Heure (depuis l'epoch) de la dernière mise à jour de chaque ligne
+        # Seul l'ajout d'une ligne est protégé ici : les mises à jour d'une ligne existante
+        # se font sous le verrou du compte, pris par l'appelant
+        self._verrou = threading.Lock()
+
+    def __len__(self):
+        return len(self._lignes)
+
+    def _ligne(self, cle, heure):
+        ligne = self._lignes.get(cle)
+        if ligne is None:
+            with self._verrou:
+                ligne = self._lignes.get(cle)
+                if ligne is None:
+                    ligne = len(self.totaux)
+                    self.tranches.extend(_TRANCHES_VIDES)
+                    self.totaux.append(0)
+                    self.heures.append(heure)
+                    self._lignes[cle] = ligne
+        return ligne
+
+    def _avancer(self, ligne, heure):
+        """Vide les tranches sorties de la fenêtre depuis la dernière mise à jour de la ligne."""
+        derniere = self.heures[ligne]
+        if heure <= derniere:
+            return  # Même heure (ou horloge revenue en arrière) : rien n'a expiré
+        tranches = self.tranches
+        debut = ligne * NOMBRE_TRANCHES
+        if heure - derniere >= NOMBRE_TRANCHES:
+            tranches[debut:debut + NOMBRE_TRANCHES] = _TRANCHES_VIDES
+            self.totaux[ligne] = 0
+        else:
+            total = self.totaux[ligne]
+            for h in range(derniere + 1, heure + 1):
+                case = debut + h % NOMBRE_TRANCHES
+                total -= tranches[case]
+                tranches[case] = 0
+            self.totaux[ligne] = total
+        self.heures[ligne] = heure
+
+    def consommer(self, cle, centimes, limite, horodatage=None):
+        """Ajoute un retrait au cumul du compte s'il reste sous la limite ; renvoie False sinon."""
+        heure = int(time.time() if horodatage is None else horodatage) // DUREE_TRANCHE
+        ligne = self._lignes.get(cle)
+        if ligne is None:
+            ligne = self._ligne(cle, heure)
+        derniere = self.heures[ligne]
+        if heure > derniere:  # Cas courant : même heure que le retrait précédent, rien à vider
+            self._avancer(ligne, heure)
+            derniere = heure
+        total = self.totaux[ligne] + centimes
+        if total > limite:
+            return False
+        # Tranche de l'heure la plus récente vue pour ce compte, même si l'horloge a reculé
+        self.tranches[ligne * NOMBRE_TRANCHES + derniere % NOMBRE_TRANCHES] += centimes
+        self.totaux[ligne] = total
+        return True
+
+    def disponible(self, cle, limite, horodatage=None):
+        """Renvoie le montant (en centimes) que le compte peut encore retirer dans la fenêtre."""
+        ligne = self._lignes.get(cle)
+        if ligne is None:
+            return limite
+        self._avancer(ligne, int(time.time() if horodatage is None else horodatage) // DUREE_TRANCHE)
+        return max(limite - self.totaux[ligne], 0)
+
+    def reconstruire(self, journal, horodatage=None):
+        """Recalcule les cumuls à partir des retraits récents du journal (après une restauration)."""
+        maintenant = int(time.time() if horodatage is None else horodatage)
+        debut = (maintenant // DUREE_TRANCHE - NOMBRE_TRANCHES + 1) * DUREE_TRANCHE
+        # Le journal est rangé par ordre d'arrivée : seules ses dernières entrées sont lues
+        premiere = bisect_left(journal.horodatages, debut)
+        cles = journal.cles
+        for position in range(premiere, len(journal)):
+            if journal.types[position] == RETRAIT:
+                self.consommer(cles[journal.comptes[position]], journal.montants[position], float("inf"),
+                               journal.horodatages[position])
+
+
+plafonds_par_defaut = PlafondsRetrait()
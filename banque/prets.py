@@ -0,0 +1,443 @@
+import heapq
+import itertools
+import math
+import threading
+import time
+from array import array
+
+from .journal_transactions import (DECAISSEMENT, DEPOT, FRAIS, INTERETS, PREFIXE_ENTREPRISE, REMBOURSEMENT, RETRAIT,
+                                   TRANSFERT, TRANSFERT_ENTREPRISE, en_centimes, en_euros, formater_montant,
+                                   journal_par_defaut)
+from .verrous_comptes import verrous_par_defaut
+
+TAUX_PRET = 500  # Taux annuel par défaut, en points de base (1/100 de %)
+DUREE_MAXIMALE = 360  # Mois
+SECONDES_PAR_JOUR = 86400
+JOURS_PAR_MOIS = 30  # Une échéance tous les 30 jours à partir du versement
+JOURS_MINIMAUX = 30  # En deçà, l'historique de l'entreprise est jugé trop court pour être fiable
+PLAFOND_CARACTERISTIQUE = 5.0  # Borne des ratios avant pondération : un cas extrême ne décide pas seul
+
+# Pondérations du score de risque (régression logistique) : positives quand la caractéristique aggrave le risque
+POIDS_CONSTANTE = 0.5
+POIDS_COUVERTURE = -1.5  # Flux net mensuel / charges mensuelles de prêts (nouveau compris)
+POIDS_VOLATILITE = 0.8  # Écart-type mensuel des flux / charges mensuelles
+POIDS_RESERVE = -0.4  # Solde / charges mensuelles
+POIDS_HISTORIQUE_COURT = 2.0
+
+# Statuts d'une demande
+EN_ATTENTE = "en attente"
+APPROUVEE = "approuvée"
+REJETEE = "rejetée"
+
+
+def _arrondir(numerateur, denominateur):
+    """Division entière arrondie au plus proche, à égalité vers le pair (arrondi bancaire)."""
+    quotient, reste = divmod(numerateur, denominateur)
+    if 2 * reste > denominateur or (2 * reste == denominateur and quotient % 2):
+        quotient += 1
+    return quotient
+
+
+def _entier(valeur):
+    """Indique si valeur est un entier (les booléens n'en sont pas un ici)."""
+    return isinstance(valeur, int) and not isinstance(valeur, bool)
+
+
+# Classe Echeance : une ligne du tableau d'amortissement (montants en centimes)
+class Echeance:
+    __slots__ = ("numero", "montant", "interets", "capital", "restant")
+
+    def __init__(self, numero, montant, interets, capital, restant):
+        self.numero = numero
+        self.montant = montant
+        self.interets = interets
+        self.capital = capital
+        self.restant = restant  # Capital restant dû après cette échéance
+
+    def __str__(self):
+        return (f"Échéance {self.numero} : {formater_montant(self.montant)} dont {formater_montant(self.interets)} "
+                f"d'intérêts, reste {formater_montant(self.restant)}")
+
+
+def tableau_amortissement(capital, taux_annuel, duree_mois):
+    """Échéancier à mensualités constantes d'un prêt de capital centimes au taux annuel en points de base.
+
+    Les intérêts de chaque mois portent sur le capital restant dû, arrondis au centime ; la dernière
+    échéance solde le capital et absorbe les écarts d'arrondi.
+    """
+    denominateur = 12 * 10000
+    if taux_annuel:
+        taux = taux_annuel / denominateur
+        mensualite = round(capital * taux / (1 - (1 + taux) ** -duree_mois))
+    else:
+        mensualite = -(-capital // duree_mois)
+    echeances = []
+    restant = capital
+    for numero in range(1, duree_mois + 1):
+        interets = _arrondir(restant * taux_annuel, denominateur)
+        amortissement = restant if numero == duree_mois else min(mensualite - interets, restant)
+        restant -= amortissement
+        echeances.append(Echeance(numero, interets + amortissement, interets, amortissement, restant))
+    return echeances
+
+
+# Classe DemandePret : demande de prêt d'une entreprise, en attente de la décision d'un employé
+class DemandePret:
+    __slots__ = ("identifiant", "entreprise", "capital", "duree_mois", "taux_annuel", "horodatage", "statut",
+                 "motif", "decideur", "mensualite", "risque", "_version_risque", "guichet")
+
+    def __init__(self, identifiant, entreprise, capital, duree_mois, taux_annuel, horodatage, guichet):
+        self.identifiant = identifiant
+        self.entreprise = entreprise
+        self.capital = capital  # Centimes
+        self.duree_mois = duree_mois
+        self.taux_annuel = taux_annuel
+        self.horodatage = horodatage
+        self.statut = EN_ATTENTE
+        self.motif = ""
+        self.decideur = None  # Nom de l'employé qui a tranché
+        self.mensualite = None  # Centimes, calculée par GuichetPrets.deposer_demande si la demande est valide
+        self.risque = None  # Probabilité de défaut estimée, calculée par GuichetPrets.noter
+        self._version_risque = None  # État des caractéristiques lors du dernier calcul
+        self.guichet = guichet
+
+    def __str__(self):
+        risque = "non évalué" if self.risque is None else f"{self.risque:.0%}"
+        message = (f"Demande de prêt n°{self.identifiant} de {self.entreprise.nom_entreprise} : "
+                   f"{formater_montant(self.capital)} sur {self.duree_mois} mois, risque {risque}, {self.statut}")
+        return f"{message} ({self.motif})" if self.motif else message
+
+
+# Classe Pret : prêt accordé, son échéancier et l'avancement des remboursements
+class Pret:
+    __slots__ = ("identifiant", "entreprise", "capital", "taux_annuel", "echeancier", "date_versement", "payees",
+                 "impayes")
+
+    def __init__(self, identifiant, entreprise, capital, taux_annuel, duree_mois, date_versement):
+        self.identifiant = identifiant
+        self.entreprise = entreprise
+        self.capital = capital  # Centimes
+        self.taux_annuel = taux_annuel
+        self.echeancier = tableau_amortissement(capital, taux_annuel, duree_mois)
+        self.date_versement = date_versement
+        self.payees = 0  # Échéances remboursées
+        self.impayes = 0  # Prélèvements refusés faute de fonds
+
+    @property
+    def mensualite(self):
+        return self.echeancier[0].montant
+
+    @property
+    def restant(self):
+        """Capital restant dû, en centimes."""
+        return self.echeancier[self.payees - 1].restant if self.payees else self.capital
+
+    @property
+    def rembourse(self):
+        """Indique si toutes les échéances ont été remboursées."""
+        return self.payees == len(self.echeancier)
+
+    def date_echeance(self, numero):
+        """Horodatage auquel l'échéance numero (à partir de 1) est exigible."""
+        return self.date_versement + numero * JOURS_PAR_MOIS * SECONDES_PAR_JOUR
+
+    def __str__(self):
+        if self.rembourse:
+            return f"Prêt n°{self.identifiant} de {formater_montant(self.capital)} : remboursé"
+        return (f"Prêt n°{self.identifiant} de {formater_montant(self.capital)} : {self.payees}/"
+                f"{len(self.echeancier)} échéances payées, reste {formater_montant(self.restant)}"
+                + (f", {self.impayes} impayé(s)" if self.impayes else ""))
+
+
+# Classe Caracteristiques : indicateurs de trésorerie d'une entreprise à une date (centimes par jour)
+class Caracteristiques:
+    __slots__ = ("nombre_jours", "flux_moyen", "volatilite")
+
+    def __init__(self, nombre_jours, flux_moyen, volatilite):
+        self.nombre_jours = nombre_jours
+        self.flux_moyen = flux_moyen  # Moyenne des flux nets journaliers
+        self.volatilite = volatilite  # Écart-type des flux nets journaliers
+
+
+# Classe FluxEntreprises : statistiques des flux de trésorerie de chaque entreprise, tenues au fil du journal
+#
+# Chaque entreprise occupe une ligne de tableaux : le flux net du jour en cours et, pour les jours clos,
+# la moyenne et la somme des carrés des écarts (méthode de Welford). Un jour clos s'y ajoute en temps
+# constant, les jours sans opération (flux nul) aussi, d'un seul bloc. Le score d'une demande lit donc une
+# ligne au lieu de parcourir l'historique. Les prêts eux-mêmes (versements, remboursements) sont exclus :
+# seule compte la trésorerie d'exploitation.
+class FluxEntreprises:
+    def __init__(self):
+        self._lignes = {}
+        self.jours = array("q")  # Jour (depuis l'epoch) en cours de chaque ligne
+        self.flux_jour = array("q")  # Flux net du jour en cours, centimes
+        self.nombre_jours = array("I")  # Jours clos, y compris ceux sans opération
+        self.moyennes = array("d")  # Moyenne des flux nets des jours clos
+        self.carres = array("d")  # Somme des carrés des écarts à la moyenne
+        self.versions = array("I")  # Événements reçus : change dès que les caractéristiques changent
+        self._verrou = threading.Lock()  # Ajout des lignes seulement, comme pour PlafondsRetrait
+
+    def __len__(self):
+        return len(self._lignes)
+
+    def _ligne(self, cle, jour):
+        ligne = self._lignes.get(cle)
+        if ligne is None:
+            with self._verrou:
+                ligne = self._lignes.get(cle)
+                if ligne is None:
+                    ligne = len(self.jours)
+                    self.jours.append(jour)
+                    for colonne in (self.flux_jour, self.nombre_jours, self.moyennes, self.carres, self.versions):
+                        colonne.append(0)
+                    self._lignes[cle] = ligne
+        return ligne
+
+    def abonner(self, journal=None):
+        """Branche le suivi sur un journal pour tenir les statistiques au fil de l'eau."""
+        (journal if journal is not None else journal_par_defaut).abonner(self.observer, self.observer_lot)
+
+    def observer(self, type_evenement, centimes, cle, cle_contrepartie, horodatage):
+        """Ajoute un événement du journal aux flux des entreprises concernées (abonné du journal)."""
+        if type_evenement == DEPOT or type_evenement == INTERETS:
+            if cle.startswith(PREFIXE_ENTREPRISE):
+                self._ajouter(cle, centimes, horodatage)
+        elif type_evenement == RETRAIT or type_evenement == FRAIS:
+            if cle.startswith(PREFIXE_ENTREPRISE):
+                self._ajouter(cle, -centimes, horodatage)
+        elif type_evenement == TRANSFERT or type_evenement == TRANSFERT_ENTREPRISE:
+            if cle.startswith(PREFIXE_ENTREPRISE):
+                self._ajouter(cle, -centimes, horodatage)
+            if cle_contrepartie.startswith(PREFIXE_ENTREPRISE):
+                self._ajouter(cle_contrepartie, centimes, horodatage)
+
+    def observer_lot(self, evenements):
+        """Variante groupée (paiements en lot, arrêté) : chaque événement compte séparément."""
+        observer = self.observer
+        for evenement in evenements:
+            observer(*evenement)
+
+    def _ajouter(self, cle, centimes, horodatage):
+        jour = horodatage // SECONDES_PAR_JOUR
+        ligne = self._lignes.get(cle)
+        if ligne is None:
+            ligne = self._ligne(cle, jour)
+        if jour > self.jours[ligne]:
+            self._clore(ligne, jour)
+        self.flux_jour[ligne] += centimes  # Horloge revenue en arrière : compté dans le jour en cours
+        self.versions[ligne] += 1
+
+    def _cumuler(self, ligne, jour):
+        """Renvoie (jours, moyenne, carrés) de la ligne une fois close la journée en cours et les jours vides
+        qui la séparent de jour."""
+        nombre, moyenne, carres = self.nombre_jours[ligne], self.moyennes[ligne], self.carres[ligne]
+        courant = self.jours[ligne]
+        if jour <= courant:
+            return nombre, moyenne, carres
+        # Ajout du jour en cours (Welford)
+        flux = self.flux_jour[ligne]
+        nombre += 1
+        ecart = flux - moyenne
+        moyenne += ecart / nombre
+        carres += ecart * (flux - moyenne)
+        # Fusion d'un bloc de jours vides : moyenne nulle, aucun écart interne
+        vides = jour - courant - 1
+        if vides:
+            total = nombre + vides
+            ecart = -moyenne
+            moyenne += ecart * vides / total
+            carres += ecart * ecart * nombre * vides / total
+            nombre = total
+        return nombre, moyenne, carres
+
+    def _clore(self, ligne, jour):
+        self.nombre_jours[ligne], self.moyennes[ligne], self.carres[ligne] = self._cumuler(ligne, jour)
+        self.jours[ligne] = jour
+        self.flux_jour[ligne] = 0
+
+    def caracteristiques(self, cle, horodatage=None):
+        """Renvoie les Caracteristiques d'une entreprise sur les jours clos avant horodatage, ou None."""
+        ligne = self._lignes.get(cle)
+        if ligne is None:
+            return None
+        jour = int(time.time() if horodatage is None else horodatage) // SECONDES_PAR_JOUR
+        nombre, moyenne, carres = self._cumuler(ligne, jour)
+        return Caracteristiques(nombre, moyenne, math.sqrt(carres / nombre) if nombre else 0.0)
+
+    def version(self, cle, horodatage=None):
+        """Renvoie un repère qui change dès que les caractéristiques de l'entreprise peuvent avoir changé."""
+        ligne = self._lignes.get(cle)
+        jour = int(time.time() if horodatage is None else horodatage) // SECONDES_PAR_JOUR
+        return None if ligne is None else (self.versions[ligne], jour)
+
+    def rejouer(self, journal, debut=0):
+        """Passe un journal existant dans le suivi (historique antérieur à l'abonnement)."""
+        cles = journal.cles
+        observer = self.observer
+        for type_evenement, centimes, compte, contrepartie, horodatage in zip(
+                journal.types[debut:], journal.montants[debut:], journal.comptes[debut:],
+                journal.contreparties[debut:], journal.horodatages[debut:]):
+            observer(type_evenement, centimes, cles[compte],
+                     cles[contrepartie] if type_evenement == TRANSFERT or type_evenement == TRANSFERT_ENTREPRISE
+                     else None, horodatage)
+
+
+def evaluer_risque(caracteristiques, charges, solde):
+    """Probabilité de défaut estimée (entre 0 et 1) d'une entreprise qui devrait rembourser charges centimes par mois.
+
+    caracteristiques vient de FluxEntreprises (None sans aucun historique), solde est en centimes.
+    """
+    def borner(valeur):
+        return max(-PLAFOND_CARACTERISTIQUE, min(valeur, PLAFOND_CARACTERISTIQUE))
+
+    charges = max(charges, 1)
+    score = POIDS_CONSTANTE + POIDS_RESERVE * borner(solde / charges)
+    if caracteristiques is None or caracteristiques.nombre_jours < JOURS_MINIMAUX:
+        score += POIDS_HISTORIQUE_COURT
+    if caracteristiques is not None:
+        score += POIDS_COUVERTURE * borner(caracteristiques.flux_moyen * JOURS_PAR_MOIS / charges)
+        score += POIDS_VOLATILITE * borner(caracteristiques.volatilite * math.sqrt(JOURS_PAR_MOIS) / charges)
+    return 1 / (1 + math.exp(-score))
+
+
+# Classe GuichetPrets : demandes, décisions, versements et prélèvements des prêts aux entreprises
+#
+# Les demandes en attente sont notées par lots : une demande n'est recalculée que si les flux de son
+# entreprise ont bougé depuis sa dernière note. Les prêts accordés attendent leur prochaine échéance dans un
+# tas trié par date : un prélèvement ne parcourt que les prêts arrivés à échéance.
+class GuichetPrets:
+    def __init__(self, journal=None, verrous=None, suivre_journal=True):
+        # suivre_journal : reprendre l'historique du journal puis suivre ses nouveaux événements
+        self.journal = journal if journal is not None else journal_par_defaut
+        self.verrous = verrous if verrous is not None else verrous_par_defaut
+        self.flux = FluxEntreprises()
+        if suivre_journal:
+            self.flux.rejouer(self.journal)
+            self.flux.abonner(self.journal)
+        self.demandes = {}  # Identifiant -> DemandePret en attente
+        self.prets = {}  # Identifiant -> Pret accordé
+        self._echeances = []  # Tas de (date de la prochaine échéance, identifiant du prêt)
+        self._numeros = itertools.count(1)
+        self._verrou = threading.Lock()
+
+    def deposer_demande(self, entreprise, montant, duree_mois, taux_annuel=TAUX_PRET, horodatage=None):
+        """Enregistre une demande de prêt (montant en euros) ; une demande invalide revient déjà rejetée."""
+        horodatage = int(time.time()) if horodatage is None else horodatage
+        # Montant converti seulement s'il est un nombre fini : une demande invalide est rejetée, sans exception
+        montant_valide = isinstance(montant, (int, float)) and not isinstance(montant, bool) and math.isfinite(montant)
+        demande = DemandePret(next(self._numeros), entreprise, en_centimes(montant) if montant_valide else 0,
+                              duree_mois, taux_annuel, horodatage, self)
+        if demande.capital <= 0:
+            demande.statut, demande.motif = REJETEE, "Le montant du prêt doit être positif."
+        elif not _entier(duree_mois) or not 1 <= duree_mois <= DUREE_MAXIMALE:
+            demande.statut, demande.motif = (REJETEE,
+                                             f"La durée doit être un nombre entier de 1 à {DUREE_MAXIMALE} mois.")
+        elif not _entier(taux_annuel) or taux_annuel < 0:
+            demande.statut, demande.motif = (REJETEE,
+                                             "Le taux doit être un nombre entier de points de base, positif ou nul.")
+        else:
+            demande.mensualite = tableau_amortissement(demande.capital, taux_annuel, duree_mois)[0].montant
+            with self._verrou:
+                self.demandes[demande.identifiant] = demande
+        return demande
+
+    def noter(self, horodatage=None):
+        """Calcule le risque des demandes en attente dont l'entreprise a changé ; renvoie le nombre recalculé."""
+        horodatage = int(time.time()) if horodatage is None else horodatage
+        with self._verrou:
+            demandes = list(self.demandes.values())
+        recalculees = 0
+        for demande in demandes:
+            entreprise = demande.entreprise
+            version = (self.flux.version(entreprise.cle_journal, horodatage), len(entreprise.prets),
+                       en_centimes(entreprise.solde))
+            if version == demande._version_risque:
+                continue
+            charges = demande.mensualite + sum(pret.mensualite for pret in entreprise.prets if not pret.rembourse)
+            demande.risque = evaluer_risque(self.flux.caracteristiques(entreprise.cle_journal, horodatage), charges,
+                                            en_centimes(entreprise.solde))
+            demande._version_risque = version
+            recalculees += 1
+        return recalculees
+
+    def file_attente(self, nombre=None, horodatage=None):
+        """Demandes en attente, les moins risquées d'abord (puis les plus anciennes) ; nombre limite la liste."""
+        self.noter(horodatage)
+        with self._verrou:
+            demandes = list(self.demandes.values())
+        if nombre is None:
+            return sorted(demandes, key=_priorite)
+        return heapq.nsmallest(nombre, demandes, key=_priorite)
+
+    def _retirer(self, demande):
+        with self._verrou:
+            return self.demandes.pop(demande.identifiant, None) is not None
+
+    def approuver(self, demande, decideur=None, horodatage=None):
+        """Accorde le prêt d'une demande en attente et verse le capital sur le compte de l'entreprise."""
+        if not self._retirer(demande):
+            return f"La demande de prêt n°{demande.identifiant} n'est pas en attente."
+        horodatage = int(time.time()) if horodatage is None else horodatage
+        entreprise = demande.entreprise
+        pret = Pret(demande.identifiant, entreprise, demande.capital, demande.taux_annuel, demande.duree_mois,
+                    horodatage)
+        with self.verrous.verrou(entreprise.cle_journal):
+            entreprise.solde = en_euros(en_centimes(entreprise.solde) + pret.capital)
+            entreprise.prets.append(pret)
+            self.journal.enregistrer(DECAISSEMENT, en_euros(pret.capital), entreprise.cle_journal,
+                                     horodatage=horodatage)
+        demande.statut, demande.decideur = APPROUVEE, decideur
+        with self._verrou:
+            self.prets[pret.identifiant] = pret
+            heapq.heappush(self._echeances, (pret.date_echeance(1), pret.identifiant))
+        return (f"Prêt n°{pret.identifiant} de {formater_montant(pret.capital)} accordé à "
+                f"{entreprise.nom_entreprise} : {len(pret.echeancier)} mensualités de "
+                f"{formater_montant(pret.mensualite)}.")
+
+    def rejeter(self, demande, motif="", decideur=None):
+        """Refuse une demande en attente."""
+        if not self._retirer(demande):
+            return f"La demande de prêt n°{demande.identifiant} n'est pas en attente."
+        demande.statut, demande.motif, demande.decideur = REJETEE, motif, decideur
+        return f"Demande de prêt n°{demande.identifiant} de {demande.entreprise.nom_entreprise} rejetée."
+
+    def prelever_echeances(self, horodatage=None):
+        """Prélève les échéances exigibles ; une échéance impayée faute de fonds est retentée au prélèvement suivant."""
+        horodatage = int(time.time()) if horodatage is None else horodatage
+        payees = impayees = 0
+        with self._verrou:
+            exigibles = []
+            while self._echeances and self._echeances[0][0] <= horodatage:
+                exigibles.append(heapq.heappop(self._echeances)[1])
+        a_replanifier = []
+        for identifiant in exigibles:
+            pret = self.prets[identifiant]
+            entreprise = pret.entreprise
+            with self.verrous.verrou(entreprise.cle_journal):
+                # Une entreprise en retard rattrape d'un coup toutes ses échéances échues si ses fonds le permettent
+                while not pret.rembourse and pret.date_echeance(pret.payees + 1) <= horodatage:
+                    montant = pret.echeancier[pret.payees].montant
+                    solde = en_centimes(entreprise.solde)
+                    if montant > solde:
+                        pret.impayes += 1
+                        impayees += 1
+                        break
+                    entreprise.solde = en_euros(solde - montant)
+                    self.journal.enregistrer(REMBOURSEMENT, en_euros(montant), entreprise.cle_journal,
+                                             horodatage=horodatage)
+                    pret.payees += 1
+                    payees += 1
+            if not pret.rembourse:
+                # Une échéance impayée est retentée le lendemain
+                prochaine = pret.date_echeance(pret.payees + 1)
+                if prochaine <= horodatage:
+                    prochaine = horodatage + SECONDES_PAR_JOUR
+                a_replanifier.append((prochaine, identifiant))
+        with self._verrou:
+            for echeance in a_replanifier:
+                heapq.heappush(self._echeances, echeance)
+        return f"{payees} échéance(s) prélevée(s), {impayees} impayée(s)."
+
+
+def _priorite(demande):
+    return demande.risque, demande.horodatage, demande.identifiant
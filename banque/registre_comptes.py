@@ -0,0 +1,109 @@
+import bisect
+
+COMPTE_ENREGISTRE = "Compte enregistré dans le registre."
+
+
+# Classe RegistreComptes pour retrouver les comptes sans parcourir toutes les listes
+class RegistreComptes:
+    def __init__(self):
+        # Index de hachage : chaque recherche exacte se fait en temps constant
+        self.par_carte = {}
+        self.par_cnic = {}
+        self.par_login = {}
+        self.par_compte_id = {}
+        # Index par type de compte : type_compte -> ensemble de numéros de carte
+        self.par_type_compte = {}
+        # Index trié des numéros de carte pour les recherches par plage ou préfixe
+        self._cartes_triees = []
+        self._a_trier = False
+
+    def __len__(self):
+        return len(self.par_carte) + len(self.par_compte_id)
+
+    def enregistrer_client(self, client):
+        """Ajoute le compte d'un client à tous les index du registre ; renvoie COMPTE_ENREGISTRE ou le motif du refus.
+
+        Numéro de carte, CNIC et login (s'il est renseigné) doivent être libres : rien n'est écrasé.
+        """
+        compte = client.compte
+        if compte is None:
+            return "Le client n'a pas de compte à enregistrer."
+        if compte.numero_carte in self.par_carte:
+            return "Ce numéro de carte est déjà enregistré."
+        if client.cnic in self.par_cnic:
+            return "Ce CNIC est déjà enregistré."
+        if client.login and client.login in self.par_login:
+            return "Ce login est déjà utilisé."
+        self.par_carte[compte.numero_carte] = compte
+        self.par_cnic[client.cnic] = client
+        if client.login:  # Sans login, le client ne peut pas se connecter : rien à indexer
+            self.par_login[client.login] = client
+        self.par_type_compte.setdefault(compte.type_compte, set()).add(compte.numero_carte)
+        # Les insertions sont ajoutées en fin de liste, le tri est fait à la prochaine requête
+        self._cartes_triees.append(compte.numero_carte)
+        self._a_trier = True
+        return COMPTE_ENREGISTRE
+
+    def enregistrer_entreprise(self, entreprise):
+        """Ajoute le compte d'une entreprise à l'index des identifiants de compte."""
+        if entreprise.compte_id in self.par_compte_id:
+            return "Cet identifiant de compte est déjà enregistré."
+        self.par_compte_id[entreprise.compte_id] = entreprise
+        return "Compte entreprise enregistré dans le registre."
+
+    def retirer_client(self, client):
+        """Retire le compte d'un client de tous les index du registre."""
+        compte = client.compte
+        if compte is None or compte.numero_carte not in self.par_carte:
+            return "Compte introuvable dans le registre."
+        del self.par_carte[compte.numero_carte]
+        self.par_cnic.pop(client.cnic, None)
+        self.par_login.pop(client.login, None)
+        self.par_type_compte.get(compte.type_compte, set()).discard(compte.numero_carte)
+        self._trier()
+        position = bisect.bisect_left(self._cartes_triees, compte.numero_carte)
+        del self._cartes_triees[position]
+        return "Compte retiré du registre."
+
+    def trouver_par_carte(self, numero_carte):
+        """Renvoie le compte associé au numéro de carte, ou None."""
+        return self.par_carte.get(numero_carte)
+
+    def trouver_par_cnic(self, cnic):
+        """Renvoie le client associé au CNIC, ou None."""
+        return self.par_cnic.get(cnic)
+
+    def trouver_par_login(self, login):
+        """Renvoie le client associé au login, ou None."""
+        return self.par_login.get(login)
+
+    def trouver_par_compte_id(self, compte_id):
+        """Renvoie l'entreprise associée à l'identifiant de compte, ou None."""
+        return self.par_compte_id.get(compte_id)
+
+    def comptes_par_type(self, type_compte):
+        """Renvoie les numéros de carte triés pour un type de compte donné."""
+        return sorted(self.par_type_compte.get(type_compte, ()))
+
+    def cartes_par_plage(self, debut, fin):
+        """Renvoie les numéros de carte compris entre debut (inclus) et fin (exclu)."""
+        self._trier()
+        gauche = bisect.bisect_left(self._cartes_triees, debut)
+        droite = bisect.bisect_left(self._cartes_triees, fin)
+        return self._cartes_triees[gauche:droite]
+
+    def cartes_par_prefixe(self, prefixe):
+        """Renvoie les numéros de carte qui commencent par le préfixe donné."""
+        # Tous les chiffres étant inférieurs à ":", cette borne couvre tout le préfixe
+        return self.cartes_par_plage(prefixe, prefixe + ":")
+
+    def numeros_cartes(self):
+        """Renvoie tous les numéros de carte enregistrés, triés."""
+        self._trier()
+        return list(self._cartes_triees)
+
+    def _trier(self):
+        """Trie l'index des cartes seulement si de nouvelles cartes ont été ajoutées."""
+        if self._a_trier:
+            self._cartes_triees.sort()
+            self._a_trier = False
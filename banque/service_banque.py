@@ -0,0 +1,229 @@
+import asyncio
+import json
+import math
+
+from .authentification import Authentification
+from .modele import Client
+from .registre_comptes import RegistreComptes
+
+LIMITE_LIGNE = 64 * 1024  # Taille maximale d'une requête
+LIMITE_TAMPON_ECRITURE = 256 * 1024  # Au-delà, on attend que le client lise ses réponses
+REQUETES_AVANT_PAUSE = 64  # Une connexion très chargée laisse régulièrement la main aux autres
+TAILLE_PAGE = 100  # Transactions renvoyées au plus par requête "historique"
+MONTANT_MAXIMAL = 10 ** 12  # Euros, par opération : loin de la capacité des colonnes du journal (centimes sur 8 octets)
+# Opérations qui calculent une empreinte de mot de passe (~0,1 s) : exécutées hors de la boucle d'événements
+OPERATIONS_LENTES = (b'"creer_compte"', b'"connexion"')
+
+
+# Classe ServiceBanque : protocole en lignes JSON au-dessus des classes du domaine
+#
+# Chaque ligne reçue est une requête {"op": ..., ...} et reçoit une ligne de réponse {"ok": ..., "message": ...},
+# dans le même ordre : un client peut envoyer plusieurs requêtes sans attendre les réponses.
+# Après "connexion", les requêtes désignent leur compte par "jeton" : c'est le seul moyen d'y accéder. Seuls
+# les tests et les bancs de mesure passent sessions_obligatoires=False pour désigner un compte par "carte" ou
+# "entreprise" sans identifiants. Avec une Instrumentation, "metriques" renvoie ses mesures au format Prometheus.
+class ServiceBanque:
+    def __init__(self, registre=None, sessions_obligatoires=True, instrumentation=None):
+        self.registre = registre if registre is not None else RegistreComptes()
+        self.authentification = Authentification(self.registre)
+        self.sessions_obligatoires = sessions_obligatoires
+        self.operations = {
+            "creer_compte": self.creer_compte,
+            "connexion": self.connexion,
+            "deconnexion": self.deconnexion,
+            "deposer": self.deposer,
+            "retirer": self.retirer,
+            "transferer": self.transferer,
+            "solde": self.solde,
+            "historique": self.historique,
+        }
+        self.instrumentation = instrumentation
+        if instrumentation is not None:
+            self.operations["metriques"] = self.metriques
+        self.nombre_connexions = 0
+
+    def trouver_compte(self, requete, champ_carte="carte", champ_entreprise="entreprise"):
+        """Retrouve un compte client (par carte) ou entreprise (par identifiant de compte)."""
+        if champ_carte == "carte" and "jeton" in requete:
+            return self.authentification.verifier_jeton(requete["jeton"])
+        if self.sessions_obligatoires and champ_carte == "carte":
+            return None
+        if champ_carte in requete:
+            return self.registre.trouver_par_carte(requete[champ_carte])
+        if champ_entreprise in requete:
+            return self.registre.trouver_par_compte_id(requete[champ_entreprise])
+        return None
+
+    def creer_compte(self, requete):
+        """Ouvre un compte client à partir des informations de la requête."""
+        client = Client(requete.get("nom", ""), requete.get("adresse", ""), requete.get("telephone", ""),
+                        requete.get("cnic", ""), requete.get("login", ""), requete.get("mot_de_passe", ""),
+                        float(requete.get("limite_retrait", 0)))
+        message = client.creer_compte(self.registre)
+        if client.compte is None:
+            return {"ok": False, "message": message}
+        return {"ok": True, "message": message, "carte": client.compte.numero_carte,
+                "type_compte": client.compte.type_compte}
+
+    def connexion(self, requete):
+        """Ouvre une session pour un client ("login") ou une entreprise ("entreprise")."""
+        if "entreprise" in requete:
+            jeton = self.authentification.connecter_entreprise(requete["entreprise"], requete.get("mot_de_passe", ""))
+        else:
+            jeton = self.authentification.connecter(requete.get("login", ""), requete.get("mot_de_passe", ""))
+        if jeton is None:
+            return {"ok": False, "message": "Identifiants invalides ou trop de tentatives."}
+        return {"ok": True, "message": "Connexion réussie.", "jeton": jeton}
+
+    def deconnexion(self, requete):
+        """Ferme la session désignée par "jeton"."""
+        if not self.authentification.deconnecter(requete.get("jeton")):
+            return {"ok": False, "message": "Session inconnue."}
+        return {"ok": True, "message": "Déconnexion réussie."}
+
+    def deposer(self, requete):
+        """Dépose un montant sur un compte."""
+        compte = self.trouver_compte(requete)
+        if compte is None:
+            return {"ok": False, "message": "Compte introuvable."}
+        montant = _montant(requete)
+        if montant is None:
+            return {"ok": False, "message": "Montant invalide."}
+        return _reponse(compte.deposer_fonds(montant))
+
+    def retirer(self, requete):
+        """Retire un montant d'un compte."""
+        compte = self.trouver_compte(requete)
+        if compte is None:
+            return {"ok": False, "message": "Compte introuvable."}
+        montant = _montant(requete)
+        if montant is None:
+            return {"ok": False, "message": "Montant invalide."}
+        return _reponse(compte.retirer_fonds(montant))
+
+    def transferer(self, requete):
+        """Transfère un montant d'un compte vers un autre."""
+        compte = self.trouver_compte(requete)
+        destinataire = self.trouver_compte(requete, "destination", "entreprise_destination")
+        if compte is None or destinataire is None:
+            return {"ok": False, "message": "Compte introuvable."}
+        montant = _montant(requete)
+        if montant is None:
+            return {"ok": False, "message": "Montant invalide."}
+        return _reponse(compte.transferer_fonds(montant, destinataire))
+
+    def solde(self, requete):
+        """Renvoie le solde d'un compte."""
+        compte = self.trouver_compte(requete)
+        if compte is None:
+            return {"ok": False, "message": "Compte introuvable."}
+        return {"ok": True, "message": compte.consulter_solde(), "solde": compte.solde}
+
+    def historique(self, requete):
+        """Renvoie une page de l'historique d'un compte ; "curseur" dans la réponse donne la page suivante."""
+        compte = self.trouver_compte(requete)
+        if compte is None:
+            return {"ok": False, "message": "Compte introuvable."}
+        taille = max(1, min(requete.get("taille", TAILLE_PAGE), TAILLE_PAGE))  # Toujours entre 1 et TAILLE_PAGE
+        page = compte.page_historique(taille, requete.get("curseur"),
+                                      requete.get("depuis"), requete.get("jusqu_a"), requete.get("types"),
+                                      requete.get("montant_min"), requete.get("montant_max"))
+        return {"ok": True, "message": str(page) or "Aucune transaction enregistrée.", "curseur": page.curseur}
+
+    def metriques(self, requete):
+        """Renvoie les compteurs et histogrammes de durée des opérations (texte d'exposition Prometheus)."""
+        return {"ok": True, "message": self.instrumentation.exporter()}
+
+    def executer(self, ligne):
+        """Exécute une requête JSON et renvoie la ligne de réponse encodée."""
+        requete = None
+        try:
+            requete = json.loads(ligne, parse_constant=_refuser_constante)
+            operation = self.operations.get(requete.get("op"))
+            if operation is None:
+                reponse = {"ok": False, "message": "Opération inconnue."}
+            else:
+                reponse = operation(requete)
+        except (ValueError, TypeError, AttributeError):
+            reponse = {"ok": False, "message": "Requête invalide."}
+        except Exception:
+            # Une requête ne doit jamais couper la connexion : les requêtes suivantes du client restent servies
+            reponse = {"ok": False, "message": "Erreur interne."}
+        if isinstance(requete, dict) and "id" in requete:
+            reponse["id"] = requete["id"]  # Permet au client de relier la réponse à sa requête
+        return _encoder(reponse)
+
+    async def traiter_connexion(self, lecteur, ecrivain):
+        """Sert une connexion : les requêtes en attente sont traitées à la suite, dans l'ordre."""
+        self.nombre_connexions += 1
+        traitees = 0
+        try:
+            while True:
+                try:
+                    ligne = await lecteur.readline()
+                except (asyncio.LimitOverrunError, ValueError):
+                    ecrivain.write(_encoder({"ok": False, "message": "Requête trop longue."}))
+                    break
+                if not ligne:
+                    break
+                if any(operation in ligne for operation in OPERATIONS_LENTES):
+                    # Les autres connexions continuent d'être servies pendant le calcul de l'empreinte
+                    reponse = await asyncio.get_running_loop().run_in_executor(None, self.executer, ligne)
+                else:
+                    reponse = self.executer(ligne)
+                ecrivain.write(reponse)
+                traitees += 1
+                if traitees % REQUETES_AVANT_PAUSE == 0:
+                    await asyncio.sleep(0)
+                # Contre-pression : on ne lit plus rien tant que le client ne consomme pas ses réponses
+                if ecrivain.transport.get_write_buffer_size() > LIMITE_TAMPON_ECRITURE:
+                    await ecrivain.drain()
+            await ecrivain.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self.nombre_connexions -= 1
+            ecrivain.close()
+
+    async def demarrer(self, hote="127.0.0.1", port=8765, chemin_socket=None):
+        """Démarre le serveur TCP local, ou sur une socket Unix si un chemin est donné."""
+        if chemin_socket is not None:
+            return await asyncio.start_unix_server(self.traiter_connexion, chemin_socket, limit=LIMITE_LIGNE)
+        return await asyncio.start_server(self.traiter_connexion, hote, port, limit=LIMITE_LIGNE)
+
+
+def _encoder(reponse):
+    return json.dumps(reponse, ensure_ascii=False).encode() + b"\n"
+
+
+def _refuser_constante(nom):
+    """NaN, Infinity et -Infinity sont acceptés par json.loads mais ne sont pas des montants : la requête est refusée."""
+    raise ValueError(f"Constante JSON refusée : {nom}")
+
+
+def _montant(requete):
+    """Renvoie le montant de la requête s'il s'agit d'un nombre fini et représentable, sinon None."""
+    montant = requete.get("montant", 0)
+    if isinstance(montant, bool) or not isinstance(montant, (int, float)):
+        return None
+    if not math.isfinite(montant) or abs(montant) > MONTANT_MAXIMAL:
+        return None
+    return montant
+
+
+def _reponse(message):
+    """Transforme le message d'une opération du domaine en réponse du service."""
+    return {"ok": "succès" in message, "message": message}
+
+
+async def servir(port=8765, metriques=False):
+    """Démarre le service et le fait tourner jusqu'à l'arrêt du processus ; metriques active l'instrumentation."""
+    instrumentation = None
+    if metriques:
+        from .instrumentation import instrumentation_par_defaut as instrumentation
+        instrumentation.activer()
+    serveur = await ServiceBanque(instrumentation=instrumentation).demarrer(port=port)
+    print(f"Service bancaire à l'écoute sur {', '.join(str(s.getsockname()) for s in serveur.sockets)}")
+    async with serveur:
+        await serveur.serve_forever()
+
@@ -0,0 +1,200 @@
+from array import array
+
+from .allocateur_cartes import allocateur_par_defaut
+from .journal_transactions import AUCUN, en_centimes, en_euros, journal_par_defaut
+from .modele import Client, CompteBancaire
+from .plafonds_retrait import plafonds_par_defaut
+from .verrous_comptes import verrous_par_defaut
+
+TYPES_COMPTE = ("Compte épargne", "Compte courant", "Compte premium")
+VIDE = 0  # Case libre de l'index des cartes (les lignes y sont stockées décalées de 1)
+MELANGE = 11400714819323198485  # Constante de Fibonacci pour disperser les numéros de carte
+
+
+# Classe _ColonneTexte : chaînes mises bout à bout dans un seul tampon, repérées par leur fin
+class _ColonneTexte:
+    def __init__(self):
+        self.octets = bytearray()
+        self.fins = array("Q")
+
+    def ajouter(self, texte):
+        self.octets += texte.encode()
+        self.fins.append(len(self.octets))
+
+    def __getitem__(self, ligne):
+        debut = self.fins[ligne - 1] if ligne else 0
+        return self.octets[debut:self.fins[ligne]].decode()
+
+
+# Classe _IndexCartes : table de hachage à adressage ouvert, 4 octets par case au lieu d'un dict d'objets
+class _IndexCartes:
+    def __init__(self, cartes, capacite=1024):
+        self.cartes = cartes  # Colonne des cartes de la table, pour comparer les clés
+        self.cases = array("I", bytes(4 * capacite))
+        self.masque = capacite - 1
+        self.decalage = 64 - capacite.bit_length() + 1
+
+    def _case(self, carte):
+        return ((carte * MELANGE) & 0xFFFFFFFFFFFFFFFF) >> self.decalage
+
+    def trouver(self, carte):
+        """Renvoie la ligne d'une carte, ou None."""
+        cases = self.cases
+        case = self._case(carte)
+        while True:
+            ligne = cases[case]
+            if ligne == VIDE:
+                return None
+            if self.cartes[ligne - 1] == carte:
+                return ligne - 1
+            case = (case + 1) & self.masque
+
+    def ajouter(self, carte, ligne):
+        if 2 * len(self.cartes) > len(self.cases):  # Taux de remplissage maximal : 50 %
+            self._agrandir()
+        cases = self.cases
+        case = self._case(carte)
+        while cases[case] != VIDE:
+            case = (case + 1) & self.masque
+        cases[case] = ligne + 1
+
+    def _agrandir(self):
+        capacite = 2 * len(self.cases)
+        self.cases = array("I", bytes(4 * capacite))
+        self.masque = capacite - 1
+        self.decalage = 64 - capacite.bit_length() + 1
+        cases = self.cases
+        for ligne, carte in enumerate(self.cartes[:-1]):
+            case = self._case(carte)
+            while cases[case] != VIDE:
+                case = (case + 1) & self.masque
+            cases[case] = ligne + 1
+
+
+# Classe TableComptes : tous les comptes clients rangés en colonnes (une entrée de tableau par champ)
+class TableComptes:
+    def __init__(self, journal=None, verrous=None, plafonds=None):
+        # Comparaison à None : un journal ou des plafonds encore vides sont faux en contexte booléen
+        self.journal = journal if journal is not None else journal_par_defaut
+        self.verrous = verrous if verrous is not None else verrous_par_defaut
+        self.plafonds = plafonds if plafonds is not None else plafonds_par_defaut
+        self.cartes = array("q")
+        self.soldes = array("q")  # Centimes
+        self.limites = array("q")  # Centimes
+        self.types = array("B")  # Indice dans TYPES_COMPTE
+        self.gels = array("B")
+        self.pins = {}  # Ligne -> empreinte du PIN, pour les seuls comptes qui en ont un
+        self.cnics = array("q")
+        self.telephones = array("q")  # Négatif quand le numéro commence par « + »
+        self.noms = _ColonneTexte()
+        self.adresses = _ColonneTexte()
+        self.logins = _ColonneTexte()
+        self.mots_de_passe = _ColonneTexte()
+        self._index = _IndexCartes(self.cartes)
+        # Indice de clé de chaque compte dans le journal (AUCUN tant qu'il n'a pas servi), pour une génération
+        self._indices_journal = array("I")
+        self._generation_journal = None
+
+    def __len__(self):
+        return len(self.cartes)
+
+    def ouvrir_compte(self, nom, adresse, telephone, cnic, login, mot_de_passe, limite_retrait, numero_carte=None,
+                      empreinte=None):
+        """Vérifie les informations du client et ajoute son compte à la table ; renvoie le compte ou le message d'erreur."""
+        client = Client(nom, adresse, telephone, cnic, login, mot_de_passe, limite_retrait, empreinte)
+        est_valide, message = client.verifier_information()
+        if not est_valide:
+            return message
+        carte = int(numero_carte or allocateur_par_defaut.allouer())
+        ligne = len(self.cartes)
+        self.cartes.append(carte)
+        self.soldes.append(0)
+        self.limites.append(en_centimes(limite_retrait))
+        self.types.append(0 if limite_retrait <= 50000 else 1 if limite_retrait <= 100000 else 2)
+        self.gels.append(0)
+        self.cnics.append(int(cnic))
+        self.telephones.append(-int(telephone[1:]) if telephone.startswith("+") else int(telephone))
+        self.noms.ajouter(nom)
+        self.adresses.ajouter(adresse)
+        self.logins.ajouter(login)
+        self.mots_de_passe.ajouter(client.mot_de_passe)
+        self._index.ajouter(carte, ligne)
+        return CompteTable(self, ligne)
+
+    def trouver_par_carte(self, numero_carte):
+        """Renvoie le compte associé au numéro de carte, ou None (même interface que RegistreComptes)."""
+        ligne = self._index.trouver(int(numero_carte))
+        return None if ligne is None else CompteTable(self, ligne)
+
+    def indices_journal(self, lignes):
+        """Renvoie l'indice de clé dans le journal des comptes aux lignes données (array("I")).
+
+        Les indices sont retenus dans une colonne : seuls les comptes encore inconnus passent par leur clé texte.
+        """
+        journal = self.journal
+        if self._generation_journal != journal.generation:
+            self._indices_journal = array("I")  # Clés renumérotées par charger_colonnes
+            self._generation_journal = journal.generation
+        indices = self._indices_journal
+        if len(indices) < len(self.cartes):
+            indices.extend(array("I", (AUCUN,)) * (len(self.cartes) - len(indices)))
+        resultat = array("I", [indices[ligne] for ligne in lignes])
+        manquantes = [rang for rang, indice in enumerate(resultat) if indice == AUCUN]
+        if manquantes:
+            cartes = self.cartes
+            cles = [f"{cartes[lignes[rang]]:016d}" for rang in manquantes]
+            for rang, indice in zip(manquantes, journal.indices(cles)):
+                resultat[rang] = indices[lignes[rang]] = indice
+        return resultat
+
+    def comptes(self):
+        """Parcourt tous les comptes de la table."""
+        for ligne in range(len(self.cartes)):
+            yield CompteTable(self, ligne)
+
+    def client(self, ligne):
+        """Reconstruit le Client d'une ligne (objet éphémère)."""
+        telephone = self.telephones[ligne]
+        client = Client(self.noms[ligne], self.adresses[ligne], f"+{-telephone}" if telephone < 0 else str(telephone),
+                        f"{self.cnics[ligne]:013d}", self.logins[ligne], "", en_euros(self.limites[ligne]),
+                        self.mots_de_passe[ligne] or None)  # Empreinte déjà calculée ; vide si aucun mot de passe
+        client.compte = CompteTable(self, ligne)
+        return client
+
+
+def _colonne(nom, lire, ecrire=None):
+    """Crée une propriété qui lit (et écrit) la case de la colonne `nom` à la ligne du compte."""
+    def getter(compte):
+        return lire(getattr(compte.table, nom)[compte.ligne])
+
+    def setter(compte, valeur):
+        getattr(compte.table, nom)[compte.ligne] = ecrire(valeur)
+
+    return property(getter, setter if ecrire else None)
+
+
+# Classe CompteTable : vue légère sur une ligne de TableComptes, avec toute l'interface de CompteBancaire
+class CompteTable(CompteBancaire):
+    __slots__ = ("table", "ligne")
+
+    def __init__(self, table, ligne):
+        self.table = table
+        self.ligne = ligne
+
+    solde = _colonne("soldes", en_euros, en_centimes)
+    numero_carte = _colonne("cartes", lambda carte: f"{carte:016d}")
+    type_compte = _colonne("types", TYPES_COMPTE.__getitem__)
+    est_gelé = _colonne("gels", bool, int)
+    pin = property(lambda compte: compte.table.pins.get(compte.ligne),
+                   lambda compte, pin: compte.table.pins.__setitem__(compte.ligne, pin))
+    journal = property(lambda compte: compte.table.journal)
+    verrous = property(lambda compte: compte.table.verrous)
+    plafonds = property(lambda compte: compte.table.plafonds)
+    limite_retrait = _colonne("limites", en_euros)
+    client = property(lambda compte: compte.table.client(compte.ligne))
+
+    def __eq__(self, autre):
+        return isinstance(autre, CompteTable) and autre.table is self.table and autre.ligne == self.ligne
+
+    def __hash__(self):
+        return hash((id(self.table), self.ligne))
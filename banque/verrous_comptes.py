@@ -0,0 +1,64 @@
+import threading
+import zlib
+
+NOMBRE_VERROUS = 4096
+
+
+# Classe _Verrous : prend une suite de verrous dans l'ordre et les relâche dans l'ordre inverse
+class _Verrous:
+    __slots__ = ("verrous",)
+
+    def __init__(self, verrous):
+        self.verrous = verrous
+
+    def __enter__(self):
+        for verrou in self.verrous:
+            verrou.acquire()
+        return self
+
+    def __exit__(self, *exception):
+        for verrou in reversed(self.verrous):
+            verrou.release()
+        return False
+
+
+# Classe VerrousComptes : verrous répartis par compte, en nombre fixe quel que soit le nombre de comptes
+class VerrousComptes:
+    def __init__(self, nombre=NOMBRE_VERROUS):
+        self.verrous = [threading.Lock() for _ in range(nombre)]
+
+    def indice(self, cle):
+        """Renvoie l'indice du verrou qui protège un compte (stable d'un processus à l'autre)."""
+        return zlib.crc32(cle.encode()) % len(self.verrous)
+
+    def verrou(self, cle):
+        """Renvoie le verrou qui protège le solde d'un compte."""
+        return _Verrous((self.verrous[self.indice(cle)],))
+
+    def paire(self, cle_source, cle_destination):
+        """Renvoie les verrous de deux comptes, toujours pris dans l'ordre de leur indice.
+
+        L'ordre fixe évite l'interblocage quand deux transferts croisés s'exécutent en même temps.
+        """
+        source = self.indice(cle_source)
+        destination = self.indice(cle_destination)
+        if source == destination:
+            return _Verrous((self.verrous[source],))
+        if source > destination:
+            source, destination = destination, source
+        return _Verrous((self.verrous[source], self.verrous[destination]))
+
+    def plusieurs(self, cles):
+        """Renvoie les verrous d'un ensemble de comptes, sans doublon et dans l'ordre de leur indice."""
+        crc32 = zlib.crc32
+        nombre = len(self.verrous)
+        indices = sorted({crc32(cle.encode()) % nombre for cle in cles})
+        return _Verrous(tuple(self.verrous[indice] for indice in indices))
+
+    def tous(self):
+        """Renvoie tous les verrous dans l'ordre, pour figer l'ensemble des comptes (instantané)."""
+        return _Verrous(tuple(self.verrous))
+
+
+# Verrous partagés par tous les comptes
+verrous_par_defaut = VerrousComptes()
@@ -0,0 +1,32 @@
+"""Mesure le débit d'attribution de numéros de carte sur plus de 10 millions de cartes.
+
+Exécuter depuis la racine du dépôt : python -m benchmarks.bench_allocateur [total] [taille_lot]
+"""
+import sys
+import time
+
+from banque.allocateur_cartes import AllocateurCartes, luhn_valide
+
+
+def main(total=10000000, taille_lot=100000):
+    allocateur = AllocateurCartes()
+    debut = time.perf_counter()
+    derniers = []
+    emis = 0
+    while emis < total:
+        derniers = allocateur.allouer_lot(min(taille_lot, total - emis))
+        emis += len(derniers)
+    duree = time.perf_counter() - debut
+    print(f"{emis} cartes émises en {duree:.2f} s, soit {emis / duree:,.0f} cartes/s")
+
+    # Après 10M cartes, l'allocation unitaire reste au même coût
+    debut = time.perf_counter()
+    for _ in range(100000):
+        allocateur.allouer()
+    duree = time.perf_counter() - debut
+    print(f"allocation unitaire après {emis} cartes : {100000 / duree:,.0f} cartes/s")
+    assert all(luhn_valide(numero) for numero in derniers)
+
+
+if __name__ == "__main__":
+    main(*[int(n) for n in sys.argv[1:3]])
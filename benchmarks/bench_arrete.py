@@ -0,0 +1,48 @@
+"""Mesure l'arrêté de fin de journée : calcul vectorisé seul sur 10 millions de soldes, puis arrêté complet.
+
+L'arrêté complet (soldes mis à jour, écritures au journal, fichier de reprise) porte sur une TableComptes et
+est passé deux jours de suite : le premier crée les clés des comptes dans le journal, le second les réutilise.
+Exécuter depuis la racine du dépôt : python -m benchmarks.bench_arrete [soldes] [comptes]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+from array import array
+
+from banque import arrete_journalier
+from banque.arrete_journalier import SECONDES_PAR_JOUR, ArreteJournalier, calculer
+from banque.journal_transactions import JournalTransactions
+from banque.table_comptes import TableComptes
+
+
+def main(nombre_soldes=10000000, nombre_comptes=1000000):
+    generateur = random.Random(3)
+    soldes = array("q", (generateur.randint(0, 10 ** 8) for _ in range(nombre_soldes)))
+    types = array("B", (generateur.randint(0, 2) for _ in range(nombre_soldes)))
+    moteur = "numpy" if arrete_journalier.numpy is not None else "pur Python"
+    debut = time.perf_counter()
+    interets, frais = calculer(soldes, types)
+    duree = time.perf_counter() - debut
+    print(f"Calcul ({moteur}) sur {nombre_soldes:,} soldes : {duree:.2f} s, "
+          f"{sum(interets) / 100:,.2f}€ d'intérêts, {sum(frais) / 100:,.2f}€ de frais")
+
+    table = TableComptes(journal=JournalTransactions())
+    for i in range(nombre_comptes):
+        table.ouvrir_compte(f"Client {i}", "Adresse", "+33600000000", f"{i:013d}", f"login{i}", "",
+                            generateur.choice((1000, 60000, 100000)))
+    table.soldes[:] = soldes[:nombre_comptes]
+    maintenant = int(time.time())
+    with tempfile.TemporaryDirectory() as dossier:
+        arrete = ArreteJournalier(table, fichier_reprise=os.path.join(dossier, "arrete.json"))
+        for jour in (1, 2):
+            debut = time.perf_counter()
+            resultat = arrete.executer(maintenant + (jour - 1) * SECONDES_PAR_JOUR)
+            duree = time.perf_counter() - debut
+            print(f"Arrêté complet, jour {jour}, sur {nombre_comptes:,} comptes : {duree:.2f} s "
+                  f"({nombre_comptes / duree:,.0f} comptes/s), {len(table.journal):,} écritures au journal")
+            print(resultat)
+
+if __name__ == "__main__":
+    main(*[int(n) for n in sys.argv[1:3]])
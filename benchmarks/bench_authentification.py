@@ -0,0 +1,45 @@
+"""Mesure le débit des connexions à froid (dérivation de clé) et à chaud (jeton de session), puis le blocage du PIN.
+
+Exécuter depuis la racine du dépôt : python -m benchmarks.bench_authentification [connexions] [requêtes]
+"""
+import sys
+import time
+
+from banque.authentification import Authentification
+from banque.modele import Client
+from banque.registre_comptes import RegistreComptes
+
+
+def main(nombre_connexions=20, nombre_requetes=200000):
+    registre = RegistreComptes()
+    for i in range(nombre_connexions):
+        client = Client(f"Client {i}", "Adresse", "+33600000000", f"{i:013d}", f"login{i}", f"secret{i}", 1000)
+        client.creer_compte(registre)
+    authentification = Authentification(registre)
+
+    debut = time.perf_counter()
+    jetons = [authentification.connecter(f"login{i}", f"secret{i}") for i in range(nombre_connexions)]
+    froid = (time.perf_counter() - debut) / nombre_connexions
+    assert None not in jetons, "Connexion refusée"
+    print(f"À froid (mot de passe) : {froid * 1000:,.1f} ms par connexion, {1 / froid:,.0f} connexions/s")
+
+    debut = time.perf_counter()
+    for i in range(nombre_requetes):
+        assert authentification.verifier_jeton(jetons[i % nombre_connexions]) is not None
+    chaud = (time.perf_counter() - debut) / nombre_requetes
+    print(f"À chaud (jeton de session) : {chaud * 1e6:,.2f} µs par requête, {1 / chaud:,.0f} requêtes/s "
+          f"({froid / chaud:,.0f}x)")
+
+    # Force brute sur un PIN à 4 chiffres : seuls les premiers essais sont réellement évalués
+    compte = registre.trouver_par_login("login0").compte
+    compte.entrer_pin("4821")
+    debut = time.perf_counter()
+    messages = [compte.verifier_pin(f"{essai:04d}") for essai in range(10000)]
+    duree = time.perf_counter() - debut
+    evalues = sum(message != "Trop de tentatives, réessayez plus tard." for message in messages)
+    print(f"Force brute sur le PIN : {evalues} essais évalués sur 10000 en {duree:.2f} s, le reste est bloqué")
+    assert evalues == 3 and "PIN vérifié avec succès." not in messages, "Le blocage du PIN n'a pas fonctionné"
+
+
+if __name__ == "__main__":
+    main(*[int(n) for n in sys.argv[1:3]])
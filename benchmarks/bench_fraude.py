@@ -0,0 +1,59 @@
+"""Mesure le débit du détecteur de fraude, au fil de l'eau et en rejeu d'un journal, et vérifie qu'il repère un circuit.
+
+Exécuter depuis la racine du dépôt : python -m benchmarks.bench_fraude [événements] [comptes]
+"""
+import random
+import sys
+import time
+
+from banque.detection_fraude import TRANSFERT_CIRCULAIRE, DetecteurFraude
+from banque.journal_transactions import DEPOT, RETRAIT, TRANSFERT, JournalTransactions
+
+OBJECTIF = 100000  # Événements par seconde sur un cœur
+
+
+def evenements(nombre, nombre_comptes):
+    """Génère un flux reproductible de dépôts, retraits et transferts, à raison de 1000 par seconde."""
+    generateur = random.Random(7)
+    cartes = [f"4970{i:012d}" for i in range(nombre_comptes)]
+    debut = int(time.time())
+    flux = []
+    for i in range(nombre):
+        type_evenement = generateur.choice((DEPOT, RETRAIT, TRANSFERT, TRANSFERT))
+        flux.append((type_evenement, generateur.randint(100, 50000), generateur.choice(cartes),
+                     generateur.choice(cartes) if type_evenement == TRANSFERT else None, debut + i // 1000))
+    return flux
+
+
+def main(nombre=500000, nombre_comptes=100000):
+    flux = evenements(nombre, nombre_comptes)
+
+    detecteur = DetecteurFraude()
+    observer = detecteur.observer
+    debut = time.perf_counter()
+    for evenement in flux:
+        observer(*evenement)
+    direct = nombre / (time.perf_counter() - debut)
+    print(f"Au fil de l'eau : {direct:,.0f} événements/s, {len(detecteur)} comptes suivis, "
+          f"{detecteur.nombre_alertes} alertes")
+
+    journal = JournalTransactions()
+    for evenement in flux:
+        journal.ajouter(*evenement)
+    debut = time.perf_counter()
+    DetecteurFraude().rejouer(journal)
+    rejeu = nombre / (time.perf_counter() - debut)
+    print(f"Rejeu du journal : {rejeu:,.0f} événements/s")
+
+    # Circuit A -> B -> C -> A noyé dans le flux
+    horodatage = flux[-1][4]
+    for source, destination in (("A", "B"), ("B", "C"), ("C", "A")):
+        observer(TRANSFERT, 10000, source, destination, horodatage)
+    assert any(alerte.motif == TRANSFERT_CIRCULAIRE and alerte.cle == "C" for alerte in detecteur.alertes), \
+        "Circuit non détecté"
+    print("Circuit A -> B -> C -> A détecté.")
+    print(f"Objectif de {OBJECTIF:,} événements/s : {'atteint' if min(direct, rejeu) >= OBJECTIF else 'manqué'}")
+
+
+if __name__ == "__main__":
+    main(*[int(n) for n in sys.argv[1:3]])
@@ -0,0 +1,47 @@
+"""Compare l'historique complet d'un compte entreprise très actif et sa consultation par pages.
+
+Exécuter depuis la racine du dépôt : python -m benchmarks.bench_historique [transactions] [taille_page]
+"""
+import sys
+import time
+
+from banque.authentification import hacher_secret
+from banque.journal_transactions import DEPOT, TRANSFERT_ENTREPRISE, JournalTransactions
+from banque.modele import Entreprise
+
+EMPREINTE = hacher_secret("secret")
+
+
+def chronometrer(fonction, repetitions=5):
+    debut = time.perf_counter()
+    for _ in range(repetitions):
+        resultat = fonction()
+    return (time.perf_counter() - debut) / repetitions, resultat
+
+
+def main(nombre_transactions=1000000, taille_page=20):
+    entreprise = Entreprise("Entreprise", "Adresse", "FR000", 100000, "E1", "", empreinte=EMPREINTE)
+    entreprise.journal = journal = JournalTransactions()
+    # Un an d'activité, une transaction toutes les 30 secondes environ
+    debut = int(time.time()) - 365 * 86400
+    pas = 365 * 86400 // nombre_transactions
+    for i in range(nombre_transactions):
+        journal.ajouter(DEPOT if i % 3 else TRANSFERT_ENTREPRISE, 100 + i % 10000, entreprise.cle_journal,
+                        None if i % 3 else f"4970{i % 5000:012d}", debut + i * pas)
+
+    complet, texte = chronometrer(entreprise.consulter_historique, 1)
+    print(f"consulter_historique : {complet * 1000:,.0f} ms, {len(texte.encode()):,} octets")
+    premiere, page = chronometrer(lambda: entreprise.page_historique(taille_page))
+    print(f"Page la plus récente ({taille_page} lignes) : {premiere * 1e6:,.0f} µs")
+    suivante, _ = chronometrer(lambda: entreprise.page_historique(taille_page, page.curseur))
+    print(f"Page suivante (curseur) : {suivante * 1e6:,.0f} µs")
+    milieu = debut + 180 * 86400
+    datee, _ = chronometrer(lambda: entreprise.page_historique(taille_page, depuis=milieu, jusqu_a=milieu + 86400))
+    print(f"Page d'une journée il y a six mois : {datee * 1e6:,.0f} µs")
+    filtree, _ = chronometrer(lambda: entreprise.page_historique(taille_page, types=["transfert"], montant_min=50))
+    print(f"Page filtrée (transferts d'au moins 50€) : {filtree * 1e6:,.0f} µs")
+    print(f"Gain sur la première page : {complet / premiere:,.0f}x")
+
+
+if __name__ == "__main__":
+    main(*[int(n) for n in sys.argv[1:3]])
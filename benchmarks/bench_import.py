@@ -0,0 +1,41 @@
+"""Mesure le temps d'import du paquet banque dans un processus neuf et vérifie le budget.
+
+Exécuter depuis la racine du dépôt : python -m benchmarks.bench_import [budget_ms]
+"""
+import statistics
+import subprocess
+import sys
+
+BUDGET_MS = 30.0  # Temps d'import maximal accepté, interpréteur non compris
+REPETITIONS = 15
+
+MESURE = (
+    "import time; debut = time.perf_counter(); import banque; "
+    "print((time.perf_counter() - debut) * 1000); "
+    "import sys; print(','.join(m for m in ('asyncio', 'csv', 'concurrent.futures', 'numpy', 'banque.service_banque', "
+    "'banque.importation_clients', 'banque.journal_ecriture', 'banque.detection_fraude', 'banque.table_comptes', "
+    "'banque.prets', 'banque.instrumentation', 'banque.moteur_reparti') "
+    "if m in sys.modules))"
+)
+
+
+def mesurer():
+    """Lance un interpréteur neuf et renvoie (durée de l'import en ms, modules optionnels chargés)."""
+    sortie = subprocess.run([sys.executable, "-c", MESURE], capture_output=True, text=True, check=True).stdout
+    duree, charges = sortie.splitlines()
+    return float(duree), charges
+
+
+def main(budget_ms=BUDGET_MS):
+    durees = []
+    for _ in range(REPETITIONS):
+        duree, charges = mesurer()
+        durees.append(duree)
+        assert not charges, f"Modules optionnels chargés à l'import : {charges}"
+    mediane = statistics.median(durees)
+    print(f"import banque : médiane {mediane:.1f} ms, min {min(durees):.1f} ms (budget {budget_ms:.0f} ms)")
+    assert mediane <= budget_ms, "Le temps d'import dépasse le budget"
+
+
+if __name__ == "__main__":
+    main(*[float(n) for n in sys.argv[1:2]])
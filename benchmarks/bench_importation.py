@@ -0,0 +1,59 @@
+"""Mesure le débit de l'import en masse de demandes d'ouverture de compte.
+
+Deux fichiers sont importés : l'un avec des mots de passe en clair (chaque ligne coûte une dérivation de clé,
+c'est le coût réel d'un tel fichier), l'autre avec des empreintes déjà calculées, format attendu d'une migration.
+
+Exécuter depuis la racine du dépôt : python -m benchmarks.bench_importation [lignes] [processus] [lignes en clair]
+"""
+import csv
+import os
+import random
+import sys
+import tempfile
+import time
+
+from banque.importation_clients import importer_clients
+from benchmarks.bench_memoire import empreinte
+
+MIGRATION = 5000000  # Lignes de la migration visée
+
+
+def generer_fichier(chemin, nombre_lignes, en_clair):
+    """Écrit un fichier CSV de demandes synthétiques (environ 5 % invalides)."""
+    with open(chemin, "w", encoding="utf-8", newline="") as fichier:
+        ecrivain = csv.writer(fichier)
+        ecrivain.writerow(["nom", "adresse", "telephone", "cnic", "login", "mot_de_passe", "empreinte",
+                           "limite_retrait"])
+        for i in range(nombre_lignes):
+            cnic = f"{i:013d}" if random.random() > 0.05 else "123"
+            mot_de_passe, empreinte_ligne = (f"mdp{i}", "") if en_clair else ("", empreinte(i))
+            ecrivain.writerow([f"Client {i}", "1 rue de la Paix", f"+3361{i % 10000000:07d}", cnic,
+                               f"login{i}", mot_de_passe, empreinte_ligne, random.randint(1, 100000)])
+
+
+def importer(dossier, nombre_lignes, processus, en_clair):
+    """Importe un fichier généré ; renvoie (acceptés, rejetés, durée en secondes)."""
+    entree = os.path.join(dossier, "demandes.csv")
+    sortie = os.path.join(dossier, "resultats.csv")
+    generer_fichier(entree, nombre_lignes, en_clair)
+    debut = time.perf_counter()
+    acceptes, rejetes = importer_clients(entree, sortie, processus)
+    return acceptes, rejetes, time.perf_counter() - debut
+
+
+def main(nombre_lignes=500000, processus=None, lignes_en_clair=1000):
+    coeurs = processus or os.cpu_count() or 1
+    with tempfile.TemporaryDirectory() as dossier:
+        acceptes, rejetes, duree = importer(dossier, lignes_en_clair, processus, True)
+        print(f"Mots de passe en clair : {acceptes} acceptés, {rejetes} rejetés en {duree:.2f} s, "
+              f"soit {lignes_en_clair / duree:,.1f} lignes/s sur {coeurs} cœur(s) ; "
+              f"{MIGRATION:,} lignes prendraient {MIGRATION / lignes_en_clair * duree * coeurs / 3600:,.0f} h de calcul")
+        acceptes, rejetes, duree = importer(dossier, nombre_lignes, processus, False)
+        print(f"Empreintes fournies : {acceptes} acceptés, {rejetes} rejetés en {duree:.2f} s, "
+              f"soit {nombre_lignes / duree:,.0f} lignes/s ; {MIGRATION:,} lignes en "
+              f"{MIGRATION / nombre_lignes * duree / 60:.1f} min")
+
+
+if __name__ == "__main__":
+    arguments = [int(n) for n in sys.argv[1:4]]
+    main(*arguments)
@@ -0,0 +1,65 @@
+"""Compare la mémoire de l'historique texte et du journal en colonnes pour un million de transactions.
+
+Exécuter depuis la racine du dépôt : python -m benchmarks.bench_journal [transactions]
+"""
+import random
+import sys
+import tracemalloc
+
+from banque.journal_transactions import DEPOT, RETRAIT, TRANSFERT, JournalTransactions
+
+NOMBRE_COMPTES = 10000
+
+
+def operations(nombre_transactions):
+    """Génère des transactions synthétiques reproductibles."""
+    generateur = random.Random(42)
+    cartes = [f"4970{i:012d}" for i in range(NOMBRE_COMPTES)]
+    for _ in range(nombre_transactions):
+        yield generateur.choice((DEPOT, RETRAIT, TRANSFERT)), generateur.randint(1, 5000), \
+            generateur.choice(cartes), generateur.choice(cartes)
+
+
+def memoire(remplir, nombre_transactions):
+    """Renvoie la mémoire (en octets) retenue par la structure remplie."""
+    tracemalloc.start()
+    structure = remplir(nombre_transactions)
+    taille = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del structure
+    return taille
+
+
+def remplir_historiques_texte(nombre_transactions):
+    """Reproduit l'ancien historique : une liste de chaînes par compte."""
+    historiques = {}
+    for type_transaction, montant, compte, destinataire in operations(nombre_transactions):
+        if type_transaction == DEPOT:
+            historiques.setdefault(compte, []).append(f"Dépôt de {montant}€")
+        elif type_transaction == RETRAIT:
+            historiques.setdefault(compte, []).append(f"Retrait de {montant}€")
+        else:
+            historiques.setdefault(compte, []).append(f"Transfert de {montant}€ vers le compte {destinataire}")
+            historiques.setdefault(destinataire, []).append(f"Réception de {montant}€ du compte {compte}")
+    return historiques
+
+
+def remplir_journal(nombre_transactions):
+    """Remplit le journal en colonnes avec les mêmes transactions."""
+    journal = JournalTransactions()
+    for type_transaction, montant, compte, destinataire in operations(nombre_transactions):
+        journal.enregistrer(type_transaction, montant, compte, destinataire if type_transaction == TRANSFERT else None)
+    return journal
+
+
+def main(nombre_transactions=1000000):
+    # Les numéros de carte existent déjà dans les comptes, on ne compte pas leur coût
+    texte = memoire(remplir_historiques_texte, nombre_transactions)
+    colonnes = memoire(remplir_journal, nombre_transactions)
+    print(f"historique texte : {texte / 1e6:8.1f} Mo ({texte / nombre_transactions:6.1f} octets/transaction)")
+    print(f"journal colonnes : {colonnes / 1e6:8.1f} Mo ({colonnes / nombre_transactions:6.1f} octets/transaction)")
+    print(f"gain : x{texte / colonnes:.1f}")
+
+
+if __name__ == "__main__":
+    main(*[int(n) for n in sys.argv[1:2]])
@@ -0,0 +1,114 @@
+"""Compare la mémoire résidente (RSS) par compte selon la représentation des comptes.
+
+- origine : objets à __dict__ tels qu'avant (Client + CompteBancaire, solde flottant, liste d'historique) ;
+- objets : Client et CompteBancaire à __slots__ ;
+- table : TableComptes, colonnes de tableaux et vues CompteTable créées à la demande.
+
+Exécuter depuis la racine du dépôt : python -m benchmarks.bench_memoire [N ...]
+"""
+import os
+import subprocess
+import sys
+
+from banque.allocateur_cartes import AllocateurCartes
+from banque.authentification import SCRYPT_N, SCRYPT_P, SCRYPT_R
+from banque.modele import Client, CompteBancaire
+from banque.table_comptes import TableComptes
+
+
+# Classes reproduisant le modèle d'origine, pour la comparaison
+class _ClientOrigine:
+    def __init__(self, nom, adresse, telephone, cnic, login, mot_de_passe, limite_retrait):
+        self.nom = nom
+        self.adresse = adresse
+        self.telephone = telephone
+        self.cnic = cnic
+        self.login = login
+        self.mot_de_passe = mot_de_passe
+        self.limite_retrait = limite_retrait
+        self.compte = None
+
+
+class _CompteOrigine:
+    def __init__(self, client, numero_carte):
+        self.client = client
+        self.solde = 0.0
+        self.numero_carte = numero_carte
+        self.pin = None
+        self.type_compte = "Compte épargne"
+        self.historique_transactions = []
+        self.est_gelé = False
+
+
+def rss():
+    """Renvoie la mémoire résidente du processus en octets."""
+    with open("/proc/self/statm") as fichier:
+        return int(fichier.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def informations(i):
+    """Champs d'un client synthétique, sans mot de passe saisi : il est fourni par empreinte(i)."""
+    return (f"Client {i}", f"{i} rue de la Paix", f"+336{i % 100000000:08d}", f"{i:013d}", f"login{i}", "",
+            float(i % 50000 + 1))
+
+
+def empreinte(i):
+    """Empreinte telle qu'on la relit d'un stockage : bon format et bonne taille, mais pas dérivée d'un mot de passe.
+
+    Ce banc mesure la mémoire des comptes ; le coût de la dérivation est mesuré par bench_authentification.
+    """
+    return f"scrypt${SCRYPT_N}${SCRYPT_R}${SCRYPT_P}${i:032x}${i:064x}"
+
+
+def construire(representation, nombre):
+    """Crée `nombre` comptes dans la représentation demandée et renvoie la structure qui les garde."""
+    cartes = AllocateurCartes()
+    if representation == "origine":
+        clients = []
+        for i in range(nombre):
+            client = _ClientOrigine(*informations(i))
+            client.mot_de_passe = f"mdp{i}"  # Le modèle d'origine gardait le mot de passe en clair
+            client.compte = _CompteOrigine(client, cartes.allouer())
+            client.compte.solde = 100.0
+            clients.append(client)
+        return clients
+    if representation == "objets":
+        clients = []
+        for i in range(nombre):
+            client = Client(*informations(i), empreinte=empreinte(i))
+            client.compte = CompteBancaire(client, cartes.allouer())
+            client.compte.solde = 100
+            clients.append(client)
+        return clients
+    table = TableComptes()
+    for i in range(nombre):
+        table.ouvrir_compte(*informations(i), numero_carte=cartes.allouer(), empreinte=empreinte(i)).solde = 100
+    return table
+
+
+def mesurer(representation, nombre):
+    """Mesure dans ce processus le RSS ajouté par la construction des comptes."""
+    avant = rss()
+    structure = construire(representation, nombre)
+    print((rss() - avant) / nombre)
+    return structure
+
+
+def main(tailles):
+    print(f"{'comptes':>10} {'origine':>12} {'objets':>12} {'table':>12} {'gain table':>11}  (octets/compte)")
+    for taille in tailles:
+        resultats = {}
+        for representation in ("origine", "objets", "table"):
+            # Un processus neuf par mesure : le RSS n'est pas faussé par la mesure précédente
+            sortie = subprocess.run([sys.executable, "-m", "benchmarks.bench_memoire", "--mesurer",
+                                     representation, str(taille)], capture_output=True, text=True, check=True)
+            resultats[representation] = float(sortie.stdout)
+        print(f"{taille:>10} {resultats['origine']:>12.0f} {resultats['objets']:>12.0f} {resultats['table']:>12.0f} "
+              f"{resultats['origine'] / resultats['table']:>10.1f}x")
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--mesurer"]:
+        mesurer(sys.argv[2], int(sys.argv[3]))
+    else:
+        main([int(n) for n in sys.argv[1:]] or [1000000, 10000000])
@@ -0,0 +1,129 @@
+"""Suite de référence des opérations de compte : débit, latences (p50, p95, p99) et mémoire selon la population.
+
+- verifier_information et creer_compte sur des clients neufs (objets Client, registre en mémoire) ;
+- deposer_fonds, retirer_fonds et transferer_fonds sur des comptes tirés au hasard dans la population,
+  rangée dans une TableComptes pour que dix millions de comptes tiennent en mémoire ;
+- le surcoût de l'instrumentation (banque.instrumentation) sur deposer_fonds.
+Chaque population est construite et mesurée dans un processus neuf.
+
+Exécuter depuis la racine du dépôt : python -m benchmarks.bench_operations [comptes ...]
+"""
+import json
+import random
+import subprocess
+import sys
+import time
+from array import array
+
+from banque.instrumentation import Instrumentation
+from banque.journal_transactions import JournalTransactions
+from banque.modele import Client
+from banque.plafonds_retrait import PlafondsRetrait
+from banque.registre_comptes import RegistreComptes
+from banque.table_comptes import TableComptes
+from banque.verrous_comptes import VerrousComptes
+from benchmarks.bench_memoire import empreinte, informations, rss
+
+POPULATIONS = (10000, 1000000, 10000000)
+APPELS = 50000  # Appels mesurés par opération
+SOLDE_INITIAL = 1000000
+
+
+def chronometrer(appels):
+    """Exécute chaque appel (fonction, arguments) en le chronométrant ; renvoie (débit, latences triées en ns)."""
+    horloge = time.perf_counter_ns
+    latences = []
+    debut = horloge()
+    for fonction, arguments in appels:
+        avant = horloge()
+        fonction(*arguments)
+        latences.append(horloge() - avant)
+    duree = horloge() - debut
+    latences.sort()
+    return len(appels) / duree * 1e9, latences
+
+
+def resumer(debit, latences):
+    def centile(p):
+        return latences[min(int(p / 100 * len(latences)), len(latences) - 1)] / 1000
+
+    return {"debit": debit, "p50": centile(50), "p95": centile(95), "p99": centile(99)}
+
+
+def construire(nombre):
+    """Crée la population : nombre comptes dans une TableComptes avec son propre journal."""
+    table = TableComptes(JournalTransactions(), VerrousComptes(), PlafondsRetrait())
+    for i in range(nombre):
+        table.ouvrir_compte(*informations(i), numero_carte=f"4970{i:012d}", empreinte=empreinte(i))
+    table.soldes[:] = array("q", [SOLDE_INITIAL * 100]) * nombre
+    return table
+
+
+def mesurer(nombre):
+    """Mesure toutes les opérations sur une population de nombre comptes ; affiche le résultat en JSON."""
+    resultats = {}
+    avant = rss()
+    debut = time.perf_counter()
+    table = construire(nombre)
+    resultats["construction"] = nombre / (time.perf_counter() - debut)
+    resultats["octets_par_compte"] = (rss() - avant) / nombre
+
+    generateur = random.Random(1)
+    clients = [Client(*informations(nombre + i), empreinte=empreinte(nombre + i)) for i in range(APPELS)]
+    resultats["verifier_information"] = resumer(*chronometrer([(client.verifier_information, ())
+                                                              for client in clients]))
+    registre = RegistreComptes()
+    resultats["creer_compte"] = resumer(*chronometrer([(client.creer_compte, (registre,)) for client in clients]))
+
+    def tirer():
+        return table.trouver_par_carte(f"4970{generateur.randrange(nombre):012d}")
+
+    resultats["deposer_fonds"] = resumer(*chronometrer([(tirer().deposer_fonds, (generateur.randint(1, 500),))
+                                                       for _ in range(APPELS)]))
+    resultats["retirer_fonds"] = resumer(*chronometrer([(tirer().retirer_fonds, (generateur.randint(1, 5),))
+                                                       for _ in range(APPELS)]))
+    resultats["transferer_fonds"] = resumer(*chronometrer([(tirer().transferer_fonds,
+                                                           (generateur.randint(1, 500), tirer()))
+                                                          for _ in range(APPELS)]))
+
+    # Surcoût de l'instrumentation : mêmes dépôts, sans puis avec (les méthodes sont relues après l'activation)
+    comptes = [tirer() for _ in range(APPELS)]
+    chronometrer([(compte.deposer_fonds, (1,)) for compte in comptes])  # Amène ces comptes en cache
+    sans = chronometrer([(compte.deposer_fonds, (1,)) for compte in comptes])[1]
+    instrumentation = Instrumentation()
+    instrumentation.activer()
+    try:
+        avec = chronometrer([(compte.deposer_fonds, (1,)) for compte in comptes])[1]
+    finally:
+        instrumentation.desactiver()
+    histogramme = instrumentation.histogrammes[("CompteBancaire", "deposer_fonds")]
+    assert len(histogramme) == APPELS, "Des appels n'ont pas été comptés"
+    resultats["instrumentation_ns"] = avec[len(avec) // 2] - sans[len(sans) // 2]  # Écart des médianes
+    resultats["instrumentation_p99"] = histogramme.quantile(0.99) / 1000
+    resultats["rss_final"] = rss() / 2 ** 20  # Mo, journal et échantillons compris
+    print(json.dumps(resultats))
+
+
+def main(populations=POPULATIONS):
+    operations = ("verifier_information", "creer_compte", "deposer_fonds", "retirer_fonds", "transferer_fonds")
+    for nombre in populations:
+        # Un processus neuf par population : mémoire et caches ne sont pas faussés par la mesure précédente
+        sortie = subprocess.run([sys.executable, "-m", "benchmarks.bench_operations", "--mesurer", str(nombre)],
+                                capture_output=True, text=True, check=True).stdout
+        resultats = json.loads(sortie)
+        print(f"{nombre:,} comptes : construits à {resultats['construction']:,.0f} comptes/s, "
+              f"{resultats['octets_par_compte']:.0f} octets/compte, {resultats['rss_final']:,.0f} Mo à la fin")
+        print(f"  {'opération':<22}{'débit/s':>12}{'p50 µs':>10}{'p95 µs':>10}{'p99 µs':>10}")
+        for operation in operations:
+            mesure = resultats[operation]
+            print(f"  {operation:<22}{mesure['debit']:>12,.0f}{mesure['p50']:>10.1f}{mesure['p95']:>10.1f}"
+                  f"{mesure['p99']:>10.1f}")
+        print(f"  instrumentation : {resultats['instrumentation_ns']:+.0f} ns par dépôt (médiane), "
+              f"p99 vu par l'histogramme ≤ {resultats['instrumentation_p99']:.0f} µs")
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--mesurer"]:
+        mesurer(int(sys.argv[2]))
+    else:
+        main([int(n) for n in sys.argv[1:]] or POPULATIONS)
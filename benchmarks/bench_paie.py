@@ -0,0 +1,40 @@
+"""Mesure la durée d'un virement de paie groupé d'une entreprise vers des milliers de salariés.
+
+Exécuter depuis la racine du dépôt : python -m benchmarks.bench_paie [lignes]
+"""
+import random
+import sys
+import time
+
+from banque.authentification import hacher_secret
+from banque.modele import Client, Entreprise
+from banque.registre_comptes import RegistreComptes
+
+EMPREINTE = hacher_secret("secret")
+
+
+def main(nombre_lignes=100000):
+    registre = RegistreComptes()
+    cartes = []
+    for i in range(nombre_lignes):
+        client = Client(f"Salarié {i}", "Adresse", "+33600000000", f"{i:013d}",
+                        f"login{i}", "", 1000, empreinte=EMPREINTE)
+        client.creer_compte(registre)
+        cartes.append(client.compte.numero_carte)
+    entreprise = Entreprise("ACME", "Adresse", "FR123", 1000000, "ACME-1", "", empreinte=EMPREINTE)
+    registre.enregistrer_entreprise(entreprise)
+    paiements = [(carte, round(random.uniform(1500, 4000), 2)) for carte in cartes]
+    entreprise.deposer_fonds(sum(montant for _, montant in paiements) + 1)
+
+    debut = time.perf_counter()
+    resultat = entreprise.payer_lot(paiements, registre)
+    duree = time.perf_counter() - debut
+    print(f"{resultat} ({duree * 1000:.0f} ms, {nombre_lignes / duree:,.0f} lignes/s)")
+
+    debut = time.perf_counter()
+    resultat = entreprise.payer_lot(paiements, registre)
+    print(f"{resultat} ({(time.perf_counter() - debut) * 1000:.0f} ms, rien n'a été débité)")
+
+
+if __name__ == "__main__":
+    main(*[int(n) for n in sys.argv[1:2]])
@@ -0,0 +1,82 @@
+"""Mesure le surcoût du plafond de retrait sur 24 heures dans retirer_fonds, puis vérifie le plafond sous concurrence.
+
+Exécuter depuis la racine du dépôt : python -m benchmarks.bench_plafonds [comptes] [retraits] [threads]
+"""
+import random
+import sys
+import threading
+import time
+
+from banque.authentification import hacher_secret
+from banque.journal_transactions import JournalTransactions
+from banque.modele import Client
+from banque.plafonds_retrait import PlafondsRetrait
+
+LIMITE = 1000
+SOLDE_INITIAL = 10 ** 9
+EMPREINTE = hacher_secret("secret")
+
+
+# Classe _SansPlafond : accepte tout, pour mesurer retirer_fonds tel qu'avant le plafond
+class _SansPlafond:
+    def consommer(self, cle, centimes, limite, horodatage=None):
+        return True
+
+
+def creer_comptes(nombre, journal, plafonds):
+    comptes = []
+    for i in range(nombre):
+        client = Client(f"Client {i}", "Adresse", "+33600000000", f"{i:013d}",
+                        f"login{i}", "", LIMITE, empreinte=EMPREINTE)
+        client.creer_compte()
+        client.compte.journal = journal
+        client.compte.plafonds = plafonds
+        client.compte.solde = SOLDE_INITIAL
+        comptes.append(client.compte)
+    return comptes
+
+
+def chronometrer(comptes, nombre_retraits):
+    generateur = random.Random(1)
+    tirages = [(generateur.choice(comptes), generateur.randint(1, 5)) for _ in range(nombre_retraits)]
+    debut = time.perf_counter()
+    for compte, montant in tirages:
+        compte.retirer_fonds(montant)
+    return (time.perf_counter() - debut) / nombre_retraits
+
+
+def verifier_concurrence(nombre_threads):
+    """Des threads retirent 1€ en boucle sur les mêmes comptes : chacun doit s'arrêter pile à la limite."""
+    sys.setswitchinterval(1e-6)
+    plafonds = PlafondsRetrait()
+    comptes = creer_comptes(50, JournalTransactions(), plafonds)
+
+    def travailler(numero):
+        generateur = random.Random(numero)
+        for _ in range(2 * LIMITE * len(comptes) // nombre_threads):
+            generateur.choice(comptes).retirer_fonds(1)
+
+    threads = [threading.Thread(target=travailler, args=(numero,)) for numero in range(nombre_threads)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    for compte in comptes:
+        retire = SOLDE_INITIAL - compte.solde
+        assert retire <= LIMITE, f"Plafond dépassé : {retire}€ retirés"
+        assert plafonds.disponible(compte.numero_carte, LIMITE * 100) == (LIMITE - retire) * 100, "Cumul incohérent"
+    print(f"Plafond respecté avec {nombre_threads} threads concurrents.")
+
+
+def main(nombre_comptes=100000, nombre_retraits=1000000, nombre_threads=8):
+    sans_plafond = chronometrer(creer_comptes(nombre_comptes, JournalTransactions(), _SansPlafond()), nombre_retraits)
+    plafonds = PlafondsRetrait()
+    avec_plafond = chronometrer(creer_comptes(nombre_comptes, JournalTransactions(), plafonds), nombre_retraits)
+    print(f"retirer_fonds sans plafond : {sans_plafond * 1e9:,.0f} ns, avec plafond : {avec_plafond * 1e9:,.0f} ns "
+          f"(surcoût {(avec_plafond - sans_plafond) * 1e9:,.0f} ns, {avec_plafond / sans_plafond - 1:.0%})")
+    print(f"{len(plafonds)} comptes suivis, {len(plafonds.tranches) * 8 + len(plafonds.totaux) * 16:,} octets de compteurs")
+    verifier_concurrence(nombre_threads)
+
+
+if __name__ == "__main__":
+    main(*[int(n) for n in sys.argv[1:4]])
@@ -0,0 +1,115 @@
+"""Mesure la notation par lots des demandes de prêt : caractéristiques tenues au fil du journal contre relecture
+de l'historique de chaque entreprise, puis le prélèvement des échéances.
+
+Exécuter depuis la racine du dépôt : python -m benchmarks.bench_prets [entreprises] [jours] [demandes]
+"""
+import random
+import statistics
+import sys
+import time
+
+from banque.authentification import hacher_secret
+from banque.journal_transactions import DEPOT, RETRAIT, JournalTransactions
+from banque.modele import Entreprise
+from banque.prets import JOURS_PAR_MOIS, SECONDES_PAR_JOUR, Caracteristiques, GuichetPrets, evaluer_risque
+from banque.verrous_comptes import VerrousComptes
+
+OPERATIONS_PAR_JOUR = 4
+EMPREINTE = hacher_secret("secret")
+
+
+def creer_entreprises(nombre, nombre_jours, journal, debut):
+    """Crée des entreprises et leur historique : des encaissements et des dépenses tous les jours."""
+    generateur = random.Random(3)
+    entreprises = []
+    for i in range(nombre):
+        entreprise = Entreprise(f"Entreprise {i}", "Adresse", f"FR{i:09d}", 10 ** 6, f"E{i}", "", empreinte=EMPREINTE)
+        entreprise.journal = journal
+        entreprise.solde = generateur.randint(0, 100000)
+        entreprises.append(entreprise)
+    tendances = [generateur.gauss(50, 200) for _ in entreprises]
+    for jour in range(nombre_jours):
+        horodatage = debut + jour * SECONDES_PAR_JOUR
+        for entreprise, tendance in zip(entreprises, tendances):
+            for _ in range(OPERATIONS_PAR_JOUR):
+                montant = round(generateur.gauss(tendance, 500), 2)
+                if montant >= 0.01:
+                    journal.enregistrer(DEPOT, montant, entreprise.cle_journal, horodatage=horodatage)
+                elif montant <= -0.01:
+                    journal.enregistrer(RETRAIT, -montant, entreprise.cle_journal, horodatage=horodatage)
+    return entreprises
+
+
+def noter_par_relecture(guichet, horodatage):
+    """Notation sans suivi incrémental : les flux journaliers de chaque entreprise sont recalculés depuis le journal."""
+    journal = guichet.journal
+    jour_courant = horodatage // SECONDES_PAR_JOUR
+    for demande in guichet.demandes.values():
+        entreprise = demande.entreprise
+        flux = {}
+        premier = None
+        for horodatage_entree, type_transaction, centimes, _, _ in journal.entrees(entreprise.cle_journal):
+            jour = horodatage_entree // SECONDES_PAR_JOUR
+            premier = jour if premier is None else premier
+            flux[jour] = flux.get(jour, 0) + (centimes if type_transaction == DEPOT else -centimes)
+        journaliers = [flux.get(jour, 0) for jour in range(premier, jour_courant)] if premier is not None else []
+        caracteristiques = Caracteristiques(len(journaliers), statistics.fmean(journaliers),
+                                            statistics.pstdev(journaliers)) if journaliers else None
+        demande.risque = evaluer_risque(caracteristiques, demande.mensualite, round(entreprise.solde * 100))
+
+
+def main(nombre_entreprises=2000, nombre_jours=90, nombre_demandes=5000):
+    journal = JournalTransactions()
+    debut = int(time.time()) - nombre_jours * SECONDES_PAR_JOUR
+    entreprises = creer_entreprises(nombre_entreprises, nombre_jours, journal, debut)
+    print(f"{nombre_entreprises} entreprises, {len(journal):,} transactions sur {nombre_jours} jours")
+
+    chrono = time.perf_counter()
+    guichet = GuichetPrets(journal, VerrousComptes())
+    print(f"Ouverture du guichet (reprise de l'historique) : {time.perf_counter() - chrono:.2f} s")
+
+    generateur = random.Random(5)
+    for i in range(nombre_demandes):
+        entreprise = entreprises[i % nombre_entreprises]
+        entreprise.demander_pret(guichet, generateur.randint(1000, 50000), generateur.choice((12, 24, 36, 60)))
+    maintenant = debut + nombre_jours * SECONDES_PAR_JOUR
+
+    chrono = time.perf_counter()
+    noter_par_relecture(guichet, maintenant)
+    relecture = time.perf_counter() - chrono
+    reference = {identifiant: demande.risque for identifiant, demande in guichet.demandes.items()}
+
+    chrono = time.perf_counter()
+    guichet.noter(maintenant)
+    premiere = time.perf_counter() - chrono
+    ecart = max(abs(demande.risque - reference[identifiant]) for identifiant, demande in guichet.demandes.items())
+    assert ecart < 1e-9, f"Les deux notations divergent ({ecart})"
+    print(f"Notation de {nombre_demandes} demandes : relecture des historiques {relecture:.2f} s, "
+          f"caractéristiques incrémentales {premiere:.3f} s ({relecture / premiere:.0f}x)")
+
+    # Quelques entreprises bougent : seules leurs demandes sont notées à nouveau
+    for entreprise in entreprises[:nombre_entreprises // 100]:
+        entreprise.deposer_fonds(100)
+    chrono = time.perf_counter()
+    recalculees = guichet.noter(maintenant)
+    print(f"Nouvelle notation après l'activité de {nombre_entreprises // 100} entreprises : {recalculees} demandes "
+          f"recalculées en {(time.perf_counter() - chrono) * 1000:.1f} ms")
+
+    chrono = time.perf_counter()
+    file = guichet.file_attente(20, maintenant)
+    print(f"File d'attente (20 premières) : {(time.perf_counter() - chrono) * 1000:.1f} ms, "
+          f"risque de {file[0].risque:.2%} à {file[-1].risque:.2%}")
+
+    for demande in guichet.file_attente(nombre_demandes // 2, maintenant):
+        guichet.approuver(demande, "banc d'essai", maintenant)
+    chrono = time.perf_counter()
+    message = guichet.prelever_echeances(maintenant + JOURS_PAR_MOIS * SECONDES_PAR_JOUR)
+    print(f"Prélèvement de {len(guichet.prets)} prêts : {(time.perf_counter() - chrono) * 1000:.0f} ms ({message})")
+    chrono = time.perf_counter()
+    guichet.prelever_echeances(maintenant + JOURS_PAR_MOIS * SECONDES_PAR_JOUR + 3600)
+    print(f"Prélèvement sans échéance exigible : {(time.perf_counter() - chrono) * 1e6:.0f} µs")
+    assert all(pret.payees + pret.impayes == 1 for pret in guichet.prets.values()), "Échéance oubliée"
+
+
+if __name__ == "__main__":
+    main(*[int(n) for n in sys.argv[1:4]])
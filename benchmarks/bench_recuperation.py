@@ -0,0 +1,74 @@
+"""Mesure le débit du journal d'écriture et le temps de reprise après arrêt sur des dizaines de millions d'événements.
+
+Exécuter depuis la racine du dépôt : python -m benchmarks.bench_recuperation [evenements] [threads_synchrones]
+"""
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+from banque.journal_ecriture import JournalEcriture, restaurer
+from banque.journal_transactions import DEPOT, RETRAIT, TRANSFERT, JournalTransactions
+
+NOMBRE_COMPTES = 100000
+
+
+def ecrire_evenements(dossier, nombre_evenements):
+    """Écrit des événements synthétiques en mode asynchrone (validation groupée seulement)."""
+    journal_ecriture = JournalEcriture(dossier, synchrone=False)
+    generateur = random.Random(1)
+    cartes = [f"4970{i:012d}" for i in range(NOMBRE_COMPTES)]
+    ecrire = journal_ecriture.ecrire
+    horodatage = int(time.time())
+    debut = time.perf_counter()
+    for _ in range(nombre_evenements):
+        type_evenement = generateur.choice((DEPOT, DEPOT, RETRAIT, TRANSFERT))
+        destination = generateur.choice(cartes) if type_evenement == TRANSFERT else None
+        ecrire(type_evenement, generateur.randint(1, 100000), generateur.choice(cartes), destination, horodatage)
+    journal_ecriture.fermer()
+    return time.perf_counter() - debut
+
+
+def ecrire_synchrone(dossier, nombre_threads, evenements_par_thread=2000):
+    """Mesure le débit quand chaque écriture attend sa synchronisation disque (validation groupée entre threads)."""
+    journal_ecriture = JournalEcriture(dossier, synchrone=True)
+
+    def travailler(numero):
+        for _ in range(evenements_par_thread):
+            journal_ecriture.ecrire(DEPOT, 100, f"4970{numero:012d}", None, 0)
+
+    threads = [threading.Thread(target=travailler, args=(numero,)) for numero in range(nombre_threads)]
+    debut = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    duree = time.perf_counter() - debut
+    journal_ecriture.fermer()
+    return nombre_threads * evenements_par_thread / duree
+
+
+def main(nombre_evenements=20000000, nombre_threads=32):
+    with tempfile.TemporaryDirectory() as dossier:
+        print(f"écritures synchrones ({nombre_threads} threads) : "
+              f"{ecrire_synchrone(os.path.join(dossier, 'synchrone'), nombre_threads):,.0f} événements/s")
+
+        dossier_reprise = os.path.join(dossier, "reprise")
+        duree = ecrire_evenements(dossier_reprise, nombre_evenements)
+        taille = sum(os.path.getsize(os.path.join(dossier_reprise, nom)) for nom in os.listdir(dossier_reprise))
+        print(f"{nombre_evenements} événements écrits en {duree:.1f} s "
+              f"({nombre_evenements / duree:,.0f}/s, {taille / nombre_evenements:.1f} octets/événement)")
+
+        debut = time.perf_counter()
+        etat = restaurer(dossier_reprise)
+        print(f"reprise des soldes : {etat.nombre_rejoues} événements en {time.perf_counter() - debut:.1f} s")
+
+        debut = time.perf_counter()
+        restaurer(dossier_reprise, JournalTransactions())
+        print(f"reprise des soldes et de l'historique : {time.perf_counter() - debut:.1f} s")
+
+
+if __name__ == "__main__":
+    main(*[int(n) for n in sys.argv[1:3]])
@@ -0,0 +1,59 @@
+"""Mesure le temps de recherche dans le registre des comptes selon le nombre de comptes.
+
+Exécuter depuis la racine du dépôt : python -m benchmarks.bench_registre [N ...]
+"""
+import random
+import sys
+import time
+
+from banque.authentification import hacher_secret
+from banque.modele import Client
+from banque.registre_comptes import RegistreComptes
+
+EMPREINTE = hacher_secret("secret")
+
+
+def construire_registre(nombre_comptes):
+    """Crée un registre rempli de comptes clients valides."""
+    registre = RegistreComptes()
+    for i in range(nombre_comptes):
+        client = Client(f"Client {i}", "Adresse", "+33600000000", f"{i:013d}",
+                        f"login{i}", "", random.randint(1, 100000), empreinte=EMPREINTE)
+        client.creer_compte(registre)
+    return registre
+
+
+def mesurer_recherches(registre, nombre_recherches=100000):
+    """Renvoie le temps moyen d'une recherche par carte, CNIC et login (en microsecondes)."""
+    cartes = random.choices(list(registre.par_carte), k=nombre_recherches)
+    cnics = random.choices(list(registre.par_cnic), k=nombre_recherches)
+    logins = random.choices(list(registre.par_login), k=nombre_recherches)
+    debut = time.perf_counter()
+    for carte, cnic, login in zip(cartes, cnics, logins):
+        registre.trouver_par_carte(carte)
+        registre.trouver_par_cnic(cnic)
+        registre.trouver_par_login(login)
+    duree = time.perf_counter() - debut
+    return duree / (3 * nombre_recherches) * 1e6
+
+
+def mesurer_prefixes(registre, nombre_recherches=10000):
+    """Renvoie le temps moyen d'une recherche par préfixe de carte (en microsecondes)."""
+    prefixes = [f"{random.randint(0, 9999):04d}" for _ in range(nombre_recherches)]
+    registre.numeros_cartes()  # Tri initial hors mesure
+    debut = time.perf_counter()
+    for prefixe in prefixes:
+        registre.cartes_par_prefixe(prefixe)
+    duree = time.perf_counter() - debut
+    return duree / nombre_recherches * 1e6
+
+
+def main(tailles):
+    print(f"{'comptes':>10} {'recherche (µs)':>16} {'préfixe (µs)':>14}")
+    for taille in tailles:
+        registre = construire_registre(taille)
+        print(f"{taille:>10} {mesurer_recherches(registre):>16.3f} {mesurer_prefixes(registre):>14.3f}")
+
+
+if __name__ == "__main__":
+    main([int(n) for n in sys.argv[1:]] or [10000, 100000, 1000000])
@@ -0,0 +1,95 @@
+"""Mesure le débit du moteur réparti selon le nombre de partitions (un processus par partition) et vérifie que
+les transferts entre partitions conservent la masse monétaire.
+
+Exécuter depuis la racine du dépôt : python -m benchmarks.bench_reparti [comptes] [opérations] [partitions max]
+"""
+import os
+import random
+import sys
+import time
+
+from banque.moteur_reparti import DEPOT, OUVRIR, RETRAIT, TRANSFERT_LOCAL, MoteurReparti, Partition, partition_de
+from benchmarks.bench_memoire import informations
+
+TAILLE_LOT = 5000  # Opérations envoyées d'un coup par le routeur
+SOLDE_INITIAL = 1000
+
+
+def operations(cartes, nombre):
+    """Flux reproductible : 40 % de dépôts, 30 % de retraits, 30 % de transferts vers un compte quelconque."""
+    generateur = random.Random(11)
+    flux = []
+    for _ in range(nombre):
+        tirage = generateur.random()
+        carte = generateur.choice(cartes)
+        if tirage < 0.4:
+            flux.append((DEPOT, carte, generateur.randint(1, 100)))
+        elif tirage < 0.7:
+            flux.append((RETRAIT, carte, generateur.randint(1, 5)))
+        else:
+            flux.append((TRANSFERT_LOCAL, carte, generateur.choice(cartes), generateur.randint(1, 100)))
+    return flux
+
+
+def variation_attendue(flux, resultats):
+    """Variation de la masse monétaire (centimes) due aux dépôts et retraits acceptés : les transferts n'en font pas."""
+    variation = 0
+    for operation, resultat in zip(flux, resultats):
+        if "succès" in resultat:
+            if operation[0] == DEPOT:
+                variation += operation[2] * 100
+            elif operation[0] == RETRAIT:
+                variation -= operation[2] * 100
+    return variation
+
+
+def mesurer(moteur, cartes, flux):
+    ouvertures = [(OUVRIR, *informations(i)[:-1], 100000.0, carte) for i, carte in enumerate(cartes)]
+    for debut in range(0, len(ouvertures), TAILLE_LOT):
+        moteur.executer(ouvertures[debut:debut + TAILLE_LOT])
+        moteur.executer([(DEPOT, carte, SOLDE_INITIAL) for carte in cartes[debut:debut + TAILLE_LOT]])
+    initial = moteur.total()
+    resultats = []
+    debut = time.perf_counter()
+    for position in range(0, len(flux), TAILLE_LOT):
+        resultats += moteur.executer(flux[position:position + TAILLE_LOT])
+    duree = time.perf_counter() - debut
+    assert moteur.total() == initial + variation_attendue(flux, resultats), "La masse monétaire n'est pas conservée"
+    return len(flux) / duree
+
+
+# Classe _SansProcessus : une Partition appelée directement, pour mesurer le coût du routage et des échanges
+class _SansProcessus:
+    def __init__(self):
+        self.partition = Partition()
+
+    def executer(self, lot):
+        return self.partition.executer(lot)
+
+    def total(self):
+        return self.partition.total()
+
+
+def main(nombre_comptes=100000, nombre_operations=200000, partitions_max=None):
+    partitions_max = partitions_max or max(os.cpu_count() or 1, 2)
+    cartes = [f"4970{i:012d}" for i in range(nombre_comptes)]
+    flux = operations(cartes, nombre_operations)
+    print(f"{nombre_comptes:,} comptes, {nombre_operations:,} opérations, {os.cpu_count()} cœur(s) disponible(s)")
+
+    reference = mesurer(_SansProcessus(), cartes, flux)
+    print(f"  un seul processus, sans routeur : {reference:>10,.0f} opérations/s")
+    debits = {}
+    nombre = 1
+    while nombre <= partitions_max:
+        distants = sum(1 for operation in flux if operation[0] == TRANSFERT_LOCAL
+                       and partition_de(operation[1], nombre) != partition_de(operation[2], nombre))
+        with MoteurReparti(nombre) as moteur:
+            debits[nombre] = mesurer(moteur, cartes, flux)
+        print(f"  {nombre} partition(s) : {debits[nombre]:>10,.0f} opérations/s ({debits[nombre] / debits[1]:.2f}x), "
+              f"{distants / len(flux):.0%} de transferts en deux phases")
+        nombre *= 2
+    print("Masse monétaire conservée dans toutes les configurations.")
+
+
+if __name__ == "__main__":
+    main(*[int(n) for n in sys.argv[1:4]])
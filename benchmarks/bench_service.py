@@ -0,0 +1,81 @@
+"""Générateur de charge pour le service bancaire : latences p50/p99 et requêtes par seconde.
+
+Exécuter depuis la racine du dépôt : python -m benchmarks.bench_service [connexions] [requetes] [profondeur]
+"""
+import asyncio
+import json
+import random
+import sys
+import time
+from collections import deque
+
+from banque.service_banque import ServiceBanque
+
+NOMBRE_COMPTES = 1000
+
+
+async def ouvrir_comptes(hote, port):
+    """Crée les comptes de test par le service lui-même et les approvisionne."""
+    lecteur, ecrivain = await asyncio.open_connection(hote, port)
+    for i in range(NOMBRE_COMPTES):
+        requete = {"op": "creer_compte", "nom": f"Client {i}", "telephone": "+33600000000",
+                   "cnic": f"{i:013d}", "login": f"login{i}", "limite_retrait": 1000}
+        ecrivain.write(json.dumps(requete).encode() + b"\n")
+    await ecrivain.drain()
+    cartes = []
+    for _ in range(NOMBRE_COMPTES):
+        cartes.append(json.loads(await lecteur.readline())["carte"])
+    for carte in cartes:
+        ecrivain.write(json.dumps({"op": "deposer", "carte": carte, "montant": 10000}).encode() + b"\n")
+    await ecrivain.drain()
+    for _ in cartes:
+        await lecteur.readline()
+    ecrivain.close()
+    return cartes
+
+
+async def client_charge(hote, port, cartes, nombre_requetes, profondeur, latences):
+    """Envoie des requêtes en rafale, avec au plus `profondeur` requêtes sans réponse."""
+    lecteur, ecrivain = await asyncio.open_connection(hote, port)
+    generateur = random.Random()
+    envois = deque()
+    envoyees = recues = 0
+    while recues < nombre_requetes:
+        while envoyees < nombre_requetes and len(envois) < profondeur:
+            carte, destination = generateur.sample(cartes, 2)
+            operation = generateur.choice(("deposer", "retirer", "transferer", "solde"))
+            requete = {"op": operation, "carte": carte, "destination": destination, "montant": 1}
+            ecrivain.write(json.dumps(requete).encode() + b"\n")
+            envois.append(time.perf_counter())
+            envoyees += 1
+        await ecrivain.drain()
+        await lecteur.readline()
+        latences.append(time.perf_counter() - envois.popleft())
+        recues += 1
+    ecrivain.close()
+
+
+def centile(valeurs_triees, pourcentage):
+    return valeurs_triees[min(len(valeurs_triees) - 1, int(len(valeurs_triees) * pourcentage / 100))]
+
+
+async def main(nombre_connexions=100, requetes_par_connexion=1000, profondeur=16):
+    # Comptes désignés par leur carte, sans connexion : le banc mesure le protocole, pas le calcul des empreintes
+    serveur = await ServiceBanque(sessions_obligatoires=False).demarrer(port=0)
+    hote, port = serveur.sockets[0].getsockname()[:2]
+    cartes = await ouvrir_comptes(hote, port)
+    latences = []
+    debut = time.perf_counter()
+    await asyncio.gather(*[client_charge(hote, port, cartes, requetes_par_connexion, profondeur, latences)
+                           for _ in range(nombre_connexions)])
+    duree = time.perf_counter() - debut
+    serveur.close()
+    await serveur.wait_closed()
+    latences.sort()
+    print(f"{len(latences)} requêtes, {nombre_connexions} connexions, profondeur {profondeur} : "
+          f"{len(latences) / duree:,.0f} req/s, p50 {centile(latences, 50) * 1000:.2f} ms, "
+          f"p99 {centile(latences, 99) * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(*[int(n) for n in sys.argv[1:4]]))
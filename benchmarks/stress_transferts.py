@@ -0,0 +1,65 @@
+"""Lance des centaines de milliers de transferts concurrents et vérifie que les soldes restent cohérents.
+
+Exécuter depuis la racine du dépôt : python -m benchmarks.stress_transferts [transferts] [threads]
+"""
+import random
+import sys
+import threading
+import time
+
+from banque.authentification import hacher_secret
+from banque.journal_transactions import JournalTransactions
+from banque.modele import Client
+
+NOMBRE_COMPTES = 1000
+SOLDE_INITIAL = 1000
+EMPREINTE = hacher_secret("secret")
+
+
+def creer_comptes(journal):
+    """Crée des comptes approvisionnés qui partagent un journal dédié au test."""
+    comptes = []
+    for i in range(NOMBRE_COMPTES):
+        client = Client(f"Client {i}", "Adresse", "+33600000000", f"{i:013d}",
+                        f"login{i}", "", 1000, empreinte=EMPREINTE)
+        client.creer_compte()
+        client.compte.journal = journal
+        client.compte.deposer_fonds(SOLDE_INITIAL)
+        comptes.append(client.compte)
+    return comptes
+
+
+def main(nombre_transferts=400000, nombre_threads=8):
+    # Bascule très fréquente entre threads pour provoquer un maximum d'entrelacements
+    sys.setswitchinterval(1e-6)
+    journal = JournalTransactions()
+    comptes = creer_comptes(journal)
+    reussis = [0] * nombre_threads
+
+    def travailler(numero):
+        generateur = random.Random(numero)
+        for _ in range(nombre_transferts // nombre_threads):
+            source, destination = generateur.sample(comptes, 2)
+            message = source.transferer_fonds(generateur.randint(1, 300), destination)
+            if "succès" in message:
+                reussis[numero] += 1
+
+    threads = [threading.Thread(target=travailler, args=(numero,)) for numero in range(nombre_threads)]
+    debut = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    duree = time.perf_counter() - debut
+
+    total = sum(compte.solde for compte in comptes)
+    print(f"{sum(reussis)} transferts réussis sur {nombre_transferts} avec {nombre_threads} threads "
+          f"en {duree:.2f} s ({nombre_transferts / duree:,.0f} transferts/s)")
+    assert total == NOMBRE_COMPTES * SOLDE_INITIAL, f"Solde total incohérent : {total}"
+    assert min(compte.solde for compte in comptes) >= 0, "Un compte est à découvert"
+    assert len(journal) == NOMBRE_COMPTES + sum(reussis), "Le journal ne correspond pas aux transferts"
+    print("Soldes cohérents : aucune mise à jour perdue, aucun découvert.")
+
+
+if __name__ == "__main__":
+    main(*[int(n) for n in sys.argv[1:3]])
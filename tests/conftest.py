@@ -0,0 +1,53 @@
+import sys
+
+import pytest
+
+from banque.allocateur_cartes import AllocateurCartes
+from banque.authentification import LimiteurTentatives
+from banque.journal_transactions import JournalTransactions
+from banque.modele import Client
+from banque.plafonds_retrait import PlafondsRetrait
+from banque.verrous_comptes import VerrousComptes
+
+
+# Classe Processus : objets partagés d'un processus simulé (journal, allocateur, plafonds, verrous)
+#
+# Les modules du paquet lisent ces objets dans leurs variables *_par_defaut : ils y sont remplacés par des neufs,
+# et redemarrer() en installe d'autres, comme au démarrage d'un nouveau processus après un arrêt.
+class Processus:
+    def __init__(self, monkeypatch):
+        self._monkeypatch = monkeypatch
+        self.redemarrer()
+
+    def redemarrer(self):
+        self.journal = JournalTransactions()
+        self.allocateur = AllocateurCartes()
+        self.plafonds = PlafondsRetrait()
+        self.verrous = VerrousComptes()
+        neufs = {"journal_par_defaut": self.journal, "allocateur_par_defaut": self.allocateur,
+                 "plafonds_par_defaut": self.plafonds, "verrous_par_defaut": self.verrous,
+                 "limiteur_pin": LimiteurTentatives()}
+        for nom_module, module in list(sys.modules.items()):
+            if nom_module == "banque" or nom_module.startswith("banque."):
+                for nom, objet in neufs.items():
+                    if nom in vars(module):
+                        self._monkeypatch.setattr(module, nom, objet)
+        return self
+
+
+@pytest.fixture
+def processus(monkeypatch):
+    return Processus(monkeypatch)
+
+
+@pytest.fixture
+def nouveau_client():
+    """Fabrique de clients valides, sans mot de passe (aucune dérivation de clé) ; i rend CNIC et login uniques."""
+    def fabriquer(i=0, limite_retrait=1000, mot_de_passe="", **champs):
+        informations = {"nom": f"Client {i}", "adresse": "1 rue de la Paix", "telephone": "+33612345678",
+                        "cnic": f"{i:013d}", "login": f"login{i}", "mot_de_passe": mot_de_passe,
+                        "limite_retrait": limite_retrait}
+        informations.update(champs)
+        return Client(**informations)
+
+    return fabriquer
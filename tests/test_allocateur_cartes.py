@@ -0,0 +1,102 @@
+import csv
+import threading
+
+import pytest
+
+from banque.allocateur_cartes import CAPACITE, AllocateurCartes, chiffre_luhn, luhn_valide
+from banque.cli import main
+from banque.importation_clients import lire_cartes
+
+
+def test_numeros_valides_et_uniques():
+    allocateur = AllocateurCartes()
+    numeros = allocateur.allouer_lot(10000) + [allocateur.allouer() for _ in range(100)]
+    assert len(set(numeros)) == len(numeros)
+    assert all(len(numero) == 16 and numero.startswith("497010") and luhn_valide(numero) for numero in numeros)
+    assert chiffre_luhn("7992739871") == "3"
+    assert not luhn_valide("4970100000000007")
+
+
+def test_prefixe_invalide():
+    with pytest.raises(ValueError):
+        AllocateurCartes("4970")
+
+
+def test_capacite_epuisee():
+    allocateur = AllocateurCartes()
+    allocateur.compteur = CAPACITE - 1
+    allocateur.allouer()
+    with pytest.raises(RuntimeError):
+        allocateur.allouer()
+
+
+def test_redemarrage_ne_reemet_pas_les_cartes_existantes():
+    avant = AllocateurCartes()
+    existantes = [avant.allouer() for _ in range(50)]
+    apres = AllocateurCartes()  # Nouveau processus : le compteur repart de zéro
+    apres.marquer_utilises(existantes + ["entreprise:ACME-1"])
+    assert apres.compteur == 50
+    assert not set(apres.allouer_lot(100)) & set(existantes)
+
+
+def test_cartes_existantes_non_contigues_sautees():
+    existantes = AllocateurCartes().allouer_lot(10)[::2]
+    allocateur = AllocateurCartes()
+    for numero in existantes:
+        allocateur.marquer_utilise(numero)
+    emis = allocateur.allouer_lot(5) + [allocateur.allouer() for _ in range(5)]
+    assert not set(emis) & set(existantes)
+    assert not allocateur.exclus  # Les exclusions dépassées sont oubliées
+
+
+def test_bloc_saute_les_cartes_existantes():
+    existante = AllocateurCartes().allouer_lot(3)[1]
+    allocateur = AllocateurCartes()
+    allocateur.marquer_utilise(existante)
+    bloc = allocateur.reserver_bloc(3)
+    assert existante not in bloc.numeros()
+    assert len(bloc) == len(bloc.numeros())
+
+
+def test_allocations_concurrentes_uniques():
+    allocateur = AllocateurCartes()
+    resultats = [[] for _ in range(8)]
+
+    def allouer(resultat):
+        for _ in range(2000):
+            resultat.append(allocateur.allouer())
+
+    threads = [threading.Thread(target=allouer, args=(resultat,)) for resultat in resultats]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    numeros = [numero for resultat in resultats for numero in resultat]
+    assert len(set(numeros)) == len(numeros) == 16000
+
+
+def test_deux_imports_successifs_sans_collision(processus, tmp_path):
+    for numero in (1, 2):
+        with open(tmp_path / f"demandes{numero}.csv", "w", encoding="utf-8", newline="") as fichier:
+            ecrivain = csv.writer(fichier)
+            ecrivain.writerow(["nom", "telephone", "cnic", "login", "limite_retrait"])
+            for i in range(20):
+                ecrivain.writerow([f"Client {i}", "+33612345678", f"{numero}{i:012d}", f"login{numero}-{i}", 100])
+    assert main(["importer", str(tmp_path / "demandes1.csv"), str(tmp_path / "resultats1.csv"), "1"]) == 0
+    processus.redemarrer()  # Second import dans un nouveau processus
+    assert main(["importer", str(tmp_path / "demandes2.csv"), str(tmp_path / "resultats2.csv"), "1",
+                 f"--exclure={tmp_path / 'resultats1.csv'}"]) == 0
+    premieres = set(lire_cartes(str(tmp_path / "resultats1.csv")))
+    secondes = set(lire_cartes(str(tmp_path / "resultats2.csv")))
+    assert len(premieres) == len(secondes) == 20
+    assert not premieres & secondes
+
+
+def test_lot_exact_malgre_les_exclusions():
+    existantes = AllocateurCartes().allouer_lot(30)[1:]  # La position 0 reste libre : le compteur ne saute rien
+    allocateur = AllocateurCartes()
+    allocateur.marquer_utilises(existantes)
+    bloc = allocateur.reserver_bloc(5)
+    assert len(bloc) == 5
+    assert len(bloc.numeros()) == 5 and not set(bloc.numeros()) & set(existantes)
+    assert len(allocateur.allouer_lot(5)) == 5
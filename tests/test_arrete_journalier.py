@@ -0,0 +1,101 @@
+from array import array
+
+import pytest
+
+from banque import arrete_journalier
+from banque.arrete_journalier import SECONDES_PAR_JOUR, ArreteJournalier, calculer
+from banque.journal_transactions import DEPOT, FRAIS, INTERETS, JournalTransactions
+from banque.table_comptes import TableComptes
+
+T0 = 20000 * SECONDES_PAR_JOUR + 3600
+SOLDES = (10 ** 7, 5 * 10 ** 6, 123456789, 0, 10 ** 6)
+
+
+def ouvrir_table():
+    table = TableComptes(journal=JournalTransactions())
+    for i, limite in enumerate((1000, 60000, 100000, 60000, 60000)):
+        table.ouvrir_compte(f"Client {i}", "Adresse", "+33600000000", f"{i:013d}", f"login{i}", "", limite)
+    table.soldes[:] = array("q", SOLDES)
+    return table
+
+
+def cle(table, ligne):
+    return f"{table.cartes[ligne]:016d}"
+
+
+def horodatages_du_compte(journal, cle_compte):
+    return [journal.horodatages[position] for position in journal.positions(cle_compte)]
+
+
+@pytest.fixture(params=["numpy", "pur Python"])
+def moteur(request, monkeypatch):
+    if request.param == "numpy":
+        if arrete_journalier.numpy is None:
+            pytest.skip("numpy absent")
+    else:
+        monkeypatch.setattr(arrete_journalier, "numpy", None)
+    return request.param
+
+
+def test_arrete_complet(processus, moteur, tmp_path):
+    table = ouvrir_table()
+    interets, frais = calculer(array("q", SOLDES), table.types)
+    interets, frais = list(interets), list(frais)
+    arrete = ArreteJournalier(table, fichier_reprise=str(tmp_path / "arrete.json"), taille_tranche=2)
+    resultat = arrete.executer(T0)
+    assert (resultat.nombre_comptes, resultat.total_interets, resultat.total_frais) == (5, sum(interets), sum(frais))
+    assert list(table.soldes) == [s + i - f for s, i, f in zip(SOLDES, interets, frais)]
+    for ligne in range(5):
+        entrees = [(type_transaction, centimes) for _, type_transaction, centimes, _, _
+                   in table.journal.entrees(cle(table, ligne))]
+        attendues = [(INTERETS, interets[ligne])] * bool(interets[ligne]) + [(FRAIS, frais[ligne])] * bool(frais[ligne])
+        assert entrees == attendues
+    assert arrete.executer(T0 + 60).message == "L'arrêté du jour a déjà été passé."
+    # Le lendemain, les clés déjà connues du journal sont réutilisées
+    assert arrete.executer(T0 + SECONDES_PAR_JOUR).nombre_comptes == 5
+    assert len(table.journal.cles) == 4  # Le compte vide n'a jamais eu d'écriture
+
+
+def test_arrete_date_avant_le_journal_refuse(processus):
+    table = ouvrir_table()
+    table.journal.enregistrer(DEPOT, 10, cle(table, 0), horodatage=T0)
+    resultat = ArreteJournalier(table).executer(T0 - 1)
+    assert resultat.message == "L'arrêté ne peut pas être daté avant la dernière écriture du journal."
+    assert list(table.soldes) == list(SOLDES) and len(table.journal) == 1
+
+
+def test_reprise_dans_l_ordre_et_totaux_complets(processus, moteur, tmp_path, monkeypatch):
+    table = ouvrir_table()
+    interets, frais = calculer(array("q", SOLDES), table.types)
+    fichier = str(tmp_path / "arrete.json")
+    arrete = ArreteJournalier(table, fichier_reprise=fichier, taille_tranche=2)
+    ecrire = arrete._ecrire_reprise
+    appels = []
+
+    def ecrire_puis_echouer(etat):
+        appels.append(etat["ligne"])
+        if len(appels) == 3:  # Tranche [2, 4) passée au journal, mais son point de reprise n'est pas écrit
+            raise OSError("disque plein")
+        ecrire(etat)
+
+    monkeypatch.setattr(arrete, "_ecrire_reprise", ecrire_puis_echouer)
+    with pytest.raises(OSError):
+        arrete.executer(T0)
+    monkeypatch.setattr(arrete, "_ecrire_reprise", ecrire)
+
+    # Des opérations arrivent avant la reprise, plus tard dans la journée
+    table.journal.enregistrer(DEPOT, 1, cle(table, 4), horodatage=T0 + 2)
+    table.journal.enregistrer(DEPOT, 1, cle(table, 2), horodatage=T0 + 2)
+    resultat = arrete.executer(T0 + 60)
+    assert (resultat.total_interets, resultat.total_frais) == (sum(interets), sum(frais))
+    assert resultat.nombre_comptes == 3
+
+    journal = table.journal
+    for ligne in range(5):
+        horodatages = horodatages_du_compte(journal, cle(table, ligne))
+        assert horodatages == sorted(horodatages)
+    # Le compte de la tranche reprise n'a qu'une écriture d'intérêts ; celui de la tranche suivante est daté après le dépôt
+    assert [entree[1] for entree in journal.entrees(cle(table, 2))] == [INTERETS, FRAIS, DEPOT]
+    recents = list(journal.rechercher(cle(table, 4), depuis=T0 + 1, recents_d_abord=False))
+    assert [journal.types[position] for position in recents] == [DEPOT, INTERETS, FRAIS]
+    assert list(journal.rechercher(cle(table, 4), jusqu_a=T0)) == []
@@ -0,0 +1,92 @@
+import pytest
+
+from banque import authentification
+from banque.authentification import (Authentification, CacheSessions, LimiteurTentatives, empreinte_acceptee,
+                                     est_empreinte, hacher_secret, proteger, verifier_secret)
+from banque.modele import Entreprise
+from banque.registre_comptes import RegistreComptes
+
+
+@pytest.fixture
+def horloge(monkeypatch):
+    """Horloge monotone réglée à la main."""
+    class Horloge:
+        maintenant = 1000.0
+
+        def __call__(self):
+            return self.maintenant
+
+    horloge = Horloge()
+    monkeypatch.setattr(authentification.time, "monotonic", horloge)
+    return horloge
+
+
+def test_empreintes():
+    empreinte = hacher_secret("secret")
+    assert est_empreinte(empreinte) and empreinte != hacher_secret("secret")  # Sel aléatoire
+    assert verifier_secret("secret", empreinte) and not verifier_secret("Secret", empreinte)
+    assert not verifier_secret(None, empreinte) and not verifier_secret("secret", "")
+    assert proteger("") == ""
+    assert proteger(empreinte) != empreinte  # Un secret saisi est toujours haché, même s'il ressemble à une empreinte
+    assert empreinte_acceptee(empreinte) == empreinte
+    algorithme, n, r, p, sel, cle = empreinte.split("$")
+    for invalide in (f"{algorithme}${2 ** 20}${r}${p}${sel}${cle}", f"md5${n}${r}${p}${sel}${cle}",
+                     f"{algorithme}${n}${r}${p}${sel[:-2]}${cle}", "secret"):
+        assert not est_empreinte(invalide)
+        with pytest.raises(ValueError):
+            empreinte_acceptee(invalide)
+
+
+def test_limiteur_bloque_de_plus_en_plus_longtemps(horloge):
+    limiteur = LimiteurTentatives(essais=2, blocage=10)
+    for _ in range(2):
+        assert limiteur.autoriser("A")
+        limiteur.echec("A")
+    assert not limiteur.autoriser("A")
+    horloge.maintenant += 10.5
+    for _ in range(2):
+        assert limiteur.autoriser("A")
+        limiteur.echec("A")
+    horloge.maintenant += 10.5
+    assert not limiteur.autoriser("A")  # Deuxième blocage : 20 secondes
+    horloge.maintenant += 10
+    assert limiteur.autoriser("A")
+    limiteur.reussite("A")
+    assert limiteur.autoriser("A") and limiteur.autoriser("A") and not limiteur.autoriser("A")
+
+
+def test_sessions(horloge):
+    sessions = CacheSessions(capacite=2, duree=60)
+    premier, second = sessions.ouvrir("a"), sessions.ouvrir("b")
+    assert sessions.verifier(premier) == "a"  # Devient la plus récemment utilisée
+    troisieme = sessions.ouvrir("c")
+    assert sessions.verifier(second) is None and len(sessions) == 2
+    horloge.maintenant += 61
+    assert sessions.verifier(troisieme) is None
+    assert sessions.fermer(premier) and not sessions.fermer(premier)
+
+
+def test_connexion(processus, nouveau_client):
+    registre = RegistreComptes()
+    client = nouveau_client(1, mot_de_passe="mot de passe")
+    client.creer_compte(registre)
+    entreprise = Entreprise("ACME", "Paris", "FR1", 100000, "ACME-1", "secret")
+    registre.enregistrer_entreprise(entreprise)
+    authentification = Authentification(registre)
+    jeton = authentification.connecter("login1", "mot de passe")
+    assert authentification.verifier_jeton(jeton) is client.compte
+    assert authentification.connecter("login1", "faux") is None
+    assert authentification.connecter("inconnu", "mot de passe") is None
+    assert authentification.verifier_jeton(authentification.connecter_entreprise("ACME-1", "secret")) is entreprise
+    assert authentification.deconnecter(jeton) and authentification.verifier_jeton(jeton) is None
+
+
+def test_pin_bloque_apres_trois_echecs(processus, nouveau_client):
+    client = nouveau_client()
+    client.creer_compte()
+    assert client.compte.entrer_pin("12a4") == "Le PIN doit être composé de 4 chiffres."
+    assert client.compte.entrer_pin("1234") == "PIN enregistré avec succès."
+    assert client.compte.pin != "1234"
+    for _ in range(3):
+        assert client.compte.verifier_pin("0000") == "PIN incorrect."
+    assert client.compte.verifier_pin("1234") == "Trop de tentatives, réessayez plus tard."
@@ -0,0 +1,68 @@
+from banque.detection_fraude import (MONTANT_INHABITUEL, SEUIL_VITESSE, TRANSFERT_CIRCULAIRE, VITESSE,
+                                     DetecteurFraude, demarrer_detection)
+from banque.journal_transactions import DEPOT, TRANSFERT, JournalTransactions
+from banque.modele import Entreprise
+from banque.registre_comptes import RegistreComptes
+
+T0 = 1800000000  # Début d'une fenêtre de vitesse
+
+
+def motifs(detecteur):
+    return [(alerte.cle, alerte.motif) for alerte in detecteur.alertes]
+
+
+def test_vitesse_une_alerte_par_fenetre():
+    detecteur = DetecteurFraude()
+    for i in range(SEUIL_VITESSE + 5):
+        detecteur.observer(DEPOT, 100, "A", None, T0 + i % 60)
+    assert motifs(detecteur) == [("A", VITESSE)]
+    detecteur.observer(DEPOT, 100, "A", None, T0 + 60)  # Nouvelle fenêtre
+    assert detecteur.operations[detecteur._lignes["A"]] == 1
+
+
+def test_montant_inhabituel():
+    detecteur = DetecteurFraude()
+    for i in range(12):
+        detecteur.observer(DEPOT, 1000 + i % 3, "A", None, T0 + 100 * i)
+    assert motifs(detecteur) == []
+    detecteur.observer(DEPOT, 1000000, "A", None, T0 + 5000)
+    assert motifs(detecteur) == [("A", MONTANT_INHABITUEL)]
+    assert str(detecteur.alertes[0]).startswith("Alerte montant inhabituel sur le compte A : 10000€ pour une moyenne")
+
+
+def test_circuit_mais_pas_aller_retour():
+    detecteur = DetecteurFraude()
+    detecteur.observer(TRANSFERT, 500, "A", "B", T0)
+    detecteur.observer(TRANSFERT, 500, "B", "A", T0 + 1)  # Remboursement : pas un circuit
+    assert motifs(detecteur) == []
+    detecteur.observer(TRANSFERT, 500, "A", "B", T0 + 2)
+    detecteur.observer(TRANSFERT, 500, "B", "C", T0 + 3)
+    detecteur.observer(TRANSFERT, 500, "C", "A", T0 + 4)
+    assert motifs(detecteur) == [("C", TRANSFERT_CIRCULAIRE)]
+
+
+def test_gel_automatique(processus, nouveau_client):
+    registre = RegistreComptes()
+    client = nouveau_client()
+    client.creer_compte(registre)
+    entreprise = Entreprise("ACME", "Paris", "FR1", 100000, "ACME-1", "")
+    detecteur = demarrer_detection(processus.journal, registre)
+    for _ in range(SEUIL_VITESSE + 1):
+        entreprise.deposer_fonds(1)  # Alerte sans gel possible : le thread de gel doit survivre
+    for _ in range(SEUIL_VITESSE + 1):
+        client.compte.deposer_fonds(1)
+    detecteur.attendre_gels()
+    assert client.compte.est_gelé
+    assert client.compte.deposer_fonds(1) == "Le compte est gelé, vous ne pouvez pas effectuer de dépôt."
+    assert {cle for cle, _ in motifs(detecteur)} == {entreprise.cle_journal, client.compte.numero_carte}
+
+
+def test_rejeu_sans_gel(processus, nouveau_client):
+    journal = JournalTransactions()
+    for i in range(SEUIL_VITESSE + 1):
+        journal.enregistrer(DEPOT, 1, "4970100000000000", horodatage=T0 + i)
+    detecteur = DetecteurFraude(RegistreComptes(), gel_automatique=True)
+    alertes = detecteur.rejouer(journal)
+    assert [alerte.motif for alerte in alertes] == [VITESSE]
+    detecteur.attendre_gels()
+    assert detecteur.geles == set()
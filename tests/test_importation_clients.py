@@ -0,0 +1,90 @@
+import csv
+import json
+
+import pytest
+
+from banque.allocateur_cartes import AllocateurCartes
+from banque.authentification import hacher_secret, verifier_secret
+from banque.importation_clients import importer_clients, lire_cartes, reserver_numeros, traiter_lot
+from banque.registre_comptes import RegistreComptes
+
+CHAMPS = ["nom", "adresse", "telephone", "cnic", "login", "mot_de_passe", "empreinte", "limite_retrait"]
+
+
+def ecrire_demandes(chemin, lignes):
+    with open(chemin, "w", encoding="utf-8", newline="") as fichier:
+        ecrivain = csv.DictWriter(fichier, CHAMPS)
+        ecrivain.writeheader()
+        ecrivain.writerows(lignes)
+
+
+def demande(i, **champs):
+    ligne = {"nom": f"Client {i}", "adresse": "Paris", "telephone": "+33612345678", "cnic": f"{i:013d}",
+             "login": f"login{i}", "mot_de_passe": "", "empreinte": "", "limite_retrait": "1000"}
+    ligne.update(champs)
+    return ligne
+
+
+def lire_resultats(chemin):
+    with open(chemin, encoding="utf-8", newline="") as fichier:
+        return list(csv.DictReader(fichier))
+
+
+def test_import_plus_de_cartes_existantes_que_de_marge(processus, tmp_path):
+    existantes = AllocateurCartes().allouer_lot(200)[1:]  # Toutes dans le premier bloc réservé, sauf la position 0
+    ecrire_demandes(tmp_path / "demandes.csv", [demande(i) for i in range(50)])
+    assert importer_clients(str(tmp_path / "demandes.csv"), str(tmp_path / "resultats.csv"), processus=1,
+                            taille_lot=20, cartes_existantes=existantes) == (50, 0)
+    cartes = list(lire_cartes(str(tmp_path / "resultats.csv")))
+    assert len(set(cartes)) == 50 and not set(cartes) & set(existantes)
+
+
+def test_bloc_trop_petit_erreur_claire(processus):
+    bloc = AllocateurCartes().reserver_bloc(1)
+    with pytest.raises(ValueError, match="Bloc de 1 numéros"):
+        traiter_lot(1, [demande(1), demande(2)], bloc)
+
+
+def test_allocateur_epuise(processus):
+    allocateur = AllocateurCartes()
+    allocateur.compteur = allocateur.nombre_disponible() - 1
+    with pytest.raises(RuntimeError):
+        reserver_numeros(allocateur, 2)
+
+
+def test_rejets_et_comptes_crees(processus, tmp_path):
+    empreinte = hacher_secret("secret")
+    ecrire_demandes(tmp_path / "demandes.csv", [
+        demande(1, empreinte=empreinte), demande(2, nom="AB"), demande(3, telephone="abc"), demande(4, cnic="12"),
+        demande(5, limite_retrait="0"), demande(6, limite_retrait="x"), demande(7, empreinte="scrypt$1$2$3"),
+        demande(8, limite_retrait="60000")])
+    registre = RegistreComptes()
+    assert importer_clients(str(tmp_path / "demandes.csv"), str(tmp_path / "resultats.csv"),
+                            registre=registre) == (2, 6)
+    resultats = lire_resultats(tmp_path / "resultats.csv")
+    assert [resultat["message"] for resultat in resultats[1:7]] == [
+        "Nom invalide", "Numéro de téléphone invalide", "CNIC invalide", "Limite de retrait invalide",
+        "Limite de retrait invalide", "Empreinte de mot de passe invalide"]
+    assert resultats[0]["empreinte"] == empreinte
+    assert resultats[7]["type_compte"] == "Compte courant"
+    client = registre.trouver_par_login("login1")
+    assert client.compte.numero_carte == resultats[0]["numero_carte"]
+    assert verifier_secret("secret", client.mot_de_passe)
+
+
+def test_jsonl_lignes_illisibles_rejetees(processus, tmp_path):
+    chemin = tmp_path / "demandes.jsonl"
+    chemin.write_text("\n".join([json.dumps(demande(1)), "{pas du json", "[1, 2]",
+                                 json.dumps(demande(2, cnic=1234567890123))]) + "\n", encoding="utf-8")
+    assert importer_clients(str(chemin), str(tmp_path / "resultats.csv"), processus=1) == (1, 3)
+    assert [resultat["message"] for resultat in lire_resultats(tmp_path / "resultats.csv")[1:]] == [
+        "Ligne JSON illisible", "La ligne n'est pas un objet JSON", "Champ de type invalide"]
+
+
+def test_pool_de_processus(processus, tmp_path):
+    ecrire_demandes(tmp_path / "demandes.csv", [demande(i, cnic="1" if i == 7 else f"{i:013d}") for i in range(40)])
+    assert importer_clients(str(tmp_path / "demandes.csv"), str(tmp_path / "resultats.csv"), processus=2,
+                            taille_lot=10) == (39, 1)
+    resultats = lire_resultats(tmp_path / "resultats.csv")
+    assert [int(resultat["ligne"]) for resultat in resultats] == list(range(1, 41))
+    assert len({resultat["numero_carte"] for resultat in resultats if resultat["statut"] == "accepté"}) == 39
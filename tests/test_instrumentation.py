@@ -0,0 +1,67 @@
+import threading
+
+import pytest
+
+from banque.instrumentation import BORNES, Histogramme, Instrumentation
+from banque.modele import CompteBancaire
+
+
+def test_histogramme():
+    histogramme = Histogramme()
+    assert histogramme.quantile(0.5) is None
+    for duree in (500, 1500, 1500, 10 ** 11):
+        histogramme.observer(duree)
+    histogramme.observer(2000, echec=True)
+    assert (len(histogramme), histogramme.somme, histogramme.echecs) == (5, 500 + 3000 + 10 ** 11 + 2000, 1)
+    assert histogramme.quantile(0.2) == BORNES[0]
+    assert histogramme.quantile(0.6) == 2500
+    assert histogramme.quantile(1) == float("inf")
+    histogramme.vider()
+    assert (len(histogramme), histogramme.somme, histogramme.echecs) == (0, 0, 0)
+
+
+def test_mesures_concurrentes_toutes_comptees(processus, nouveau_client):
+    clients = [nouveau_client(i) for i in range(8)]
+    for client in clients:
+        client.creer_compte()
+    instrumentation = Instrumentation()
+    instrumentation.activer([(CompteBancaire, "deposer_fonds")])
+    depart = threading.Barrier(len(clients))
+
+    def deposer(compte):
+        depart.wait()
+        for _ in range(5000):
+            compte.deposer_fonds(1)
+
+    threads = [threading.Thread(target=deposer, args=(client.compte,)) for client in clients]
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        instrumentation.desactiver()
+    histogramme = instrumentation.histogrammes[("CompteBancaire", "deposer_fonds")]
+    assert len(histogramme) == 8 * 5000
+    assert 'banque_operations_total{classe="CompteBancaire",operation="deposer_fonds"} 40000' in \
+        instrumentation.exporter()
+    assert clients[0].compte.deposer_fonds(1) == "1€ déposés avec succès."
+    assert len(histogramme) == 40000  # Désactivée : plus rien n'est mesuré
+
+
+def test_echecs_comptes(processus, nouveau_client):
+    client = nouveau_client()
+    client.creer_compte()
+    instrumentation = Instrumentation()
+    instrumentation.activer([(CompteBancaire, "deposer_fonds")])
+    try:
+        with pytest.raises(ValueError):
+            client.compte.deposer_fonds(float("nan"))
+        client.compte.deposer_fonds(10)
+    finally:
+        instrumentation.desactiver()
+    texte = instrumentation.exporter()
+    assert 'banque_operations_echecs_total{classe="CompteBancaire",operation="deposer_fonds"} 1' in texte
+    assert 'banque_operation_duree_secondes_count{classe="CompteBancaire",operation="deposer_fonds"} 2' in texte
+    instrumentation.reinitialiser()
+    assert 'banque_operations_total{classe="CompteBancaire",operation="deposer_fonds"} 0' in instrumentation.exporter()
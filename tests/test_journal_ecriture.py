@@ -0,0 +1,81 @@
+import os
+
+from banque.journal_ecriture import demarrer_persistance, prendre_instantane, restaurer
+from banque.journal_transactions import JournalTransactions
+from banque.modele import Client, CompteBancaire, Entreprise
+from banque.registre_comptes import RegistreComptes
+
+
+def recreer(client, numero_carte):
+    """Recrée le compte d'un client dans un nouveau processus, comme le ferait l'application depuis son stockage."""
+    copie = Client(client.nom, client.adresse, client.telephone, client.cnic, client.login, "", client.limite_retrait)
+    copie.compte = CompteBancaire(copie, numero_carte)
+    return copie
+
+
+def test_redemarrage_puis_creation_et_retrait(processus, nouveau_client, tmp_path):
+    dossier = str(tmp_path)
+    alice = nouveau_client(1, limite_retrait=1000)
+    alice.creer_compte()
+    journal_ecriture = demarrer_persistance(dossier, [alice.compte])
+    alice.compte.deposer_fonds(2000)
+    assert alice.compte.retirer_fonds(300) == "300€ retirés avec succès."
+    journal_ecriture.fermer()
+
+    processus.redemarrer()
+    alice = recreer(alice, alice.compte.numero_carte)
+    journal_ecriture = demarrer_persistance(dossier, [alice.compte])
+    try:
+        assert alice.compte.solde == 1700
+        registre = RegistreComptes()
+        registre.enregistrer_client(alice)
+        bob = nouveau_client(2)
+        assert bob.creer_compte(registre) == "Compte créé avec succès, numéro de carte attribué."
+        assert bob.compte.numero_carte != alice.compte.numero_carte
+        # Les 300€ retirés avant l'arrêt comptent toujours dans la fenêtre de 24 heures
+        assert alice.compte.retirer_fonds(800) == \
+            "Limite de retrait quotidienne atteinte : 700€ encore disponibles."
+        assert alice.compte.retirer_fonds(700) == "700€ retirés avec succès."
+    finally:
+        journal_ecriture.fermer()
+
+
+def test_instantane_puis_journal(processus, nouveau_client, tmp_path):
+    dossier = str(tmp_path)
+    clients = [nouveau_client(i) for i in range(3)]
+    for client in clients:
+        client.creer_compte()
+    entreprise = Entreprise("ACME", "Paris", "FR1", 100000, "ACME-1", "")
+    comptes = [client.compte for client in clients] + [entreprise]
+    journal_ecriture = demarrer_persistance(dossier, comptes)
+    a, b, c = comptes[:3]
+    a.deposer_fonds(100)
+    a.transferer_fonds(40, b)
+    prendre_instantane(journal_ecriture, comptes, processus.journal)
+    entreprise.deposer_fonds(1000)
+    entreprise.transferer_fonds(12.5, c)
+    c.geler_compte()
+    journal_ecriture.fermer()
+
+    journal = JournalTransactions()
+    etat = restaurer(dossier, journal)
+    assert etat.segment_instantane is not None and etat.nombre_rejoues == 3
+    assert etat.soldes == {a.numero_carte: 6000, b.numero_carte: 4000, c.numero_carte: 1250,
+                           entreprise.cle_journal: 98750}
+    assert etat.geles == {c.numero_carte}
+    assert list(journal.rendre(c.numero_carte)) == ["Réception de 12.5€ du compte entreprise ACME-1"]
+    assert len(journal) == 4
+
+
+def test_trame_tronquee_ignoree(processus, nouveau_client, tmp_path):
+    dossier = str(tmp_path)
+    client = nouveau_client()
+    client.creer_compte()
+    journal_ecriture = demarrer_persistance(dossier, [client.compte])
+    client.compte.deposer_fonds(10)
+    client.compte.deposer_fonds(20)
+    journal_ecriture.fermer()
+    segment = os.path.join(dossier, sorted(nom for nom in os.listdir(dossier) if nom.endswith(".wal"))[-1])
+    with open(segment, "r+b") as fichier:
+        fichier.truncate(os.path.getsize(segment) - 3)  # Arrêt brutal au milieu de la dernière trame
+    assert restaurer(dossier).soldes == {client.compte.numero_carte: 1000}
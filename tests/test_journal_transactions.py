@@ -0,0 +1,72 @@
+from banque.journal_transactions import (AUCUN, DEPOT, GEL, INTERETS, RETRAIT, TRANSFERT, JournalTransactions,
+                                         cle_entreprise, en_centimes, en_euros, formater_montant)
+from banque.modele import Entreprise
+
+
+def test_conversions():
+    assert en_centimes(12.34) == 1234 and en_centimes(0.1 + 0.2) == 30
+    assert en_euros(1234) == 12.34 and en_euros(1200) == 12
+    assert formater_montant(1200) == "12€" and formater_montant(1250) == "12.5€" and formater_montant(-5) == "-0.05€"
+
+
+def test_historique_rendu_depuis_le_journal(processus, nouveau_client):
+    alice, bob = nouveau_client(1), nouveau_client(2)
+    alice.creer_compte()
+    bob.creer_compte()
+    entreprise = Entreprise("ACME", "Paris", "FR1", 100000, "ACME-1", "")
+    a, b = alice.compte, bob.compte
+    assert a.consulter_historique() == "Aucune transaction enregistrée."
+    a.deposer_fonds(100)
+    a.retirer_fonds(12.5)
+    a.transferer_fonds(20, b)
+    a.transferer_fonds(10, entreprise)
+    entreprise.transferer_fonds(3, b)
+    a.geler_compte()  # Signalé aux abonnés, absent de l'historique
+    assert a.historique_transactions == ["Dépôt de 100€", "Retrait de 12.5€",
+                                         f"Transfert de 20€ vers le compte {b.numero_carte}",
+                                         "Transfert de 10€ vers le compte entreprise ACME-1"]
+    assert b.consulter_historique() == (f"Réception de 20€ du compte {a.numero_carte}\n"
+                                        "Réception de 3€ du compte entreprise ACME-1")
+    assert entreprise.historique_transactions == [f"Réception de 10€ du compte {a.numero_carte}",
+                                                  f"Transfert de 3€ vers le compte {b.numero_carte}"]
+    assert len(processus.journal) == 5 and processus.journal.cles.count(a.numero_carte) == 1
+
+
+def test_colonnes_elargies_pour_les_grands_montants():
+    journal = JournalTransactions()
+    journal.enregistrer(DEPOT, 10, "A", horodatage=1)
+    assert journal.montants.typecode == "i"
+    journal.enregistrer(DEPOT, 30000000, "A", horodatage=2)  # 3 milliards de centimes
+    assert journal.montants.typecode == "q"
+    assert list(journal.rendre("A")) == ["Dépôt de 10€", "Dépôt de 30000000€"]
+
+
+def test_ecritures_groupees_et_abonnes():
+    journal = JournalTransactions()
+    recus = []
+    journal.abonner(lambda *evenement: recus.append(evenement), lambda lot: recus.extend(lot))
+    journal.enregistrer_lot(TRANSFERT, "A", [("B", 100), ("C", 200)], horodatage=5)
+    journal.enregistrer_colonnes(INTERETS, ["A", "D"], [1, 2], 6)
+    journal.signaler(GEL, "A")
+    assert recus[:4] == [(TRANSFERT, 100, "A", "B", 5), (TRANSFERT, 200, "A", "C", 5),
+                         (INTERETS, 1, "A", None, 6), (INTERETS, 2, "D", None, 6)]
+    assert recus[4][:4] == (GEL, 0, "A", None) and len(journal) == 4
+    assert list(journal.rendre("A")) == ["Transfert de 1€ vers le compte B", "Transfert de 2€ vers le compte C",
+                                         "Intérêts de 0.01€"]
+    assert journal.entree(1) == (5, TRANSFERT, 200, "A", "C")
+    assert journal.dernier_horodatage == 6
+
+
+def test_colonnes_rechargees_et_etendues():
+    journal = JournalTransactions()
+    journal.enregistrer(DEPOT, 1, "A", horodatage=1)
+    journal.enregistrer(TRANSFERT, 1, "A", "B", horodatage=2)
+    copie = JournalTransactions()
+    copie.charger_colonnes(*journal.copier_colonnes())
+    assert list(copie.positions("B")) == [1] and copie.dernier_horodatage == 2
+    # Colonnes relues d'un journal d'écriture : leurs indices sont traduits, les gels ignorés
+    copie.etendre({0: copie.indices(["C"])[0], 1: copie.indices(["A"])[0]},
+                  [RETRAIT, GEL, TRANSFERT], [3, 3, 4], [5, 0, 7], [0, 0, 1], [AUCUN, AUCUN, 0])
+    assert list(copie.rendre("C")) == ["Retrait de 0.05€", "Réception de 0.07€ du compte A"]
+    assert copie.nombre_transactions("A") == 3 and copie.dernier_horodatage == 4
+    assert list(copie.positions(cle_entreprise("inconnue"))) == []
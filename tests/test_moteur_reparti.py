@@ -0,0 +1,63 @@
+import pytest
+
+from banque.moteur_reparti import (ANNULER, COMPTE_INTROUVABLE, CREDITER, DEPOT, OPERATION_INVALIDE, OUVRIR,
+                                   PARTITION_INDISPONIBLE, PRETE, RESERVER, SOLDE, MoteurReparti, Partition,
+                                   partition_de)
+
+
+def ouverture(i, carte):
+    return (OUVRIR, f"Client {i}", "Adresse", "+33612345678", f"{i:013d}", f"login{i}", "", 1000, carte)
+
+
+def test_partition_reservation_annulee(processus):
+    partition = Partition()
+    carte = processus.allocateur.allouer()
+    assert partition.executer([ouverture(1, carte), (DEPOT, carte, 100)])[0] == carte
+    assert partition.executer([(RESERVER, 7, carte, 30), (SOLDE, carte)]) == [PRETE, 70]
+    assert partition.executer([(ANNULER, 7), (SOLDE, carte)]) == [None, 100]
+    assert partition.executer([(RESERVER, 8, carte, 300)]) == ["Fonds insuffisants pour le transfert."]
+    assert partition.total() == 10000
+
+
+def test_partition_survit_aux_operations_invalides(processus):
+    partition = Partition()
+    resultats = partition.executer([("inconnue",), (CREDITER, 1, "A", "4970100000000000", 10), (DEPOT, "0", 1)])
+    assert all(resultat.startswith(OPERATION_INVALIDE) for resultat in resultats[:2])
+    assert resultats[2] == COMPTE_INTROUVABLE
+
+
+@pytest.fixture(scope="module")
+def moteur():
+    with MoteurReparti(2) as moteur:
+        yield moteur
+
+
+def test_transferts_entre_partitions(processus, moteur):
+    cartes = [moteur.ouvrir_compte(f"Client {i}", "Adresse", "+33612345678", f"{i:013d}", f"login{i}", "", 1000)
+              for i in range(8)]
+    cle = moteur.ouvrir_entreprise("ACME", "Paris", "FR1", 100000, "ACME-1", "")
+    partitions = {partition_de(carte, 2) for carte in cartes}
+    assert partitions == {0, 1}
+    source = cartes[0]
+    ailleurs = next(carte for carte in cartes if partition_de(carte, 2) != partition_de(source, 2))
+    moteur.executer([(DEPOT, carte, 100) for carte in cartes] + [(DEPOT, cle, 1000)])
+    total = moteur.total()
+    assert total == 8 * 10000 + 100000
+
+    assert moteur.transferer(source, ailleurs, 40) == f"40€ transférés avec succès vers le compte {ailleurs}."
+    assert moteur.transferer(source, ailleurs, 1000) == "Fonds insuffisants pour le transfert."
+    assert moteur.transferer(source, "4970100000000000", 10) == COMPTE_INTROUVABLE
+    assert moteur.transferer(cle, ailleurs, 10).startswith("10€ transférés avec succès")
+    assert (moteur.solde(source), moteur.solde(ailleurs)) == (60, 150)
+    assert moteur.total() == total  # Rien n'est créé ni perdu
+    assert moteur.executer([(SOLDE,), ("inconnue", source)])[0].startswith(OPERATION_INVALIDE)
+
+
+def test_partition_arretee(processus):
+    with MoteurReparti(2) as moteur:
+        carte = next(carte for carte in iter(processus.allocateur.allouer, None) if partition_de(carte, 2) == 1)
+        assert moteur.executer([ouverture(1, carte)]) == [carte]
+        moteur._processus[1].terminate()
+        moteur._processus[1].join()
+        assert moteur.deposer(carte, 10) == PARTITION_INDISPONIBLE
+        assert moteur.total() is None
@@ -0,0 +1,42 @@
+import pytest
+
+from banque.journal_transactions import DEPOT, RETRAIT, JournalTransactions
+
+CLE = "4970100000000000"
+
+
+def remplir():
+    journal = JournalTransactions()
+    for i in range(10):
+        journal.enregistrer(RETRAIT if i % 2 else DEPOT, i + 1, CLE, horodatage=1000 + i)
+    return journal
+
+
+def test_pages_successives():
+    journal = remplir()
+    page = journal.page(CLE, taille=4)
+    assert page.lignes == ["Retrait de 10€", "Dépôt de 9€", "Retrait de 8€", "Dépôt de 7€"]
+    lignes = list(page)
+    while page.curseur is not None:
+        page = journal.page(CLE, taille=4, curseur=page.curseur)
+        lignes += page.lignes
+    assert len(lignes) == 10 and lignes[-1] == "Dépôt de 1€"
+    # Une page pleine qui termine l'historique n'annonce pas de suite
+    assert journal.page(CLE, taille=10).curseur is None
+    assert journal.page(CLE, taille=4, recents_d_abord=False).lignes[0] == "Dépôt de 1€"
+
+
+def test_filtres():
+    journal = remplir()
+    assert journal.page(CLE, depuis=1003, jusqu_a=1005).lignes == ["Retrait de 6€", "Dépôt de 5€", "Retrait de 4€"]
+    assert journal.page(CLE, types=["retrait"], montant_min=5, montant_max=8).lignes == \
+        ["Retrait de 8€", "Retrait de 6€"]
+    assert journal.page(CLE, types=[DEPOT], taille=2).lignes == ["Dépôt de 9€", "Dépôt de 7€"]
+    assert str(journal.page("inconnu")) == ""
+
+
+@pytest.mark.parametrize("taille", [0, -1, 2.5, None])
+def test_taille_invalide(taille):
+    with pytest.raises(ValueError):
+        remplir().page(CLE, taille=taille)
+
@@ -0,0 +1,42 @@
+from banque.journal_transactions import DEPOT, TRANSFERT_ENTREPRISE
+from banque.modele import Entreprise
+from banque.registre_comptes import RegistreComptes
+
+
+def preparer(nouveau_client, solde=1000):
+    registre = RegistreComptes()
+    clients = [nouveau_client(i) for i in range(3)]
+    for client in clients:
+        client.creer_compte(registre)
+    entreprise = Entreprise("ACME", "Paris", "FR1", 100000, "ACME-1", "")
+    entreprise.deposer_fonds(solde)
+    return registre, entreprise, [client.compte for client in clients]
+
+
+def test_paiement_groupe(processus, nouveau_client):
+    registre, entreprise, comptes = preparer(nouveau_client)
+    resultat = entreprise.payer_lot([(comptes[0].numero_carte, 100), (comptes[1].numero_carte, 250.5),
+                                     (comptes[0].numero_carte, 0.5)], registre)
+    assert (resultat.accepte, resultat.nombre_paiements, resultat.total_centimes) == (True, 3, 35100)
+    assert str(resultat) == "3 paiements effectués pour un total de 351€."
+    assert (entreprise.solde, comptes[0].solde, comptes[1].solde, comptes[2].solde) == (649, 100.5, 250.5, 0)
+    assert [processus.journal.types[position] for position in processus.journal.positions(entreprise.cle_journal)] == \
+        [DEPOT] + [TRANSFERT_ENTREPRISE] * 3
+    assert comptes[1].historique_transactions == ["Réception de 250.5€ du compte entreprise ACME-1"]
+
+
+def test_lignes_invalides_tout_rejete(processus, nouveau_client):
+    registre, entreprise, comptes = preparer(nouveau_client)
+    resultat = entreprise.payer_lot([(comptes[0].numero_carte, 10), ("4970100000000000", 10),
+                                     (comptes[1].numero_carte, -1)], registre)
+    assert not resultat.accepte and resultat.message == "Paiement groupé rejeté : 2 ligne(s) invalide(s)."
+    assert resultat.erreurs == [(2, "Compte destinataire introuvable."), (3, "Le montant du transfert doit être positif.")]
+    assert entreprise.solde == 1000 and comptes[0].solde == 0 and len(processus.journal) == 1
+
+
+def test_fonds_insuffisants_rien_n_est_paye(processus, nouveau_client):
+    registre, entreprise, comptes = preparer(nouveau_client, solde=100)
+    resultat = entreprise.payer_lot([(compte.numero_carte, 40) for compte in comptes], registre)
+    assert (resultat.accepte, resultat.total_centimes, resultat.message) == \
+        (False, 12000, "Fonds insuffisants pour le paiement groupé.")
+    assert entreprise.solde == 100 and all(compte.solde == 0 for compte in comptes)
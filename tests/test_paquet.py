@@ -0,0 +1,30 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+import banque
+
+DIFFERES = ("banque.arrete_journalier", "banque.detection_fraude", "banque.importation_clients",
+            "banque.instrumentation", "banque.journal_ecriture", "banque.moteur_reparti", "banque.prets",
+            "banque.service_banque", "banque.table_comptes", "numpy", "asyncio", "multiprocessing")
+
+
+def test_import_sans_sous_systemes():
+    # Processus neuf : les tests déjà passés ont chargé une bonne partie du paquet
+    code = "import sys, banque; print(' '.join(sorted(sys.modules)))"
+    racine = os.path.dirname(os.path.dirname(os.path.abspath(banque.__file__)))
+    modules = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                             cwd=racine).stdout.split()
+    assert "banque.modele" in modules
+    assert not set(DIFFERES) & set(modules)
+
+
+def test_exports_differes():
+    from banque.table_comptes import TableComptes
+    assert banque.TableComptes is TableComptes
+    assert "TableComptes" in vars(banque)  # Les accès suivants ne repassent plus par __getattr__
+    assert set(banque.__all__) >= {"Client", "ServiceBanque", "MoteurReparti", "GuichetPrets"}
+    with pytest.raises(AttributeError):
+        banque.Inexistant
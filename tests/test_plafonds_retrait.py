@@ -0,0 +1,50 @@
+from banque.journal_transactions import DEPOT, RETRAIT, JournalTransactions
+from banque.plafonds_retrait import DUREE_TRANCHE, NOMBRE_TRANCHES, PlafondsRetrait
+
+T0 = 500000 * DUREE_TRANCHE  # Début d'une heure
+
+
+def test_fenetre_glissante():
+    plafonds = PlafondsRetrait()
+    assert plafonds.disponible("A", 1000) == 1000
+    assert plafonds.consommer("A", 600, 1000, T0)
+    assert not plafonds.consommer("A", 500, 1000, T0 + 10)
+    assert plafonds.consommer("A", 300, 1000, T0 + 5 * DUREE_TRANCHE)
+    assert plafonds.disponible("A", 1000, T0 + 5 * DUREE_TRANCHE) == 100
+    # Les 600 de la première heure sortent de la fenêtre 24 heures plus tard, les 300 restent
+    assert plafonds.disponible("A", 1000, T0 + NOMBRE_TRANCHES * DUREE_TRANCHE - 1) == 100
+    assert plafonds.disponible("A", 1000, T0 + NOMBRE_TRANCHES * DUREE_TRANCHE) == 700
+    assert plafonds.disponible("A", 1000, T0 + 10 * NOMBRE_TRANCHES * DUREE_TRANCHE) == 1000
+    assert plafonds.disponible("B", 1000, T0) == 1000 and len(plafonds) == 1
+
+
+def test_horloge_revenue_en_arriere():
+    plafonds = PlafondsRetrait()
+    assert plafonds.consommer("A", 600, 1000, T0 + DUREE_TRANCHE)
+    assert plafonds.consommer("A", 400, 1000, T0)  # Compté dans l'heure la plus récente vue
+    assert not plafonds.consommer("A", 1, 1000, T0)
+    assert plafonds.disponible("A", 1000, T0 + (NOMBRE_TRANCHES + 1) * DUREE_TRANCHE) == 1000
+
+
+def test_reconstruction_depuis_le_journal():
+    journal = JournalTransactions()
+    journal.enregistrer(RETRAIT, 5, "A", horodatage=T0 - NOMBRE_TRANCHES * DUREE_TRANCHE)  # Hors fenêtre
+    journal.enregistrer(DEPOT, 50, "A", horodatage=T0)
+    journal.enregistrer(RETRAIT, 3, "A", horodatage=T0 + 1)
+    journal.enregistrer(RETRAIT, 2, "B", horodatage=T0 + 2)
+    plafonds = PlafondsRetrait()
+    plafonds.reconstruire(journal, T0 + 60)
+    assert plafonds.disponible("A", 1000, T0 + 60) == 700
+    assert plafonds.disponible("B", 1000, T0 + 60) == 800
+
+
+def test_limite_des_comptes(processus, nouveau_client):
+    client = nouveau_client(limite_retrait=100)
+    client.creer_compte()
+    compte = client.compte
+    compte.deposer_fonds(500)
+    assert compte.retirer_fonds(60) == "60€ retirés avec succès."
+    assert compte.retirer_fonds(50) == "Limite de retrait quotidienne atteinte : 40€ encore disponibles."
+    assert compte.retirer_fonds(40) == "40€ retirés avec succès."
+    assert compte.retirer_fonds(1000) == "Fonds insuffisants."
+    assert compte.solde == 400
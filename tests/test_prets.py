@@ -0,0 +1,76 @@
+import pytest
+
+from banque.modele import Entreprise
+from banque.prets import (APPROUVEE, DUREE_MAXIMALE, EN_ATTENTE, JOURS_PAR_MOIS, REJETEE, SECONDES_PAR_JOUR,
+                          GuichetPrets, tableau_amortissement)
+
+T0 = 20000 * SECONDES_PAR_JOUR
+
+
+def ouvrir_entreprise(compte_id="ACME-1", solde=0):
+    entreprise = Entreprise(f"Entreprise {compte_id}", "Paris", "FR1", 100000, compte_id, "")
+    if solde:
+        entreprise.deposer_fonds(solde)
+    return entreprise
+
+
+def test_tableau_amortissement():
+    echeances = tableau_amortissement(1200000, 600, 12)
+    assert len(echeances) == 12 and echeances[-1].restant == 0
+    assert sum(echeance.capital for echeance in echeances) == 1200000
+    assert {echeance.montant for echeance in echeances[:-1]} == {echeances[0].montant}
+    assert [echeance.montant for echeance in tableau_amortissement(1000, 0, 3)] == [334, 334, 332]
+
+
+@pytest.mark.parametrize("montant, duree, taux, motif", [
+    (0, 12, 500, "Le montant du prêt doit être positif."),
+    (0.001, 12, 500, "Le montant du prêt doit être positif."),
+    ("1000", 12, 500, "Le montant du prêt doit être positif."),
+    (float("nan"), 12, 500, "Le montant du prêt doit être positif."),
+    (True, 12, 500, "Le montant du prêt doit être positif."),
+    (1000, 0, 500, f"La durée doit être un nombre entier de 1 à {DUREE_MAXIMALE} mois."),
+    (1000, DUREE_MAXIMALE + 1, 500, f"La durée doit être un nombre entier de 1 à {DUREE_MAXIMALE} mois."),
+    (1000, 12.0, 500, f"La durée doit être un nombre entier de 1 à {DUREE_MAXIMALE} mois."),
+    (1000, "12", 500, f"La durée doit être un nombre entier de 1 à {DUREE_MAXIMALE} mois."),
+    (1000, 12, -1, "Le taux doit être un nombre entier de points de base, positif ou nul."),
+    (1000, 12, 5.5, "Le taux doit être un nombre entier de points de base, positif ou nul."),
+    (1000, 12, None, "Le taux doit être un nombre entier de points de base, positif ou nul."),
+])
+def test_demande_invalide_rejetee(processus, montant, duree, taux, motif):
+    guichet = GuichetPrets()
+    demande = guichet.deposer_demande(ouvrir_entreprise(), montant, duree, taux, horodatage=T0)
+    assert (demande.statut, demande.motif, demande.mensualite) == (REJETEE, motif, None)
+    assert guichet.file_attente(horodatage=T0) == []
+
+
+def test_pret_accorde_puis_rembourse(processus):
+    guichet = GuichetPrets()
+    entreprise = ouvrir_entreprise(solde=100)
+    demande = entreprise.demander_pret(guichet, 1200, 2, 0)
+    assert demande.statut == EN_ATTENTE and demande.mensualite == 60000
+    assert guichet.file_attente() == [demande] and demande.risque is not None
+    assert guichet.approuver(demande, "employe", horodatage=T0) == \
+        f"Prêt n°{demande.identifiant} de 1200€ accordé à Entreprise ACME-1 : 2 mensualités de 600€."
+    assert demande.statut == APPROUVEE and entreprise.solde == 1300
+    assert guichet.approuver(demande) == f"La demande de prêt n°{demande.identifiant} n'est pas en attente."
+
+    assert guichet.prelever_echeances(T0) == "0 échéance(s) prélevée(s), 0 impayée(s)."
+    # Les deux échéances échues sont rattrapées d'un coup
+    assert guichet.prelever_echeances(T0 + 2 * JOURS_PAR_MOIS * SECONDES_PAR_JOUR) == \
+        "2 échéance(s) prélevée(s), 0 impayée(s)."
+    pret = guichet.prets[demande.identifiant]
+    assert pret.rembourse and entreprise.solde == 100
+
+
+def test_echeance_impayee_retentee(processus):
+    guichet = GuichetPrets()
+    entreprise = ouvrir_entreprise()
+    demande = guichet.deposer_demande(entreprise, 300, 1, 0)
+    guichet.approuver(demande, horodatage=T0)
+    entreprise.retirer_fonds(100)
+    echeance = T0 + JOURS_PAR_MOIS * SECONDES_PAR_JOUR
+    assert guichet.prelever_echeances(echeance) == "0 échéance(s) prélevée(s), 1 impayée(s)."
+    entreprise.deposer_fonds(100)
+    assert guichet.prelever_echeances(echeance + 1) == "0 échéance(s) prélevée(s), 0 impayée(s)."
+    assert guichet.prelever_echeances(echeance + SECONDES_PAR_JOUR) == "1 échéance(s) prélevée(s), 0 impayée(s)."
+    assert guichet.prets[demande.identifiant].impayes == 1
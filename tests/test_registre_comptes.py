@@ -0,0 +1,90 @@
+from banque.importation_clients import importer_clients
+from banque.modele import CompteBancaire, EmployeBancaire
+from banque.registre_comptes import COMPTE_ENREGISTRE, RegistreComptes
+
+
+def test_recherches_par_index(processus, nouveau_client):
+    registre = RegistreComptes()
+    clients = [nouveau_client(i, limite_retrait=60000 if i % 2 else 1000) for i in range(5)]
+    for client in clients:
+        assert client.creer_compte(registre) == "Compte créé avec succès, numéro de carte attribué."
+    cartes = sorted(client.compte.numero_carte for client in clients)
+    assert len(registre) == 5
+    assert registre.trouver_par_carte(clients[2].compte.numero_carte) is clients[2].compte
+    assert registre.trouver_par_cnic(clients[3].cnic) is clients[3]
+    assert registre.trouver_par_login("login4") is clients[4]
+    assert registre.numeros_cartes() == cartes
+    assert registre.cartes_par_plage(cartes[1], cartes[3]) == cartes[1:3]
+    assert registre.cartes_par_prefixe(cartes[0][:6]) == cartes
+    assert registre.comptes_par_type("Compte courant") == sorted(c.compte.numero_carte for c in clients[1::2])
+    assert EmployeBancaire("employe", "", registre).consulter_comptes_clients() == cartes
+
+
+def test_retirer_client(processus, nouveau_client):
+    registre = RegistreComptes()
+    client = nouveau_client()
+    client.creer_compte(registre)
+    assert registre.retirer_client(client) == "Compte retiré du registre."
+    assert registre.trouver_par_carte(client.compte.numero_carte) is None
+    assert registre.trouver_par_login(client.login) is None
+    assert registre.numeros_cartes() == []
+    assert registre.retirer_client(client) == "Compte introuvable dans le registre."
+
+
+def test_doublons_refuses_sans_rien_ecraser(processus, nouveau_client):
+    registre = RegistreComptes()
+    premier = nouveau_client(1)
+    premier.creer_compte(registre)
+
+    meme_cnic = nouveau_client(2, cnic=premier.cnic)
+    assert meme_cnic.creer_compte(registre) == "Ce CNIC est déjà enregistré."
+    meme_login = nouveau_client(3, login=premier.login)
+    assert meme_login.creer_compte(registre) == "Ce login est déjà utilisé."
+    for refuse in (meme_cnic, meme_login):
+        assert refuse.compte is None
+    assert registre.trouver_par_cnic(premier.cnic) is premier
+    assert registre.trouver_par_login(premier.login) is premier
+    assert len(registre) == 1
+
+
+def test_carte_deja_enregistree_refusee(processus, nouveau_client):
+    registre = RegistreComptes()
+    premier = nouveau_client(1)
+    premier.creer_compte(registre)
+    second = nouveau_client(2)
+    second.compte = CompteBancaire(second, premier.compte.numero_carte)
+    assert registre.enregistrer_client(second) == "Ce numéro de carte est déjà enregistré."
+    assert registre.trouver_par_carte(premier.compte.numero_carte) is premier.compte
+
+
+def test_clients_sans_login_acceptes(processus, nouveau_client):
+    registre = RegistreComptes()
+    for i in range(2):
+        assert registre.enregistrer_client(_avec_compte(nouveau_client(i, login=""))) == COMPTE_ENREGISTRE
+    assert registre.trouver_par_login("") is None
+
+
+def test_employe_ne_confirme_pas_un_refus(processus, nouveau_client):
+    registre = RegistreComptes()
+    employe = EmployeBancaire("employe", "", registre)
+    premier = nouveau_client(1)
+    assert employe.approuver_demande_compte(premier) == "Demande de compte approuvée."
+    assert employe.approuver_demande_compte(nouveau_client(2, login=premier.login)) == "Ce login est déjà utilisé."
+    assert employe.approuver_demande_compte(nouveau_client(3, nom="AB")) == "Nom invalide"
+
+
+def test_import_avec_registre_rejette_les_doublons(processus, tmp_path):
+    demandes = tmp_path / "demandes.csv"
+    demandes.write_text("nom,adresse,telephone,cnic,login,mot_de_passe,limite_retrait\n"
+                        "Alice,Paris,+33612345678,1234567890123,alice,,1000\n"
+                        "Alicia,Lyon,+33612345679,1234567890123,alicia,,1000\n", encoding="utf-8")
+    registre = RegistreComptes()
+    assert importer_clients(str(demandes), str(tmp_path / "resultats.csv"), registre=registre) == (1, 1)
+    lignes = (tmp_path / "resultats.csv").read_text(encoding="utf-8").splitlines()
+    assert lignes[2].startswith("2,rejeté,Ce CNIC est déjà enregistré.")
+    assert len(registre) == 1
+
+
+def _avec_compte(client):
+    client.compte = CompteBancaire(client)
+    return client
@@ -0,0 +1,108 @@
+import json
+
+from banque.modele import Entreprise
+from banque.service_banque import TAILLE_PAGE, ServiceBanque
+
+
+def requete(service, **champs):
+    return json.loads(service.executer(json.dumps(champs).encode()))
+
+
+def ouvrir(service, i, **champs):
+    informations = {"op": "creer_compte", "nom": f"Client {i}", "telephone": "+33612345678", "cnic": f"{i:013d}",
+                    "login": f"login{i}", "limite_retrait": 1000}
+    informations.update(champs)
+    return requete(service, **informations)
+
+
+def test_creer_compte_refuse_par_le_registre(processus):
+    service = ServiceBanque()
+    assert ouvrir(service, 1)["ok"]
+    reponse = ouvrir(service, 2, login="login1")
+    assert reponse == {"ok": False, "message": "Ce login est déjà utilisé."}
+    assert service.registre.trouver_par_login("login1").cnic == f"{1:013d}"
+
+
+def ouvrir_entreprise(service, compte_id, solde=0):
+    entreprise = Entreprise(f"Entreprise {compte_id}", "Paris", "FR1", 100000, compte_id, "")
+    service.registre.enregistrer_entreprise(entreprise)
+    if solde:
+        entreprise.deposer_fonds(solde)
+    return entreprise
+
+
+def test_transfert_vers_une_entreprise(processus):
+    service = ServiceBanque(sessions_obligatoires=False)
+    carte = ouvrir(service, 1)["carte"]
+    entreprise = ouvrir_entreprise(service, "ACME-1")
+    requete(service, op="deposer", carte=carte, montant=100)
+    reponse = requete(service, op="transferer", carte=carte, entreprise_destination="ACME-1", montant=30)
+    assert reponse == {"ok": True, "message": "30€ transférés avec succès vers le compte entreprise ACME-1."}
+    assert entreprise.solde == 30
+    assert requete(service, op="solde", carte=carte)["solde"] == 70
+    assert entreprise.historique_transactions == ["Réception de 30€ du compte " + carte]
+    assert service.registre.trouver_par_carte(carte).historique_transactions[-1] == \
+        "Transfert de 30€ vers le compte entreprise ACME-1"
+
+
+def test_transfert_entre_entreprises(processus):
+    service = ServiceBanque(sessions_obligatoires=False)
+    source = ouvrir_entreprise(service, "ACME-1", solde=500)
+    destination = ouvrir_entreprise(service, "ACME-2")
+    reponse = requete(service, op="transferer", entreprise="ACME-1", entreprise_destination="ACME-2", montant=200)
+    assert reponse["ok"], reponse
+    assert (source.solde, destination.solde) == (300, 200)
+    assert destination.historique_transactions == ["Réception de 200€ du compte entreprise ACME-1"]
+
+
+def test_montants_invalides(processus):
+    service = ServiceBanque(sessions_obligatoires=False)
+    carte = ouvrir(service, 1)["carte"]
+    requete(service, op="deposer", carte=carte, montant=100)
+    for montant in ("100", True, None, 10 ** 13, [1]):
+        assert requete(service, op="retirer", carte=carte, montant=montant) == \
+            {"ok": False, "message": "Montant invalide."}
+    for constante in (b"NaN", b"Infinity", b"-Infinity"):
+        ligne = b'{"op": "deposer", "carte": "%s", "montant": %s}' % (carte.encode(), constante)
+        assert json.loads(service.executer(ligne)) == {"ok": False, "message": "Requête invalide."}
+    assert requete(service, op="solde", carte=carte)["solde"] == 100
+
+
+def test_requetes_malformees_toujours_repondues(processus):
+    service = ServiceBanque(sessions_obligatoires=False)
+    assert json.loads(service.executer(b"{pas du json")) == {"ok": False, "message": "Requête invalide."}
+    assert json.loads(service.executer(b"[1]")) == {"ok": False, "message": "Requête invalide."}
+    assert requete(service, op="inconnue", id=7) == {"ok": False, "message": "Opération inconnue.", "id": 7}
+    assert requete(service, op="deposer", carte="0", montant=1) == {"ok": False, "message": "Compte introuvable."}
+
+
+def test_sessions_obligatoires_par_defaut(processus):
+    service = ServiceBanque()
+    alice = ouvrir(service, 1, mot_de_passe="secret d'Alice")["carte"]
+    bob = ouvrir(service, 2)["carte"]
+    ouvrir_entreprise(service, "ACME-1", solde=100)
+    for champs in ({"carte": alice}, {"entreprise": "ACME-1"}, {"jeton": "inconnu"}):
+        assert requete(service, op="retirer", montant=1, **champs) == {"ok": False, "message": "Compte introuvable."}
+    assert not requete(service, op="connexion", login="login1", mot_de_passe="faux")["ok"]
+
+    jeton = requete(service, op="connexion", login="login1", mot_de_passe="secret d'Alice")["jeton"]
+    assert requete(service, op="deposer", jeton=jeton, montant=50)["ok"]
+    # Le jeton désigne le compte : le champ "carte" d'un autre client ne change rien
+    assert requete(service, op="transferer", jeton=jeton, carte=bob, destination=bob, montant=20)["ok"]
+    assert requete(service, op="solde", jeton=jeton)["solde"] == 30
+    assert requete(service, op="deconnexion", jeton=jeton)["ok"]
+    assert requete(service, op="solde", jeton=jeton) == {"ok": False, "message": "Compte introuvable."}
+
+
+def test_service_borne_la_taille(processus):
+    service = ServiceBanque(sessions_obligatoires=False)
+    carte = ouvrir(service, 1)["carte"]
+    for _ in range(TAILLE_PAGE + 5):
+        requete(service, op="deposer", carte=carte, montant=1)
+    reponse = requete(service, op="historique", carte=carte, taille=10 ** 6)
+    assert len(reponse["message"].splitlines()) == TAILLE_PAGE and reponse["curseur"] is not None
+    reponse = requete(service, op="historique", carte=carte, taille=0)
+    assert len(reponse["message"].splitlines()) == 1
+    suite = requete(service, op="historique", carte=carte, taille=TAILLE_PAGE, curseur=reponse["curseur"])
+    assert len(suite["message"].splitlines()) == TAILLE_PAGE and suite["curseur"] is not None
+    assert requete(service, op="historique", carte=carte, taille="10") == {"ok": False, "message": "Requête invalide."}
@@ -0,0 +1,50 @@
+import pytest
+
+from banque.modele import Client, CompteBancaire, Entreprise
+from banque.table_comptes import CompteTable, TableComptes
+
+
+def test_objets_sans_dict(processus, nouveau_client):
+    client = nouveau_client()
+    client.creer_compte()
+    entreprise = Entreprise("ACME", "Paris", "FR1", 100000, "ACME-1", "")
+    for objet in (client, client.compte, entreprise):
+        assert not hasattr(objet, "__dict__")
+        with pytest.raises(AttributeError):
+            objet.attribut_inconnu = 1
+
+
+def test_table_comme_des_comptes(processus):
+    table = TableComptes()
+    comptes = [table.ouvrir_compte(f"Client {i}", "Adresse", "+33612345678", f"{i:013d}", f"login{i}", "",
+                                   60000 if i % 2 else 1000) for i in range(3000)]  # L'index des cartes grandit
+    assert len(table) == 3000 and all(isinstance(compte, CompteTable) for compte in comptes)
+    for compte in comptes[::499]:
+        assert table.trouver_par_carte(compte.numero_carte) == compte
+    assert table.trouver_par_carte("4970100000000000") is None
+
+    compte = comptes[1]
+    assert compte.type_compte == "Compte courant" and compte.limite_retrait == 60000
+    assert compte.deposer_fonds(100.25) == "100.25€ déposés avec succès."
+    assert compte.retirer_fonds(0.25) == "0.25€ retirés avec succès."
+    assert compte.transferer_fonds(40, comptes[2]) == \
+        f"40€ transférés avec succès vers le compte {comptes[2].numero_carte}."
+    assert (table.soldes[1], table.soldes[2]) == (6000, 4000)
+    assert compte.historique_transactions == ["Dépôt de 100.25€", "Retrait de 0.25€",
+                                              f"Transfert de 40€ vers le compte {comptes[2].numero_carte}"]
+    compte.geler_compte()
+    assert compte.est_gelé and table.gels[1] == 1
+    assert compte.entrer_pin("1234") == "PIN enregistré avec succès."
+    assert compte.verifier_pin("1234") == "PIN vérifié avec succès."
+
+    client = table.client(1)
+    assert (client.nom, client.telephone, client.cnic, client.login) == \
+        ("Client 1", "+33612345678", f"{1:013d}", "login1")
+    assert client.compte == compte and isinstance(client, Client) and isinstance(compte, CompteBancaire)
+
+
+def test_ouverture_refusee(processus):
+    table = TableComptes()
+    assert table.ouvrir_compte("AB", "", "+33612345678", "1" * 13, "", "", 1000) == "Nom invalide"
+    assert table.ouvrir_compte("Client", "", "+33612345678", "123", "", "", 1000) == "CNIC invalide"
+    assert len(table) == 0
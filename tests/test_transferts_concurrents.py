@@ -0,0 +1,71 @@
+import random
+import sys
+import threading
+
+from banque.modele import Entreprise
+from banque.verrous_comptes import VerrousComptes
+
+
+def test_verrous_pris_dans_l_ordre():
+    verrous = VerrousComptes(8)
+    a, b = "4970100000000001", "4970100000000002"
+    assert verrous.paire(a, b).verrous == verrous.paire(b, a).verrous
+    assert len(verrous.paire(a, a).verrous) == 1
+    assert len(verrous.plusieurs([a, b, a]).verrous) == len({verrous.indice(a), verrous.indice(b)})
+    assert len(verrous.tous().verrous) == 8
+    with verrous.paire(a, b):
+        assert all(verrou.locked() for verrou in verrous.paire(a, b).verrous)
+    assert not any(verrou.locked() for verrou in verrous.tous().verrous)
+
+
+def test_transferts_croises_sans_perte(processus, nouveau_client):
+    comptes = []
+    for i in range(20):
+        client = nouveau_client(i)
+        client.creer_compte()
+        client.compte.deposer_fonds(100)
+        comptes.append(client.compte)
+    entreprise = Entreprise("ACME", "Paris", "FR1", 100000, "ACME-1", "")
+    entreprise.deposer_fonds(1000)
+    comptes.append(entreprise)
+    reussis = [0] * 6
+
+    def travailler(graine):
+        generateur = random.Random(graine)
+        for _ in range(2000):
+            source, destination = generateur.sample(comptes, 2)
+            if "avec succès" in source.transferer_fonds(generateur.randint(1, 30), destination):
+                reussis[graine] += 1
+
+    threads = [threading.Thread(target=travailler, args=(graine,)) for graine in range(6)]
+    # Bascule très fréquente entre threads pour provoquer un maximum d'entrelacements
+    ancien = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.setswitchinterval(ancien)
+    assert sum(compte.solde for compte in comptes) == 20 * 100 + 1000
+    assert all(compte.solde >= 0 for compte in comptes)
+    # Chaque transfert réussi est au journal une seule fois, et seulement lui (après les 21 dépôts)
+    assert len(processus.journal) == 21 + sum(reussis)
+    assert sum(reussis) > 0
+
+
+def test_fonds_insuffisants_et_compte_gele(processus, nouveau_client):
+    alice, bob = nouveau_client(1), nouveau_client(2)
+    alice.creer_compte()
+    bob.creer_compte()
+    alice.compte.deposer_fonds(10)
+    assert alice.compte.transferer_fonds(11, bob.compte) == "Fonds insuffisants pour le transfert."
+    assert alice.compte.transferer_fonds(0, bob.compte) == "Le montant du transfert doit être positif."
+    alice.compte.geler_compte()
+    assert alice.compte.transferer_fonds(1, bob.compte) == \
+        "Le compte est gelé, vous ne pouvez pas effectuer de transfert."
+    alice.compte.debloquer_compte()
+    assert alice.compte.transferer_fonds(10, bob.compte) == \
+        f"10€ transférés avec succès vers le compte {bob.compte.numero_carte}."
+    assert (alice.compte.solde, bob.compte.solde) == (0, 10)